@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User
+from core.paginators import EstimatedCountPaginator
+from .models import RevokedToken, User
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -8,9 +9,21 @@ class UserAdmin(BaseUserAdmin):
     list_filter = ('is_seller', 'is_staff', 'is_superuser', 'is_active', 'created_at')
     search_fields = ('email', 'username', 'first_name', 'last_name')
     ordering = ('-created_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = BaseUserAdmin.fieldsets + (
         ('Additional Info', {
             'fields': ('is_seller', 'phone', 'address')
         }),
-    )
\ No newline at end of file
+    )
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ('jti', 'token_type', 'user', 'revoked_at', 'expires_at')
+    list_filter = ('token_type',)
+    list_select_related = ('user',)
+    search_fields = ('jti', 'user__email')
+    readonly_fields = ('jti', 'token_type', 'user', 'revoked_at', 'expires_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
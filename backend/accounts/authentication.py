@@ -0,0 +1,23 @@
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from . import revocation
+
+
+class RevocationCheckMixin:
+    """Reject tokens on the revocation list (an in-memory check, see revocation.py)"""
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if revocation.is_revoked(token[api_settings.JTI_CLAIM]):
+            raise InvalidToken({'detail': 'Token has been revoked', 'code': 'token_revoked'})
+        return token
+
+
+class JWTAuthentication(RevocationCheckMixin, authentication.JWTAuthentication):
+    pass
+
+
+class JWTStatelessUserAuthentication(RevocationCheckMixin, authentication.JWTStatelessUserAuthentication):
+    pass
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True)),
+                ('token_type', models.CharField(choices=[('access', 'Access'), ('refresh', 'Refresh')], max_length=10)),
+                ('expires_at', models.DateTimeField()),
+                ('revoked_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'revoked_tokens',
+                'indexes': [models.Index(fields=['revoked_at'], name='revoked_tok_revoked_9339bb_idx'), models.Index(fields=['expires_at'], name='revoked_tok_expires_cdc4fe_idx')],
+            },
+        ),
+    ]
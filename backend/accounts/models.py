@@ -24,4 +24,27 @@ class User(AbstractUser):
     class Meta:
         db_table = 'auth_user'
         verbose_name = 'User'
-        verbose_name_plural = 'Users'
\ No newline at end of file
+        verbose_name_plural = 'Users'
+
+class RevokedToken(models.Model):
+    """A JWT that must no longer be accepted, kept until the token itself expires"""
+    TOKEN_TYPE_CHOICES = [
+        ('access', 'Access'),
+        ('refresh', 'Refresh'),
+    ]
+
+    jti = models.CharField(max_length=255, unique=True)
+    token_type = models.CharField(max_length=10, choices=TOKEN_TYPE_CHOICES)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, blank=True, null=True, related_name='+')
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'revoked_tokens'
+        indexes = [
+            models.Index(fields=['revoked_at']),
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.token_type} {self.jti}"
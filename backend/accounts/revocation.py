@@ -0,0 +1,179 @@
+"""
+JWT revocation list.
+
+Revoked tokens are persisted as ``RevokedToken`` rows until the token itself
+would have expired. Every process keeps a Bloom filter of all live
+revocations, so checking a token that was never revoked (nearly every request)
+costs a few hash probes and no query. Filter hits are confirmed against a
+bounded exact cache of known answers; only a false positive that is not
+cached yet falls through to a primary-key lookup.
+
+The filter is loaded on first use (the worker warm-up triggers it) and pulls
+new rows every REVOCATION_REFRESH_SECONDS, so a revocation made by another
+worker takes effect within that interval; the revoking worker sees it
+immediately. Every REVOCATION_REBUILD_SECONDS, or once the filter is over
+capacity, it is rebuilt from the unexpired rows and expired rows are deleted.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Re-read rows revoked this long before the last sync, in case their
+# transactions committed after it ran
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.size = max(64, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing over one 128-bit digest gives k independent-enough probes
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        if key in self:
+            return
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    def __init__(self):
+        self._bloom = None
+        self._exact = OrderedDict()  # jti -> revoked, confirmed answers for filter hits
+        self._exact_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._cursor = None
+        self._synced_at = 0.0
+        self._rebuilt_at = 0.0
+
+    def _remember(self, jti, revoked):
+        with self._exact_lock:
+            self._exact[jti] = revoked
+            self._exact.move_to_end(jti)
+            while len(self._exact) > settings.REVOCATION_EXACT_CACHE_SIZE:
+                self._exact.popitem(last=False)
+
+    def rebuild(self):
+        """Reload all unexpired revocations and delete expired ones"""
+        now = timezone.now()
+        purge_expired(now)
+        rows = RevokedToken.objects.filter(expires_at__gt=now)
+        capacity = max(settings.REVOCATION_BLOOM_CAPACITY, rows.count() * 2)
+        bloom = BloomFilter(capacity, settings.REVOCATION_BLOOM_ERROR_RATE)
+        for jti in rows.values_list('jti', flat=True).iterator(chunk_size=5000):
+            bloom.add(jti)
+        with self._exact_lock:
+            self._bloom = bloom
+            self._exact = OrderedDict()
+        self._cursor = now
+        self._synced_at = self._rebuilt_at = time.monotonic()
+        logger.info('Loaded %s revoked tokens', bloom.count)
+
+    def sync(self):
+        """Add rows revoked since the last sync"""
+        now = timezone.now()
+        jtis = RevokedToken.objects.filter(revoked_at__gte=self._cursor - SYNC_OVERLAP).values_list('jti', flat=True)
+        for jti in jtis:
+            self._bloom.add(jti)
+            self._remember(jti, True)
+        self._cursor = now
+        self._synced_at = time.monotonic()
+
+    def _maybe_refresh(self):
+        now = time.monotonic()
+        bloom = self._bloom
+        needs_rebuild = (bloom is None or bloom.count > bloom.capacity
+                         or now - self._rebuilt_at > settings.REVOCATION_REBUILD_SECONDS)
+        if not needs_rebuild and now - self._synced_at <= settings.REVOCATION_REFRESH_SECONDS:
+            return
+        # Only the first load blocks; otherwise one thread refreshes while the rest use the current filter
+        if not self._refresh_lock.acquire(blocking=bloom is None):
+            return
+        try:
+            if self._bloom is None or needs_rebuild:
+                self.rebuild()
+            elif time.monotonic() - self._synced_at > settings.REVOCATION_REFRESH_SECONDS:
+                self.sync()
+        finally:
+            self._refresh_lock.release()
+
+    def is_revoked(self, jti):
+        self._maybe_refresh()
+        if jti not in self._bloom:
+            return False
+        with self._exact_lock:
+            revoked = self._exact.get(jti)
+        if revoked is None:
+            revoked = RevokedToken.objects.filter(jti=jti).exists()
+            self._remember(jti, revoked)
+        return revoked
+
+    def revoke(self, jti, token_type, expires_at, user_id=None):
+        """Persist a revocation; returns False if the token was already revoked"""
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, token_type=token_type, expires_at=expires_at, user_id=user_id)
+        except IntegrityError:
+            return False
+        self._maybe_refresh()
+        self._bloom.add(jti)
+        self._remember(jti, True)
+        return True
+
+
+revocation_list = RevocationList()
+
+
+def load():
+    revocation_list._maybe_refresh()
+
+
+def is_revoked(jti):
+    return revocation_list.is_revoked(jti)
+
+
+def revoke_token(token):
+    """Revoke a simplejwt token object; returns False if it was already revoked"""
+    return revocation_list.revoke(
+        token[api_settings.JTI_CLAIM],
+        token[api_settings.TOKEN_TYPE_CLAIM],
+        datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc),
+        token.get(api_settings.USER_ID_CLAIM),
+    )
+
+
+def purge_expired(now=None, batch_size=1000):
+    """Delete revocations whose tokens have expired anyway; returns rows removed"""
+    now = now or timezone.now()
+    removed = 0
+    while True:
+        ids = list(RevokedToken.objects.filter(expires_at__lte=now).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return removed
+        removed += RevokedToken.objects.filter(id__in=ids).delete()[0]
@@ -1,6 +1,11 @@
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from . import revocation
 from .models import User
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -58,4 +63,28 @@ class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'email', 'username', 'first_name', 'last_name', 'is_seller', 'phone', 'address', 'created_at')
-        read_only_fields = ('id', 'email', 'is_seller', 'created_at')
\ No newline at end of file
+        read_only_fields = ('id', 'email', 'is_seller', 'created_at')
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """Refresh that honours the revocation list and makes rotated tokens single-use"""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if revocation.is_revoked(refresh[api_settings.JTI_CLAIM]):
+            raise InvalidToken({'detail': 'Token has been revoked', 'code': 'token_revoked'})
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first() if user_id else None
+        if user_id and not (user and api_settings.USER_AUTHENTICATION_RULE(user)):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # The unique jti makes this the single winner when the same token is refreshed concurrently
+            if api_settings.BLACKLIST_AFTER_ROTATION and not revocation.revoke_token(refresh):
+                raise InvalidToken({'detail': 'Token has been revoked', 'code': 'token_revoked'})
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
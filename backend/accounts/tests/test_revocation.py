@@ -0,0 +1,95 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import revocation
+from accounts.models import RevokedToken
+
+User = get_user_model()
+
+
+class RevocationTestCase(TestCase):
+    def setUp(self):
+        # Every test starts from an empty, not yet loaded list
+        patcher = mock.patch.object(revocation, 'revocation_list', revocation.RevocationList())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(email='buyer@example.com', username='buyer', password='x' * 12,
+                                             first_name='B', last_name='Test')
+
+
+class RefreshTests(RevocationTestCase):
+    def refresh(self, token):
+        return APIClient().post('/api/auth/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_rotated_refresh_token_is_single_use(self):
+        token = RefreshToken.for_user(self.user)
+        first = self.refresh(token)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('access', first.data)
+        self.assertNotEqual(first.data['refresh'], str(token))
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(self.refresh(first.data['refresh']).status_code, 200)
+
+    def test_logout_revokes_both_tokens(self):
+        refresh = RefreshToken.for_user(self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.assertEqual(client.get('/api/auth/profile/').status_code, 200)
+        self.assertEqual(client.post('/api/auth/logout/', {'refresh': str(refresh)}, format='json').status_code, 200)
+        self.assertEqual(client.get('/api/auth/profile/').status_code, 401)
+        self.assertEqual(self.refresh(refresh).status_code, 401)
+
+    def test_inactive_user_cannot_refresh(self):
+        token = RefreshToken.for_user(self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+
+class RevocationListTests(RevocationTestCase):
+    def revoke_elsewhere(self, jti):
+        # As another worker would: only the row, not this process's filter
+        RevokedToken.objects.create(jti=jti, token_type='access', expires_at=timezone.now() + timedelta(hours=1))
+
+    @override_settings(REVOCATION_REFRESH_SECONDS=0)
+    def test_sync_picks_up_revocations_from_other_workers(self):
+        self.assertFalse(revocation.is_revoked('other-worker'))
+        self.revoke_elsewhere('other-worker')
+        time.sleep(0.01)
+        self.assertTrue(revocation.is_revoked('other-worker'))
+
+    @override_settings(REVOCATION_REFRESH_SECONDS=3600)
+    def test_other_workers_revocations_wait_for_the_refresh_interval(self):
+        self.assertFalse(revocation.is_revoked('other-worker'))
+        self.revoke_elsewhere('other-worker')
+        self.assertFalse(revocation.is_revoked('other-worker'))
+
+    def test_filter_hits_are_confirmed_against_the_database(self):
+        revocation.load()
+        revocation.revocation_list._bloom.add('false-positive')
+        with self.assertNumQueries(1):
+            self.assertFalse(revocation.is_revoked('false-positive'))
+        with self.assertNumQueries(0):
+            self.assertFalse(revocation.is_revoked('false-positive'))
+
+    def test_rebuild_drops_expired_rows(self):
+        RevokedToken.objects.create(jti='expired', token_type='access', expires_at=timezone.now() - timedelta(seconds=1))
+        self.revoke_elsewhere('live')
+        revocation.revocation_list.rebuild()
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['live'])
+        self.assertTrue(revocation.is_revoked('live'))
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = revocation.BloomFilter(1000, 0.01)
+        keys = [f'jti-{i}' for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
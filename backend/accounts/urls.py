@@ -6,6 +6,7 @@ urlpatterns = [
     path('register/', views.register_buyer, name='register_buyer'),
     path('seller/register/', views.register_seller, name='register_seller'),
     path('login/', views.login_user, name='login'),
+    path('logout/', views.logout_user, name='logout'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('profile/', views.get_user_profile, name='user_profile'),
     path('profile/update/', views.update_user_profile, name='update_profile'),
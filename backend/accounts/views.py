@@ -1,8 +1,12 @@
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import login
+from products.stores import ensure_store
+from . import revocation
 from .models import User
 from .serializers import (
     UserRegistrationSerializer,
@@ -41,6 +45,7 @@ def register_seller(request):
     serializer = SellerRegistrationSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.save()
+        ensure_store(user)
         tokens = get_tokens_for_user(user)
         user_data = UserProfileSerializer(user).data
         
@@ -70,6 +75,21 @@ def login_user(request):
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['POST'])
+def logout_user(request):
+    # Revoke the access token used for this request and, if given, its refresh token
+    revocation.revoke_token(request.auth)
+    raw_refresh = request.data.get('refresh')
+    if raw_refresh:
+        try:
+            refresh = RefreshToken(raw_refresh)
+        except TokenError:
+            return Response({'error': 'Invalid refresh token'}, status=status.HTTP_400_BAD_REQUEST)
+        if str(refresh.get(api_settings.USER_ID_CLAIM)) != str(request.user.pk):
+            return Response({'error': 'Refresh token belongs to another user'}, status=status.HTTP_400_BAD_REQUEST)
+        revocation.revoke_token(refresh)
+    return Response({'message': 'Logout successful'}, status=status.HTTP_200_OK)
+
 @api_view(['GET'])
 def get_user_profile(request):
     serializer = UserProfileSerializer(request.user)
@@ -3,4 +3,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cart_builder.settings')
 
-application = get_asgi_application()
\ No newline at end of file
+application = get_asgi_application()
+
+# Pay first-request costs before the worker takes traffic; per-process steps run after any fork
+from core import warmup  # noqa: E402
+warmup.run()
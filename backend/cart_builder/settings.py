@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -28,9 +29,11 @@ INSTALLED_APPS = [
     'accounts',
     'products',
     'orders',
+    'core',
 ]
 
 MIDDLEWARE = [
+    'core.warmup.WarmupMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -39,6 +42,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'cart_builder.urls'
@@ -69,6 +73,21 @@ DATABASES = {
     }
 }
 
+# Cache
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='cart-builder'),
+    },
+    # Seen by every process (web workers, outbox worker, commands), see core/caches.py
+    'shared': {
+        'BACKEND': config('SHARED_CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('SHARED_CACHE_LOCATION', default=str(BASE_DIR / '.cache')),
+        # Django's default of 300 entries culls cart summaries and catalog pages within minutes
+        'OPTIONS': {'MAX_ENTRIES': config('SHARED_CACHE_MAX_ENTRIES', default=1000000, cast=int)},
+    },
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -98,6 +117,19 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+MEDIA_LEGACY_MAX_AGE = config('MEDIA_LEGACY_MAX_AGE', default=3600, cast=int)
+MEDIA_GC_GRACE_HOURS = config('MEDIA_GC_GRACE_HOURS', default=24, cast=int)
+
+# Uploads are stored by content hash (see core/storage.py)
+STORAGES = {
+    'default': {
+        'BACKEND': 'core.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -108,14 +140,30 @@ AUTH_USER_MODEL = 'accounts.User'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 50
+    'PAGE_SIZE': 50,
+    # Used by the token bucket throttles in core/throttling.py
+    'DEFAULT_THROTTLE_RATES': {
+        'catalog_anon': config('THROTTLE_CATALOG_ANON', default='300/min'),
+        'cart_write': config('THROTTLE_CART_WRITE', default='60/min'),
+        'checkout': config('THROTTLE_CHECKOUT', default='10/min'),
+    },
+}
+
+# Token bucket throttling
+THROTTLE_BURSTS = {
+    'catalog_anon': config('THROTTLE_CATALOG_ANON_BURST', default=60, cast=int),
+    'cart_write': config('THROTTLE_CART_WRITE_BURST', default=20, cast=int),
+    'checkout': config('THROTTLE_CHECKOUT_BURST', default=3, cast=int),
 }
+THROTTLE_MAX_KEYS = config('THROTTLE_MAX_KEYS', default=100000, cast=int)
+THROTTLE_SHARED_SYNC = config('THROTTLE_SHARED_SYNC', default=False, cast=bool)
+THROTTLE_SYNC_INTERVAL = config('THROTTLE_SYNC_INTERVAL', default=1.0, cast=float)
 
 # JWT Configuration
 SIMPLE_JWT = {
@@ -123,8 +171,16 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.TokenRefreshSerializer',
 }
 
+# Token revocation list (see accounts/revocation.py)
+REVOCATION_REFRESH_SECONDS = config('REVOCATION_REFRESH_SECONDS', default=5, cast=int)
+REVOCATION_REBUILD_SECONDS = config('REVOCATION_REBUILD_SECONDS', default=3600, cast=int)
+REVOCATION_BLOOM_CAPACITY = config('REVOCATION_BLOOM_CAPACITY', default=100000, cast=int)
+REVOCATION_BLOOM_ERROR_RATE = config('REVOCATION_BLOOM_ERROR_RATE', default=0.001, cast=float)
+REVOCATION_EXACT_CACHE_SIZE = config('REVOCATION_EXACT_CACHE_SIZE', default=10000, cast=int)
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -133,4 +189,80 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:5173",
 ]
 
-CORS_ALLOW_CREDENTIALS = True
\ No newline at end of file
+CORS_ALLOW_CREDENTIALS = True
+
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
+
+# Pre-build URL resolvers, serializer fields and the JWT backend when a worker boots
+WARMUP_ENABLED = config('WARMUP_ENABLED', default=True, cast=bool)
+
+# Release identifier, used to compare profiles between deployments
+RELEASE = config('RELEASE', default='dev')
+
+# Sampling profiler (rules are managed in the admin)
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=True, cast=bool)
+PROFILING_INTERVAL_MS = config('PROFILING_INTERVAL_MS', default=5, cast=float)
+PROFILING_RULES_TTL = config('PROFILING_RULES_TTL', default=30, cast=int)
+
+# Email
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@cartbuilder.local')
+
+# Product detail and list responses are fresh this long, then served stale for up to
+# CATALOG_CACHE_STALE_SECONDS more while one request refreshes them (0 disables caching);
+# entries live in the shared cache so product edits invalidate them in every worker
+CATALOG_CACHE_SECONDS = config('CATALOG_CACHE_SECONDS', default=10, cast=int)
+CATALOG_CACHE_STALE_SECONDS = config('CATALOG_CACHE_STALE_SECONDS', default=60, cast=int)
+# Request coalescing: how long a request waits for an identical in-flight one, and the
+# cross-worker rebuild lease (0 turns the lease off)
+COALESCE_WAIT_SECONDS = config('COALESCE_WAIT_SECONDS', default=10, cast=float)
+COALESCE_LEASE_SECONDS = config('COALESCE_LEASE_SECONDS', default=5, cast=int)
+
+# Largest page of the product change feed
+CHANGE_FEED_MAX_LIMIT = config('CHANGE_FEED_MAX_LIMIT', default=1000, cast=int)
+
+# Products with at most this many units (and at least one) count as low stock for sellers
+LOW_STOCK_THRESHOLD = config('LOW_STOCK_THRESHOLD', default=5, cast=int)
+
+# Threads computing the parts of /api/bootstrap/ concurrently
+BOOTSTRAP_WORKERS = config('BOOTSTRAP_WORKERS', default=8, cast=int)
+
+# Cart summary cache lifetime; mutations update it in place, the TTL bounds staleness
+CART_SUMMARY_TTL = config('CART_SUMMARY_TTL', default=600, cast=int)
+
+# Carts untouched this long are purged by purge_carts; empty carts go sooner
+CART_RETENTION_DAYS = config('CART_RETENTION_DAYS', default=30, cast=int)
+CART_EMPTY_RETENTION_DAYS = config('CART_EMPTY_RETENTION_DAYS', default=1, cast=int)
+
+# Idempotency-Key handling for checkout and cart mutations
+IDEMPOTENCY_TTL_HOURS = config('IDEMPOTENCY_TTL_HOURS', default=24, cast=int)
+IDEMPOTENCY_WAIT_SECONDS = config('IDEMPOTENCY_WAIT_SECONDS', default=10, cast=float)
+IDEMPOTENCY_IN_PROGRESS_TIMEOUT = config('IDEMPOTENCY_IN_PROGRESS_TIMEOUT', default=60, cast=int)
+
+# Upper bound on ids accepted by the product batch endpoint
+PRODUCT_BATCH_MAX_IDS = config('PRODUCT_BATCH_MAX_IDS', default=300, cast=int)
+
+# Inventory sync: rows per request, and rows per locked UPDATE batch
+INVENTORY_SYNC_MAX_ITEMS = config('INVENTORY_SYNC_MAX_ITEMS', default=10000, cast=int)
+INVENTORY_SYNC_BATCH_SIZE = config('INVENTORY_SYNC_BATCH_SIZE', default=500, cast=int)
+
+# Half-life of a sale in the trending sort
+TRENDING_HALF_LIFE_DAYS = config('TRENDING_HALF_LIFE_DAYS', default=7, cast=float)
+
+# Neighbours kept per product for "frequently bought together"
+RECOMMENDATIONS_TOP_K = config('RECOMMENDATIONS_TOP_K', default=20, cast=int)
+
+# Product autocomplete index
+AUTOCOMPLETE_PRELOAD = config('AUTOCOMPLETE_PRELOAD', default=True, cast=bool)
+AUTOCOMPLETE_REFRESH_SECONDS = config('AUTOCOMPLETE_REFRESH_SECONDS', default=300, cast=int)
+AUTOCOMPLETE_SCAN_LIMIT = config('AUTOCOMPLETE_SCAN_LIMIT', default=256, cast=int)
+AUTOCOMPLETE_TOP_K = config('AUTOCOMPLETE_TOP_K', default=10, cast=int)
+
+# Transactional outbox
+OUTBOX_WORKERS = config('OUTBOX_WORKERS', default=4, cast=int)
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=100, cast=int)
+OUTBOX_POLL_INTERVAL = config('OUTBOX_POLL_INTERVAL', default=1.0, cast=float)
+OUTBOX_LEASE_SECONDS = config('OUTBOX_LEASE_SECONDS', default=300, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+OUTBOX_MAX_BACKOFF_SECONDS = config('OUTBOX_MAX_BACKOFF_SECONDS', default=3600, cast=int)
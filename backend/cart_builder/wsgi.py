@@ -3,4 +3,8 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cart_builder.settings')
 
-application = get_wsgi_application()
\ No newline at end of file
+application = get_wsgi_application()
+
+# Pay first-request costs before the worker takes traffic; per-process steps run after any fork
+from core import warmup  # noqa: E402
+warmup.run()
@@ -0,0 +1,34 @@
+from django.contrib import admin
+from .models import OutboxEvent, ProfileRecord, ProfilingRule
+from .paginators import EstimatedCountPaginator
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'event_type', 'status', 'attempts', 'available_at', 'created_at', 'processed_at']
+    list_filter = ['status']
+    search_fields = ['event_type']
+    readonly_fields = ['event_type', 'payload', 'attempts', 'locked_until', 'last_error', 'created_at', 'processed_at']
+    actions = ['requeue']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.action(description='Requeue selected events')
+    def requeue(self, request, queryset):
+        queryset.update(status='pending', attempts=0, locked_until=None)
+
+
+@admin.register(ProfilingRule)
+class ProfilingRuleAdmin(admin.ModelAdmin):
+    list_display = ['id', 'path_prefix', 'user', 'sample_rate', 'is_active', 'expires_at', 'created_at']
+    list_filter = ['is_active']
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
+
+@admin.register(ProfileRecord)
+class ProfileRecordAdmin(admin.ModelAdmin):
+    list_display = ['id', 'method', 'endpoint', 'release', 'duration_ms', 'sample_count', 'status_code', 'created_at']
+    list_filter = ['release', 'method']
+    search_fields = ['endpoint']
+    readonly_fields = ['endpoint', 'method', 'release', 'stacks', 'sample_count', 'duration_ms', 'status_code', 'created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
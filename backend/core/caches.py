@@ -0,0 +1,42 @@
+"""
+The cache every process shares.
+
+The ``default`` cache may be local to each worker. State that one process
+writes and others must read (cart summaries updated by web workers, the
+outbox worker and ``purge_carts``; catalog cache generations) goes through
+the ``shared`` alias instead. It defaults to a file-based cache, which every
+process on one host can see; deployments spread over several hosts point it
+at memcached or Redis.
+
+A process-local backend there would leave other workers serving stale data,
+so the ``core.E001`` check refuses to start with one when DEBUG is off.
+"""
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+SHARED = 'shared'
+
+
+def shared_cache():
+    return caches[SHARED]
+
+
+def is_shared():
+    """Whether writes to the shared cache are visible to other processes"""
+    return not isinstance(shared_cache(), (LocMemCache, DummyCache))
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs=None, **kwargs):
+    if SHARED not in settings.CACHES:
+        return [checks.Error(f"CACHES has no '{SHARED}' alias", id='core.E002')]
+    if is_shared():
+        return []
+    message = f"The '{SHARED}' cache ({settings.CACHES[SHARED]['BACKEND']}) is local to each process"
+    hint = 'Set SHARED_CACHE_BACKEND to a cache every worker can reach (file-based, memcached or Redis).'
+    if settings.DEBUG:
+        return [checks.Warning(message, hint=hint, id='core.W001')]
+    return [checks.Error(message, hint=hint, id='core.E001')]
@@ -0,0 +1,161 @@
+"""
+Request coalescing for hot read paths.
+
+``cached(key, compute, ttl, stale_ttl)`` returns a cached value, computing it
+at most once per key at a time:
+
+- Within a worker, concurrent misses for the same key share one in-flight
+  computation (single flight); the others wait for its result.
+- Entries are served fresh for ``ttl`` seconds and then stale for up to
+  ``stale_ttl`` more while a background thread recomputes them, so an expiry
+  never makes a request wait.
+- With COALESCE_LEASE_SECONDS set, a worker must take a lease in the shared
+  cache (``cache.add``) before rebuilding an entry. Workers that miss while
+  another holds the lease poll the cache for its result and only compute
+  themselves once the lease has run out.
+
+Values must be picklable. Exceptions (e.g. ``Http404``) reach every waiter
+and are not cached.
+
+Entries, leases and generations live in the shared cache (``core.caches``),
+so a ``bump`` from any process, the outbox worker included, reaches every
+worker's next read. If that cache is process-local (allowed with DEBUG on
+only) a bump reaches its own process alone, and other processes keep serving
+the old entry for up to ``ttl + stale_ttl`` seconds.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .caches import shared_cache
+
+logger = logging.getLogger(__name__)
+
+# How often a worker waiting on another worker's lease re-reads the cache
+LEASE_POLL_SECONDS = 0.05
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run one computation per key at a time in this process"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, compute):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            if not call.done.wait(settings.COALESCE_WAIT_SECONDS):
+                # The leader is stuck; don't let it hold up every request for this key
+                return compute()
+            if call.error is not None:
+                raise call.error
+            return call.value
+        try:
+            call.value = compute()
+            return call.value
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+
+_flights = SingleFlight()
+
+
+def _store(key, value, ttl, stale_ttl):
+    shared_cache().set(key, (time.time() + ttl, value), ttl + stale_ttl)
+    return value
+
+
+def _rebuild(key, compute, ttl, stale_ttl):
+    lease_seconds = settings.COALESCE_LEASE_SECONDS
+    if not lease_seconds:
+        return _store(key, compute(), ttl, stale_ttl)
+    cache = shared_cache()
+    lease = f'{key}:lease'
+    deadline = time.monotonic() + lease_seconds
+    while not cache.add(lease, 1, lease_seconds):
+        # Another worker is rebuilding; use its result once it lands
+        entry = cache.get(key)
+        if entry is not None and entry[0] > time.time():
+            return entry[1]
+        if time.monotonic() >= deadline:
+            return _store(key, compute(), ttl, stale_ttl)
+        time.sleep(LEASE_POLL_SECONDS)
+    try:
+        return _store(key, compute(), ttl, stale_ttl)
+    finally:
+        cache.delete(lease)
+
+
+def _refresh_in_background(key, compute, ttl, stale_ttl):
+    def refresh():
+        try:
+            _flights.do(key, lambda: _rebuild(key, compute, ttl, stale_ttl))
+        except Exception:
+            logger.exception('Background refresh of %s failed', key)
+        finally:
+            connection.close()
+
+    if not _flights.in_flight(key):
+        threading.Thread(target=refresh, name='coalesce-refresh', daemon=True).start()
+
+
+def cached(key, compute, ttl, stale_ttl=0):
+    """Return the cached value for ``key``, computing it with ``compute()`` once when needed"""
+    if ttl <= 0:
+        return compute()
+    entry = shared_cache().get(key)
+    if entry is not None:
+        fresh_until, value = entry
+        if fresh_until <= time.time():
+            _refresh_in_background(key, compute, ttl, stale_ttl)
+        return value
+    return _flights.do(key, lambda: _rebuild(key, compute, ttl, stale_ttl))
+
+
+def _fresh_generation():
+    # Never a value used before, so a generation lost to culling or eviction
+    # can't bring back entries cached under an older one
+    return time.time_ns()
+
+
+def generation(name):
+    """Current generation of ``name``; put it in cache keys to invalidate them with ``bump``"""
+    cache = shared_cache()
+    key = f'generation:{name}'
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _fresh_generation(), None)
+        value = cache.get(key)
+    return value
+
+
+def bump(name):
+    cache = shared_cache()
+    try:
+        cache.incr(f'generation:{name}')
+    except ValueError:
+        cache.add(f'generation:{name}', _fresh_generation(), None)
@@ -0,0 +1,386 @@
+"""
+Synthetic dataset generator behind the ``generate_dataset`` command.
+
+Builds production-shaped data for performance work: sellers whose catalog
+sizes follow a Zipf distribution, products with image galleries, buyers,
+a long order history whose lines favour a Zipf-distributed set of best
+sellers, and live carts. Every phase (and every batch of orders) draws from
+its own ``random.Random`` derived from ``seed`` and timestamps are anchored
+to ``end_date``, so the same arguments always produce the same rows, however
+many processes insert them.
+
+Rows are written with ``bulk_create`` in batches, one transaction per batch,
+with user, product and order ids assigned here so child rows can be built
+without reading ids back; sequences are reset afterwards. Other shortcuts:
+
+- every generated user shares one unusable password hash, so no per-user
+  hashing is done;
+- gallery images point at a few placeholder PNGs, each written (through the
+  content-addressed storage) the first time a product uses it;
+- ``created_at``/``updated_at`` are spread over the history window by
+  turning off ``auto_now``/``auto_now_add`` while rows are inserted;
+- the order history is drawn twice: a first pass with no database work
+  tallies sales counters so products are inserted with them, and the second
+  pass writes the orders, optionally from several forked processes.
+
+Save signals don't fire for bulk inserts, so the autocomplete index and
+related-product neighbours are not updated; rebuild them afterwards. Each
+product batch is stamped with its own change feed value, so feed consumers
+pick the new products up.
+"""
+import io
+import itertools
+import math
+import multiprocessing
+import random
+from array import array
+from bisect import bisect
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from orders.models import Cart, CartItem, Fulfilment, Order, OrderItem
+from products import changes, popularity
+from products.models import Product, ProductImage, Store
+from .models import MediaBlob
+
+User = get_user_model()
+
+PLACEHOLDER_COLOURS = [
+    (230, 57, 70), (241, 250, 238), (168, 218, 220), (69, 123, 157),
+    (29, 53, 87), (244, 162, 97), (42, 157, 143), (233, 196, 106),
+]
+WORDS = [
+    'Classic', 'Organic', 'Wireless', 'Compact', 'Deluxe', 'Handmade', 'Smart', 'Vintage',
+    'Portable', 'Premium', 'Eco', 'Ultra', 'Mini', 'Pro', 'Travel', 'Family',
+]
+NOUNS = [
+    'Mug', 'Lamp', 'Backpack', 'Headphones', 'Notebook', 'Blender', 'Jacket', 'Candle',
+    'Speaker', 'Bottle', 'Chair', 'Watch', 'Keyboard', 'Scarf', 'Teapot', 'Charger',
+]
+FULFILMENT_STATUSES = ['pending', 'confirmed', 'processing', 'shipped', 'delivered', 'cancelled']
+FULFILMENT_WEIGHTS = [4, 4, 4, 10, 74, 4]
+MAX_LINES = 50
+
+
+@dataclass
+class Spec:
+    sellers: int = 1000
+    seller_skew: float = 1.1
+    products: int = 100000
+    max_images: int = 4
+    buyers: int = 50000
+    orders: int = 200000
+    lines_per_order: float = 3.0
+    product_skew: float = 1.0
+    carts: int = 10000
+    lines_per_cart: float = 2.0
+    days: int = 365
+    end_date: str = ''  # ISO date the history runs up to; defaults to today
+    seed: int = 42
+    batch_size: int = 5000
+    jobs: int = 1
+    prefix: str = 'ds'
+
+
+class ZipfSampler:
+    """Draw 0..n-1 with probability proportional to 1 / (rank + 1) ** skew"""
+
+    def __init__(self, n, skew, rng):
+        self.cumulative = list(itertools.accumulate(1 / (rank + 1) ** skew for rank in range(n)))
+        self.total = self.cumulative[-1]
+        # Shuffle which item gets which rank so the head isn't simply the lowest ids
+        self.items = list(range(n))
+        rng.shuffle(self.items)
+
+    def draw(self, rng):
+        return self.items[bisect(self.cumulative, rng.random() * self.total)]
+
+
+def _count(rng, mean):
+    """At least one, geometrically distributed around ``mean``"""
+    if mean <= 1:
+        return 1
+    return min(MAX_LINES, 1 + int(math.log(1 - rng.random()) / math.log(1 - 1 / mean)))
+
+
+def _next_id(model):
+    return (model.objects.aggregate(top=Max('id'))['top'] or 0) + 1
+
+
+@contextmanager
+def _explicit_timestamps(*models):
+    """Let bulk inserts keep the created/updated times they were given"""
+    fields = [field for model in models for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+_generator = None
+
+
+def _insert_order_chunk(chunk):
+    # Runs in a forked worker with --jobs; the generator is inherited, not pickled
+    with _explicit_timestamps(Order, Fulfilment):
+        return _generator.insert_order_chunk(chunk)
+
+
+class Generator:
+    def __init__(self, spec, log=lambda message: None):
+        self.spec = spec
+        self.log = log
+        end = date.fromisoformat(spec.end_date) if spec.end_date else timezone.now().date()
+        # Timestamps are anchored to midnight so reruns produce identical rows
+        self.now = datetime.combine(end, time.min, tzinfo=dt_timezone.utc)
+        self.start = self.now - timedelta(days=spec.days)
+        self.password = make_password(None)
+        self.placeholders = {}
+        self.placeholder_refs = {}
+
+    def _rng(self, *parts):
+        # String seeds are hashed with SHA-512, so these are stable across runs and processes
+        return random.Random(':'.join(map(str, (self.spec.seed, *parts))))
+
+    def _when(self, rng, after=None):
+        start = after or self.start
+        return start + (self.now - start) * rng.random()
+
+    def _batches(self, count):
+        for offset in range(0, count, self.spec.batch_size):
+            yield offset, min(self.spec.batch_size, count - offset)
+
+    def _placeholder(self, variant):
+        if variant not in self.placeholders:
+            from PIL import Image
+            buffer = io.BytesIO()
+            Image.new('RGB', (64, 64), PLACEHOLDER_COLOURS[variant]).save(buffer, 'PNG')
+            self.placeholders[variant] = default_storage.save(
+                f'products/gallery/placeholder-{variant}.png', ContentFile(buffer.getvalue())
+            )
+        name = self.placeholders[variant]
+        self.placeholder_refs[name] = self.placeholder_refs.get(name, 0) + 1
+        return name
+
+    def users(self):
+        spec = self.spec
+        rng = self._rng('users')
+        first_id = _next_id(User)
+        self.seller_names = {}
+        self.seller_ids = range(first_id, first_id + spec.sellers)
+        self.buyer_ids = range(first_id + spec.sellers, first_id + spec.sellers + spec.buyers)
+        with _explicit_timestamps(User):
+            for offset, size in self._batches(spec.sellers + spec.buyers):
+                rows = []
+                for user_id in range(first_id + offset, first_id + offset + size):
+                    is_seller = user_id in self.seller_ids
+                    role = 'seller' if is_seller else 'buyer'
+                    joined = self._when(rng)
+                    first_name, last_name = rng.choice(WORDS), f'{role.title()} {user_id}'
+                    if is_seller:
+                        self.seller_names[user_id] = f'{first_name} {last_name}'
+                    rows.append(User(
+                        id=user_id, email=f'{spec.prefix}-{role}-{user_id}@example.com',
+                        username=f'{spec.prefix}-{role}-{user_id}', password=self.password,
+                        first_name=first_name, last_name=last_name,
+                        is_seller=is_seller, date_joined=joined, created_at=joined, updated_at=joined,
+                    ))
+                with transaction.atomic():
+                    User.objects.bulk_create(rows)
+        self.log(f'{spec.sellers} sellers, {spec.buyers} buyers')
+
+    def stores(self):
+        spec = self.spec
+        rng = self._rng('stores')
+        self.store_names = {}
+        rows = []
+        for seller_id in self.seller_ids:
+            name = f'{rng.choice(WORDS)} {rng.choice(NOUNS)}s {seller_id}'
+            self.store_names[seller_id] = name
+            rows.append(Store(seller_id=seller_id, name=name, slug=f'{spec.prefix}-store-{seller_id}',
+                              created_at=self.start, updated_at=self.start))
+        with _explicit_timestamps(Store):
+            for offset, size in self._batches(len(rows)):
+                with transaction.atomic():
+                    Store.objects.bulk_create(rows[offset:offset + size])
+
+    def order_draws(self, chunk):
+        """The orders of one batch as (id, created, buyer id, [(product offset, quantity)])"""
+        rng = self._rng('orders', chunk)
+        first = chunk * self.spec.batch_size
+        for order_id in range(self.first_order_id + first,
+                              self.first_order_id + min(first + self.spec.batch_size, self.spec.orders)):
+            created = self._when(rng)
+            buyer_id = rng.choice(self.buyer_ids)
+            offsets = sorted({self.popularity.draw(rng) for _ in range(_count(rng, self.spec.lines_per_order))})
+            lines = [(offset, 1 if rng.random() < 0.8 else rng.randint(2, 5)) for offset in offsets]
+            yield order_id, created, buyer_id, lines
+
+    def plan_orders(self):
+        """Tally sales counters over the whole history without touching the database"""
+        spec = self.spec
+        self.first_order_id = _next_id(Order)
+        self.popularity = ZipfSampler(spec.products, spec.product_skew, self._rng('popularity'))
+        self.order_chunks = math.ceil(spec.orders / spec.batch_size)
+        self.units = array('l', bytes(8 * spec.products))
+        self.order_counts = array('l', bytes(8 * spec.products))
+        self.scores = array('d', bytes(8 * spec.products))
+        lines = 0
+        for chunk in range(self.order_chunks):
+            for _, created, _, order_lines in self.order_draws(chunk):
+                weight = popularity.weight(created)
+                for offset, quantity in order_lines:
+                    self.units[offset] += quantity
+                    self.order_counts[offset] += 1
+                    self.scores[offset] += quantity * weight
+                lines += len(order_lines)
+        self.log(f'planned {spec.orders} orders with {lines} lines')
+
+    def products(self):
+        spec = self.spec
+        rng = self._rng('products')
+        sellers = ZipfSampler(spec.sellers, spec.seller_skew, self._rng('sellers'))
+        first_id = _next_id(Product)
+        self.product_ids = range(first_id, first_id + spec.products)
+        self.prices = array('l')  # Cents, by product offset
+        self.product_sellers = array('l')
+        with _explicit_timestamps(Product, ProductImage):
+            for offset, size in self._batches(spec.products):
+                products, gallery = [], []
+                for product_offset in range(offset, offset + size):
+                    product_id = first_id + product_offset
+                    seller_id = self.seller_ids[sellers.draw(rng)]
+                    cents = max(99, int(math.exp(rng.gauss(7.5, 1.0))))
+                    created = self._when(rng)
+                    self.prices.append(cents)
+                    self.product_sellers.append(seller_id)
+                    products.append(Product(
+                        id=product_id, name=f'{rng.choice(WORDS)} {rng.choice(NOUNS)} {product_id}',
+                        description=f'Generated product {product_id}', price=Decimal(cents).scaleb(-2),
+                        stock=rng.randint(0, 500), seller_id=seller_id, sku=f'SKU-{product_id}',
+                        store_display_name=self.store_names[seller_id],
+                        seller_display_name=self.seller_names[seller_id],
+                        units_sold=self.units[product_offset], order_count=self.order_counts[product_offset],
+                        trending_score=self.scores[product_offset], created_at=created, updated_at=created,
+                    ))
+                    for position in range(rng.randint(0, spec.max_images)):
+                        gallery.append(ProductImage(
+                            product_id=product_id, order=position, created_at=created,
+                            image=self._placeholder(rng.randrange(len(PLACEHOLDER_COLOURS))),
+                        ))
+                with transaction.atomic():
+                    # One change feed value per batch, taken in the batch's transaction like any bulk write
+                    change_seq = changes.stamp()
+                    for product in products:
+                        product.change_seq = change_seq
+                    Product.objects.bulk_create(products)
+                    ProductImage.objects.bulk_create(gallery)
+                self.log(f'products {offset + size}/{spec.products}')
+        for name, count in self.placeholder_refs.items():
+            if not MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + count):
+                MediaBlob.objects.create(name=name, refcount=count, size=default_storage.size(name))
+        self.log(f'{spec.products} products, {sum(self.placeholder_refs.values())} images')
+
+    def insert_order_chunk(self, chunk):
+        statuses = self._rng('fulfilments', chunk)
+        orders, items, fulfilments = [], [], []
+        for order_id, created, buyer_id, lines in self.order_draws(chunk):
+            total = 0
+            sellers = set()
+            for offset, quantity in lines:
+                cents = self.prices[offset]
+                total += cents * quantity
+                sellers.add(self.product_sellers[offset])
+                items.append(OrderItem(order_id=order_id, product_id=self.product_ids[offset],
+                                       quantity=quantity, price_at_time=Decimal(cents).scaleb(-2)))
+            orders.append(Order(id=order_id, buyer_id=buyer_id, total_amount=Decimal(total).scaleb(-2),
+                                shipping_address=f'{order_id} Generated Street',
+                                created_at=created, updated_at=created))
+            fulfilments.extend(
+                Fulfilment(order_id=order_id, seller_id=seller_id, created_at=created, updated_at=created,
+                           status=statuses.choices(FULFILMENT_STATUSES, FULFILMENT_WEIGHTS)[0])
+                for seller_id in sorted(sellers)
+            )
+        with transaction.atomic():
+            Order.objects.bulk_create(orders)
+            OrderItem.objects.bulk_create(items)
+            Fulfilment.objects.bulk_create(fulfilments)
+        return len(items)
+
+    def orders(self):
+        global _generator
+        spec = self.spec
+        _generator = self
+        chunks = range(self.order_chunks)
+        if spec.jobs > 1:
+            # Forked workers must open their own database connections
+            connections.close_all()
+            with ProcessPoolExecutor(spec.jobs, mp_context=multiprocessing.get_context('fork')) as executor:
+                results = executor.map(_insert_order_chunk, chunks)
+                self._log_orders(results)
+        else:
+            self._log_orders(map(_insert_order_chunk, chunks))
+
+    def _log_orders(self, results):
+        lines = 0
+        for chunk, count in enumerate(results):
+            lines += count
+            done = min((chunk + 1) * self.spec.batch_size, self.spec.orders)
+            self.log(f'orders {done}/{self.spec.orders} ({lines} lines)')
+
+    def carts(self):
+        spec = self.spec
+        rng = self._rng('carts')
+        first_cart_id = _next_id(Cart)
+        # Live carts were touched recently; a tail is old enough for purge_carts
+        recent = self.now - timedelta(days=min(spec.days, 60))
+        owners = rng.sample(self.buyer_ids, min(spec.carts, len(self.buyer_ids)))
+        with _explicit_timestamps(Cart, CartItem):
+            for offset, size in self._batches(len(owners)):
+                carts, items = [], []
+                for index, user_id in enumerate(owners[offset:offset + size]):
+                    cart_id = first_cart_id + offset + index
+                    touched = self._when(rng, after=recent)
+                    carts.append(Cart(id=cart_id, user_id=user_id, created_at=touched, updated_at=touched))
+                    offsets = {self.popularity.draw(rng) for _ in range(_count(rng, spec.lines_per_cart))}
+                    items.extend(
+                        CartItem(cart_id=cart_id, product_id=self.product_ids[product_offset],
+                                 quantity=rng.randint(1, 3), added_at=touched)
+                        for product_offset in sorted(offsets)
+                    )
+                with transaction.atomic():
+                    Cart.objects.bulk_create(carts)
+                    CartItem.objects.bulk_create(items)
+        self.log(f'{len(owners)} carts')
+
+    def reset_sequences(self):
+        models = [User, Store, Product, ProductImage, Order, OrderItem, Fulfilment, Cart, CartItem]
+        with connection.cursor() as cursor:
+            for statement in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(statement)
+
+    def run(self):
+        self.users()
+        self.stores()
+        self.plan_orders()
+        self.products()
+        self.orders()
+        self.carts()
+        self.reset_sequences()
@@ -0,0 +1,131 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter per sample so every number is a true cold start
+CHILD = r'''
+import json, os, statistics, time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+imported = time.perf_counter()
+application = get_wsgi_application()
+ready = time.perf_counter()
+warmup = {}
+if os.environ['BENCH_WARMUP'] == '1':
+    from core import warmup as hooks
+    warmup = hooks.run()
+    warmup.update(hooks.run_in_process())
+warmed = time.perf_counter()
+
+
+def request(url):
+    path, _, query = url.partition('?')
+    environ = {'PATH_INFO': path, 'QUERY_STRING': query, 'HTTP_HOST': 'localhost', 'wsgi.input': BytesIO()}
+    if os.environ.get('BENCH_TOKEN'):
+        environ['HTTP_AUTHORIZATION'] = 'Bearer ' + os.environ['BENCH_TOKEN']
+    setup_testing_defaults(environ)
+    status = []
+    begin = time.perf_counter()
+    body = application(environ, lambda s, headers, exc_info=None: status.append(s))
+    try:
+        for _ in body:
+            pass
+    finally:
+        getattr(body, 'close', lambda: None)()
+    return (time.perf_counter() - begin) * 1000, int(status[0].split()[0])
+
+
+url = os.environ['BENCH_URL']
+first_ms, status = request(url)
+warm = [request(url)[0] for _ in range(int(os.environ['BENCH_REPEAT']))]
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'setup_ms': (ready - imported) * 1000,
+    'warmup_ms': (warmed - ready) * 1000,
+    'warmup_steps': warmup,
+    'first_ms': first_ms,
+    'warm_ms': statistics.median(warm) if warm else None,
+    'status': status,
+}))
+'''
+
+DEFAULT_ENDPOINTS = ['/api/products/', '/api/products/autocomplete/?q=a']
+AUTHENTICATED_ENDPOINTS = ['/api/orders/cart/', '/api/orders/buyer/', '/api/auth/profile/']
+
+
+class Command(BaseCommand):
+    help = 'Measure worker cold start: import time, warm-up and time-to-first-response per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='Path to request, repeatable (default: catalog endpoints)')
+        parser.add_argument('--user', help='Email of a user to authenticate as; adds cart/order endpoints')
+        parser.add_argument('--runs', type=int, default=5, help='Fresh processes per endpoint')
+        parser.add_argument('--repeat', type=int, default=5, help='Warm requests after the first one')
+        parser.add_argument('--no-warmup', action='store_true', help='Skip core.warmup, to compare')
+        parser.add_argument('--json', action='store_true', help='Print raw results as JSON')
+
+    def handle(self, *args, **options):
+        endpoints = options['endpoints'] or list(DEFAULT_ENDPOINTS)
+        env = dict(os.environ, BENCH_REPEAT=str(options['repeat']),
+                   BENCH_WARMUP='0' if options['no_warmup'] else '1',
+                   DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'cart_builder.settings'))
+        if options['user']:
+            from rest_framework_simplejwt.tokens import AccessToken
+            try:
+                user = get_user_model().objects.get(email=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user with email {options['user']}")
+            env['BENCH_TOKEN'] = str(AccessToken.for_user(user))
+            if not options['endpoints']:
+                endpoints += AUTHENTICATED_ENDPOINTS
+
+        results = {}
+        for endpoint in endpoints:
+            samples = []
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                proc = subprocess.run(
+                    [sys.executable, '-c', CHILD], cwd=settings.BASE_DIR,
+                    env=dict(env, BENCH_URL=endpoint), capture_output=True, text=True,
+                )
+                total_ms = (time.perf_counter() - started) * 1000
+                if proc.returncode:
+                    raise CommandError(f'{endpoint} failed:\n{proc.stderr}')
+                sample = json.loads(proc.stdout.strip().splitlines()[-1])
+                sample['process_ms'] = total_ms
+                samples.append(sample)
+            results[endpoint] = samples
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self._report(results)
+
+    def _report(self, results):
+        columns = ['import_ms', 'setup_ms', 'warmup_ms', 'first_ms', 'warm_ms', 'process_ms']
+        self.stdout.write('median over runs, milliseconds')
+        self.stdout.write(f"{'endpoint':<40} {'status':>6} " + ' '.join(f'{c[:-3]:>9}' for c in columns))
+        for endpoint, samples in results.items():
+            medians = [statistics.median(s[c] or 0 for s in samples) for c in columns]
+            self.stdout.write(f'{endpoint:<40} {samples[0]["status"]:>6} '
+                              + ' '.join(f'{m:9.1f}' for m in medians))
+
+        steps = {}
+        for samples in results.values():
+            for sample in samples:
+                for name, ms in sample['warmup_steps'].items():
+                    steps.setdefault(name, []).append(ms)
+        if steps:
+            self.stdout.write('warm-up steps: ' + ', '.join(
+                f'{name} {statistics.median(ms):.1f}' for name, ms in steps.items()))
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import MediaBlob
+
+
+class Command(BaseCommand):
+    help = 'Delete content-addressed media files that no model references any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=int, default=settings.MEDIA_GC_GRACE_HOURS,
+                            help='Only collect files unreferenced for at least this long')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        removed = freed = 0
+        while True:
+            # Files are deleted while their rows are locked, so an upload of the same bytes
+            # (which touches the row first, see core/storage.py) waits and then rewrites them
+            with transaction.atomic():
+                blobs = list(
+                    MediaBlob.objects.select_for_update(skip_locked=True)
+                    .filter(refcount=0, updated_at__lt=cutoff)
+                    .order_by('id')[:options['batch_size']]
+                )
+                if not blobs:
+                    break
+                for blob in blobs:
+                    if not options['dry_run']:
+                        default_storage.delete(blob.name)
+                    removed += 1
+                    freed += blob.size
+                if options['dry_run']:
+                    break
+                MediaBlob.objects.filter(id__in=[blob.id for blob in blobs]).delete()
+
+        prefix = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(f'{prefix} {removed} files ({freed} bytes)'))
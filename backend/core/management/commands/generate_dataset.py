@@ -0,0 +1,58 @@
+import time
+from dataclasses import fields
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.dataset import Generator, Spec
+
+HELP = {
+    'sellers': 'Seller accounts, each with a store',
+    'seller_skew': 'Zipf exponent of catalog size per seller (0 = even)',
+    'products': 'Products across all sellers',
+    'max_images': 'Gallery images per product are uniform in 0..N',
+    'buyers': 'Buyer accounts',
+    'orders': 'Orders in the history',
+    'lines_per_order': 'Mean order lines per order (geometric)',
+    'product_skew': 'Zipf exponent of product popularity in orders and carts',
+    'carts': 'Live carts, one per buyer',
+    'lines_per_cart': 'Mean lines per cart (geometric)',
+    'days': 'Length of the history window',
+    'end_date': 'Last day of the history (YYYY-MM-DD); defaults to today',
+    'seed': 'Random seed; the same arguments always generate the same data',
+    'batch_size': 'Rows per bulk insert and transaction',
+    'jobs': 'Processes inserting orders in parallel (use 1 on SQLite)',
+    'prefix': 'Prefix of generated emails, usernames and store slugs',
+}
+
+
+class Command(BaseCommand):
+    help = ('Generate a deterministic synthetic catalog, order history and live carts for performance testing, '
+            'e.g. --products 1000000 --orders 3000000 for about 10M order lines')
+
+    def add_arguments(self, parser):
+        for field in fields(Spec):
+            parser.add_argument(f"--{field.name.replace('_', '-')}", type=field.type, default=field.default,
+                                help=HELP[field.name])
+        parser.add_argument('--force', action='store_true',
+                            help='Allow running with DEBUG off')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('This writes a large amount of fake data; use --force to run with DEBUG off')
+        spec = Spec(**{field.name: options[field.name] for field in fields(Spec)})
+        if spec.sellers < 1 or spec.products < 1 or spec.buyers < 1:
+            raise CommandError('Need at least one seller, product and buyer')
+
+        started = time.monotonic()
+        verbosity = options['verbosity']
+
+        def log(message):
+            if verbosity > 1 or not message.startswith(('products ', 'orders ')):
+                self.stdout.write(f'[{time.monotonic() - started:7.1f}s] {message}')
+
+        Generator(spec, log).run()
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated dataset (seed {spec.seed}) in {time.monotonic() - started:.1f}s; '
+            f'run build_recommendations and restart workers to rebuild in-memory indexes'
+        ))
@@ -0,0 +1,91 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from core.models import ProfileRecord
+
+
+def merged_stacks(release, endpoint=None):
+    records = ProfileRecord.objects.filter(release=release)
+    if endpoint:
+        records = records.filter(endpoint=endpoint)
+    stacks = Counter()
+    count = 0
+    for record_stacks in records.values_list('stacks', flat=True).iterator(chunk_size=200):
+        stacks.update(record_stacks)
+        count += 1
+    return stacks, count
+
+
+def self_time(stacks):
+    """Samples per leaf frame, the function actually on CPU"""
+    leaves = Counter()
+    for stack, samples in stacks.items():
+        leaves[stack.rsplit(';', 1)[-1]] += samples
+    return leaves
+
+
+class Command(BaseCommand):
+    help = 'Aggregate sampled request profiles into collapsed stacks or diff two releases'
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='action', required=True)
+
+        aggregate = subparsers.add_parser('aggregate', help='Merge profiles into one collapsed-stack file')
+        aggregate.add_argument('--release', required=True)
+        aggregate.add_argument('--endpoint', help='URL name, e.g. orders:seller_orders or seller_orders')
+        aggregate.add_argument('--output', help='Write collapsed stacks here instead of stdout')
+
+        diff = subparsers.add_parser('diff', help='Compare self time per frame between two releases')
+        diff.add_argument('--base', required=True, help='Baseline release')
+        diff.add_argument('--target', required=True, help='Release to compare')
+        diff.add_argument('--endpoint')
+        diff.add_argument('--limit', type=int, default=25)
+
+        subparsers.add_parser('endpoints', help='List profiled endpoints per release')
+
+    def handle(self, *args, **options):
+        getattr(self, f"handle_{options['action']}")(options)
+
+    def handle_aggregate(self, options):
+        stacks, count = merged_stacks(options['release'], options['endpoint'])
+        if not count:
+            raise CommandError('No profiles match')
+        lines = [f'{stack} {samples}' for stack, samples in stacks.most_common()]
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write('\n'.join(lines) + '\n')
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {len(lines)} stacks from {count} requests to {options['output']}"
+            ))
+        else:
+            self.stdout.write('\n'.join(lines))
+
+    def handle_diff(self, options):
+        base, base_count = merged_stacks(options['base'], options['endpoint'])
+        target, target_count = merged_stacks(options['target'], options['endpoint'])
+        if not base_count or not target_count:
+            raise CommandError('Both releases need at least one matching profile')
+
+        # Compare shares of total samples so releases with different traffic line up
+        base_self, target_self = self_time(base), self_time(target)
+        base_total, target_total = sum(base.values()), sum(target.values())
+        changes = []
+        for frame in set(base_self) | set(target_self):
+            before = base_self[frame] / base_total * 100
+            after = target_self[frame] / target_total * 100
+            changes.append((after - before, before, after, frame))
+        changes.sort(key=lambda change: abs(change[0]), reverse=True)
+
+        self.stdout.write(f"{options['base']}: {base_count} requests, {base_total} samples")
+        self.stdout.write(f"{options['target']}: {target_count} requests, {target_total} samples")
+        self.stdout.write(f"{'delta':>8} {'base':>7} {'target':>7}  frame")
+        for delta, before, after, frame in changes[:options['limit']]:
+            self.stdout.write(f'{delta:+7.2f}% {before:6.2f}% {after:6.2f}%  {frame}')
+
+    def handle_endpoints(self, options):
+        rows = (ProfileRecord.objects.values('release', 'endpoint')
+                .annotate(requests=Count('id')).order_by('release', 'endpoint'))
+        for row in rows:
+            self.stdout.write(f"{row['release']}\t{row['endpoint']}\t{row['requests']}")
@@ -0,0 +1,43 @@
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import outbox
+
+
+class Command(BaseCommand):
+    help = 'Process transactional outbox events with a local worker pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.OUTBOX_WORKERS,
+                            help='Number of worker threads')
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE,
+                            help='Events claimed per batch')
+        parser.add_argument('--poll-interval', type=float, default=settings.OUTBOX_POLL_INTERVAL,
+                            help='Seconds to sleep when no events are due')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain due events and exit')
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        if options['once']:
+            processed = outbox.drain(options['workers'], options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Processed {processed} events'))
+            return
+
+        self.stdout.write(f"Outbox worker started with {options['workers']} threads")
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while self.running:
+                count = outbox.process_batch(executor, options['batch_size'])
+                if not count:
+                    time.sleep(options['poll_interval'])
+        self.stdout.write('Outbox worker stopped')
+
+    def stop(self, signum, frame):
+        self.running = False
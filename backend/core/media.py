@@ -0,0 +1,36 @@
+"""Reference counting for content-addressed media files"""
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import MediaBlob
+from .storage import is_content_addressed
+
+
+def retain(name):
+    """Record one more model reference to a stored file"""
+    if not is_content_addressed(name):
+        return
+    with transaction.atomic():
+        if MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + 1):
+            return
+        try:
+            with transaction.atomic():
+                MediaBlob.objects.create(name=name, refcount=1, size=_size(name))
+        except IntegrityError:
+            MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + 1)
+
+
+def release(name):
+    """Drop one model reference; unreferenced files are collected by gc_media"""
+    if not is_content_addressed(name):
+        return
+    MediaBlob.objects.filter(name=name, refcount__gt=0).update(refcount=F('refcount') - 1)
+
+
+def _size(name):
+    try:
+        return default_storage.size(name)
+    except OSError:
+        return 0
+
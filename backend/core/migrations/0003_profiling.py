@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_mediablob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(max_length=200)),
+                ('method', models.CharField(max_length=10)),
+                ('release', models.CharField(max_length=100)),
+                ('stacks', models.JSONField(default=dict)),
+                ('sample_count', models.PositiveIntegerField(default=0)),
+                ('duration_ms', models.FloatField(default=0)),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'profile_records',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['release', 'endpoint'], name='profile_rec_release_28107f_idx'), models.Index(fields=['-created_at'], name='profile_rec_created_a8a494_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProfilingRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path_prefix', models.CharField(blank=True, help_text='Empty matches every path', max_length=200)),
+                ('sample_rate', models.FloatField(default=0.01, help_text='Fraction of matching requests to profile (0-1)')),
+                ('is_active', models.BooleanField(default=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, help_text='Empty matches every user', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'profiling_rules',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
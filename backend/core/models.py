@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+class OutboxEvent(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('dead', 'Dead'),
+    ]
+
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)  # Earliest time a worker may claim the event
+    locked_until = models.DateTimeField(blank=True, null=True)  # Lease held by the claiming worker
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'outbox_events'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+            models.Index(fields=['event_type', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.id} ({self.status})"
+
+class MediaBlob(models.Model):
+    """Reference count of a content-addressed media file"""
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'media_blobs'
+        indexes = [
+            models.Index(fields=['refcount', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} refs)"
+
+class ProfilingRule(models.Model):
+    """Admin-controlled selector for requests to run under the sampling profiler"""
+    path_prefix = models.CharField(max_length=200, blank=True, help_text='Empty matches every path')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, blank=True, null=True,
+                             related_name='+', help_text='Empty matches every user')
+    sample_rate = models.FloatField(default=0.01, help_text='Fraction of matching requests to profile (0-1)')
+    is_active = models.BooleanField(default=True)
+    expires_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'profiling_rules'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.path_prefix or '*'} @ {self.sample_rate:.2%}"
+
+class ProfileRecord(models.Model):
+    """Collapsed stacks (``frame;frame;frame -> samples``) from one profiled request"""
+    endpoint = models.CharField(max_length=200)
+    method = models.CharField(max_length=10)
+    release = models.CharField(max_length=100)
+    stacks = models.JSONField(default=dict)
+    sample_count = models.PositiveIntegerField(default=0)
+    duration_ms = models.FloatField(default=0)
+    status_code = models.PositiveSmallIntegerField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'profile_records'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['release', 'endpoint']),
+            models.Index(fields=['-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.endpoint} ({self.release})"
+
+class Sequence(models.Model):
+    """Named counter handing out monotonic values, see core/sequences.py"""
+    name = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'sequences'
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
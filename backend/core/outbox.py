@@ -0,0 +1,152 @@
+"""
+Transactional outbox.
+
+Request handlers call ``publish()`` inside their own ``transaction.atomic()``
+block, so an event row is committed if and only if the business change is.
+Side effects (emails, seller notifications, analytics) run later in the
+``run_outbox_worker`` management command, never on the request path.
+
+Delivery is at-least-once: a handler may run again after a crash or a
+failed acknowledgement, so handlers should be safe to repeat.
+"""
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+def register(event_type):
+    """Register the handler for an event type (one handler per type)"""
+    def decorator(func):
+        _handlers[event_type] = func
+        return func
+    return decorator
+
+
+def get_handler(event_type):
+    return _handlers.get(event_type)
+
+
+def publish(event_type, payload=None, delay=None):
+    """Write an event row in the caller's transaction"""
+    available_at = timezone.now() + delay if delay else timezone.now()
+    return OutboxEvent.objects.create(
+        event_type=event_type,
+        payload=payload or {},
+        available_at=available_at,
+    )
+
+
+def publish_many(events):
+    """Write several ``(event_type, payload)`` rows with a single INSERT"""
+    now = timezone.now()
+    return OutboxEvent.objects.bulk_create([
+        OutboxEvent(event_type=event_type, payload=payload or {}, available_at=now)
+        for event_type, payload in events
+    ])
+
+
+def claim_batch(batch_size=None, lease_seconds=None):
+    """
+    Lease up to ``batch_size`` due events to the calling worker.
+
+    Pending events and events whose lease expired (a worker died mid-batch)
+    are both eligible. On databases that support it the rows are locked with
+    SKIP LOCKED so concurrent workers never claim the same event.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    lease_seconds = lease_seconds or settings.OUTBOX_LEASE_SECONDS
+    now = timezone.now()
+
+    with transaction.atomic():
+        ids = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status='pending', available_at__lte=now) |
+                Q(status='processing', locked_until__lt=now)
+            )
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        OutboxEvent.objects.filter(id__in=ids).update(
+            status='processing',
+            locked_until=now + timedelta(seconds=lease_seconds),
+            attempts=F('attempts') + 1,
+        )
+    return list(OutboxEvent.objects.filter(id__in=ids).order_by('id'))
+
+
+def retry_delay(attempts):
+    """Exponential backoff capped at OUTBOX_MAX_BACKOFF_SECONDS"""
+    return timedelta(seconds=min(2 ** attempts, settings.OUTBOX_MAX_BACKOFF_SECONDS))
+
+
+def process_event(event, max_attempts=None):
+    """Run the handler for one claimed event and record the outcome"""
+    max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+    close_old_connections()
+    try:
+        handler = get_handler(event.event_type)
+        with transaction.atomic():
+            if handler is None:
+                logger.debug('No handler registered for %s', event.event_type)
+            else:
+                # Events published by the handler commit together with the ack
+                handler(event.payload)
+            OutboxEvent.objects.filter(id=event.id).update(
+                status='done',
+                locked_until=None,
+                processed_at=timezone.now(),
+                last_error='',
+            )
+        return True
+    except Exception:
+        error = traceback.format_exc()
+        if event.attempts >= max_attempts:
+            logger.error('Outbox event %s dead-lettered after %s attempts', event.id, event.attempts)
+            OutboxEvent.objects.filter(id=event.id).update(
+                status='dead', locked_until=None, last_error=error,
+            )
+        else:
+            logger.warning('Outbox event %s failed (attempt %s), retrying', event.id, event.attempts)
+            OutboxEvent.objects.filter(id=event.id).update(
+                status='pending',
+                locked_until=None,
+                available_at=timezone.now() + retry_delay(event.attempts),
+                last_error=error,
+            )
+        return False
+    finally:
+        close_old_connections()
+
+
+def process_batch(executor, batch_size=None, max_attempts=None):
+    """Claim one batch and fan it out over the worker pool; returns the batch size"""
+    events = claim_batch(batch_size)
+    if events:
+        list(executor.map(lambda event: process_event(event, max_attempts), events))
+    return len(events)
+
+
+def drain(workers=1, batch_size=None):
+    """Process events until none are due (used by tests and one-shot runs)"""
+    processed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            count = process_batch(executor, batch_size)
+            if not count:
+                return processed
+            processed += count
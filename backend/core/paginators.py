@@ -0,0 +1,33 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts the planner's row estimate for unfiltered querysets
+    on large PostgreSQL tables instead of running ``SELECT COUNT(*)``.
+
+    Filtered querysets, small tables and other databases use an exact count.
+    """
+    exact_count_threshold = 10000
+
+    def _estimated_count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql' or queryset.query.where:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    @cached_property
+    def count(self):
+        estimate = self._estimated_count()
+        if estimate is not None and estimate > self.exact_count_threshold:
+            return estimate
+        return super().count
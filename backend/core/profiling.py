@@ -0,0 +1,153 @@
+"""
+On-demand sampling profiler for live requests.
+
+Admins create ``ProfilingRule`` rows to select a fraction of requests by path
+prefix and/or user. For a selected request a background thread snapshots the
+request thread's stack every PROFILING_INTERVAL_MS via
+``sys._current_frames()``, so the view itself runs unmodified. The result is
+stored as collapsed stacks in ``ProfileRecord``, ready for flamegraph.pl or
+speedscope, and can be merged or compared with the ``profiles`` command.
+Unselected requests only pay for an in-memory rule match.
+"""
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ProfileRecord, ProfilingRule
+
+logger = logging.getLogger(__name__)
+
+MAX_DEPTH = 128
+
+_rules = []
+_rules_loaded_at = 0.0
+_rules_lock = threading.Lock()
+_labels = {}
+
+
+def _frame_label(code):
+    label = _labels.get(code)
+    if label is None:
+        module = code.co_filename
+        for prefix in sorted(sys.path, key=len, reverse=True):
+            if prefix and module.startswith(prefix):
+                module = module[len(prefix):].lstrip(os.sep)
+                break
+        module = module[:-3] if module.endswith('.py') else module
+        label = f"{module.replace(os.sep, '.')}:{getattr(code, 'co_qualname', code.co_name)}"
+        _labels[code] = label
+    return label
+
+
+class SamplingProfiler:
+    """Samples one thread's stack on a timer until stopped"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            labels = []
+            while frame is not None and len(labels) < MAX_DEPTH:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(labels))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def active_rules():
+    """Enabled, unexpired rules, reloaded at most every PROFILING_RULES_TTL seconds"""
+    global _rules, _rules_loaded_at
+    now = time.monotonic()
+    if now - _rules_loaded_at > settings.PROFILING_RULES_TTL:
+        with _rules_lock:
+            if now - _rules_loaded_at > settings.PROFILING_RULES_TTL:
+                _rules = list(
+                    ProfilingRule.objects.filter(is_active=True)
+                    .filter(Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now()))
+                    .values('path_prefix', 'user_id', 'sample_rate')
+                )
+                _rules_loaded_at = now
+    return _rules
+
+
+def _token_user_id(request):
+    """User id from the bearer token, verified but without a database query"""
+    from accounts.authentication import JWTStatelessUserAuthentication
+    try:
+        result = JWTStatelessUserAuthentication().authenticate(request)
+    except Exception:
+        return None
+    return result[0].id if result else None
+
+
+def should_profile(request):
+    rules = [rule for rule in active_rules() if request.path.startswith(rule['path_prefix'])]
+    if not rules:
+        return False
+    user_id = None
+    if any(rule['user_id'] for rule in rules):
+        user_id = _token_user_id(request)
+    for rule in rules:
+        if rule['user_id'] and rule['user_id'] != user_id:
+            continue
+        if random.random() < rule['sample_rate']:
+            return True
+    return False
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PROFILING_ENABLED or not should_profile(request):
+            return self.get_response(request)
+
+        profiler = SamplingProfiler(threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        endpoint = match.view_name if match else request.path
+        try:
+            ProfileRecord.objects.create(
+                endpoint=endpoint,
+                method=request.method,
+                release=settings.RELEASE,
+                stacks=dict(profiler.stacks),
+                sample_count=profiler.samples,
+                duration_ms=duration_ms,
+                status_code=response.status_code,
+            )
+        except Exception:
+            logger.exception('Could not store profile for %s', endpoint)
+        return response
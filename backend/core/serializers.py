@@ -0,0 +1,78 @@
+"""
+Sparse fieldsets: ``?fields=`` and ``?expand=`` for API responses.
+
+``fields`` is a comma separated list of field paths; a dotted path such as
+``items.quantity`` limits a nested serializer, while a bare ``items`` keeps the
+nested object whole. ``expand`` switches on fields a serializer lists in
+``Meta.expandable_fields``, which are omitted by default. Views pass the
+parsed ``Fieldset`` in the serializer context and use ``includes()`` to
+decide which joins and prefetches the queryset actually needs.
+"""
+
+
+def _split(value):
+    return {part.strip() for part in value.split(',') if part.strip()} if value else set()
+
+
+class Fieldset:
+    def __init__(self, fields=None, expand=None):
+        self.fields = set(fields) if fields else None
+        self.expand = set(expand or ())
+
+    @classmethod
+    def from_request(cls, request):
+        return cls(_split(request.GET.get('fields')), _split(request.GET.get('expand')))
+
+    def _restriction(self, prefix):
+        """Names allowed directly under ``prefix``, or None when unrestricted"""
+        if self.fields is None:
+            return None
+        if prefix and prefix in self.fields:
+            return None
+        start = f'{prefix}.' if prefix else ''
+        names = {path[len(start):].split('.')[0] for path in self.fields if path.startswith(start)}
+        return names or None
+
+    def _requested(self, path):
+        paths = (self.fields or set()) | self.expand
+        return path in paths or any(p.startswith(f'{path}.') for p in paths)
+
+    def includes(self, path, expandable=False):
+        """Whether the field at ``path`` (dotted) will be rendered"""
+        if expandable and not self._requested(path):
+            return False
+        parts = path.split('.')
+        for depth, name in enumerate(parts):
+            allowed = self._restriction('.'.join(parts[:depth]))
+            if allowed is not None and name not in allowed:
+                return False
+        return True
+
+
+ALL_FIELDS = Fieldset()
+
+
+class SparseFieldsetMixin:
+    """Drop fields the client did not ask for, based on ``context['fieldset']``"""
+
+    def _fieldset_path(self):
+        names = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                names.append(node.field_name)
+            node = node.parent
+        return '.'.join(reversed(names))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get('fieldset', ALL_FIELDS)
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+        if fieldset is ALL_FIELDS and not expandable:
+            return fields
+        prefix = self._fieldset_path()
+        for name in list(fields):
+            path = f'{prefix}.{name}' if prefix else name
+            if not fieldset.includes(path, expandable=name in expandable):
+                fields.pop(name)
+        return fields
@@ -0,0 +1,77 @@
+"""
+Content-addressed media storage.
+
+Uploads are stored under the SHA-256 of their bytes, so identical files
+uploaded by different sellers (or re-uploaded on every product update) are
+written once and every URL is immutable. Model signals keep a reference count
+per file in ``MediaBlob`` (see ``core.media``); files nobody references are
+removed by the ``gc_media`` command after a grace period.
+
+An upload whose bytes are already stored doesn't write them, so between
+``save`` and the signal that retains the file it holds no reference. To keep
+``gc_media`` from deleting the file in that window, ``save`` touches the
+file's ``MediaBlob`` first, which restarts its grace period, and writes the
+bytes again if a collection that had already claimed the blob removed them.
+"""
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+CAS_PREFIX = 'cas/'
+
+
+def is_content_addressed(name):
+    return bool(name) and name.startswith(CAS_PREFIX)
+
+
+def content_digest(name):
+    """Hash part of a content-addressed name, used as the ETag"""
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def __init__(self, **kwargs):
+        # Two concurrent first uploads of the same bytes write the same file
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def _hash(self, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        return digest.hexdigest()
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        digest = self._hash(content)
+        extension = os.path.splitext(name)[1].lower()
+        name = f"{CAS_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+        if self.exists(name):
+            self._touch(name)
+            if self.exists(name):
+                # Identical bytes are already stored; reuse them
+                return name
+        return self._save(name, content)
+
+    def _touch(self, name):
+        """Restart the blob's GC grace period; waits for a collection holding its row to finish"""
+        from .models import MediaBlob
+
+        MediaBlob.objects.filter(name=name).update(updated_at=timezone.now())
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from content, so an existing file is the same file
+        return name
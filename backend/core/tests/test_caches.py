@@ -0,0 +1,18 @@
+from django.test import SimpleTestCase, override_settings
+
+from core import caches
+
+LOCMEM = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    @override_settings(CACHES={'default': LOCMEM, 'shared': LOCMEM}, DEBUG=False)
+    def test_process_local_shared_cache_fails_in_production(self):
+        self.assertEqual([error.id for error in caches.check_shared_cache()], ['core.E001'])
+
+    @override_settings(CACHES={'default': LOCMEM, 'shared': LOCMEM}, DEBUG=True)
+    def test_process_local_shared_cache_warns_in_development(self):
+        self.assertEqual([error.id for error in caches.check_shared_cache()], ['core.W001'])
+
+    def test_default_configuration_passes(self):
+        self.assertEqual(caches.check_shared_cache(), [])
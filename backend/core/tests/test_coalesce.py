@@ -0,0 +1,100 @@
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from core import coalesce
+from core.caches import shared_cache
+
+
+class CoalesceTestCase(SimpleTestCase):
+    def setUp(self):
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        settings_override = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'shared': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location.name},
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_calls_share_one_computation(self):
+        flights = coalesce.SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'value'
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flights.do('key', compute)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(flights.do('key', compute))) for _ in range(5)]
+        for follower in followers:
+            follower.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+        self.assertEqual(results, ['value'] * 6)
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(flights.in_flight('key'))
+
+    def test_errors_reach_the_caller_and_are_not_kept(self):
+        flights = coalesce.SingleFlight()
+        with self.assertRaises(KeyError):
+            flights.do('key', mock.Mock(side_effect=KeyError('missing')))
+        self.assertEqual(flights.do('key', lambda: 1), 1)
+
+
+class CachedTests(CoalesceTestCase):
+    def test_value_is_computed_once_while_fresh(self):
+        compute = mock.Mock(return_value={'id': 1})
+        for _ in range(3):
+            self.assertEqual(coalesce.cached('detail', compute, ttl=60), {'id': 1})
+        compute.assert_called_once()
+
+    def test_stale_value_is_served_while_refreshing(self):
+        coalesce.cached('detail', lambda: 'old', ttl=60, stale_ttl=60)
+        refreshed = threading.Event()
+
+        def compute():
+            refreshed.set()
+            return 'new'
+
+        with mock.patch('core.coalesce.time.time', return_value=time.time() + 61):
+            self.assertEqual(coalesce.cached('detail', compute, ttl=60, stale_ttl=60), 'old')
+            self.assertTrue(refreshed.wait(5))
+        for _ in range(50):
+            if coalesce.cached('detail', compute, ttl=60, stale_ttl=60) == 'new':
+                break
+            time.sleep(0.02)
+        self.assertEqual(coalesce.cached('detail', compute, ttl=60, stale_ttl=60), 'new')
+
+    def test_bump_changes_the_generation(self):
+        first = coalesce.generation('product:1')
+        self.assertEqual(coalesce.generation('product:1'), first)
+        coalesce.bump('product:1')
+        coalesce.bump('product:1')
+        self.assertEqual(coalesce.generation('product:1'), first + 2)
+        self.assertNotEqual(coalesce.generation('product:2'), coalesce.generation('product:1'))
+
+    def test_lost_generation_does_not_come_back(self):
+        seen = {coalesce.generation('product:1')}
+        coalesce.bump('product:1')
+        seen.add(coalesce.generation('product:1'))
+        # As if the cache had culled it
+        shared_cache().delete('generation:product:1')
+        coalesce.bump('product:1')
+        self.assertNotIn(coalesce.generation('product:1'), seen)
+        seen.add(coalesce.generation('product:1'))
+        shared_cache().delete('generation:product:1')
+        self.assertNotIn(coalesce.generation('product:1'), seen)
@@ -0,0 +1,24 @@
+from django.db.models import Sum
+from django.test import TestCase
+
+from core.dataset import Generator, Spec
+from orders.models import OrderItem
+from products.models import Product
+
+
+class GeneratorTests(TestCase):
+    def generate(self):
+        spec = Spec(sellers=3, products=40, max_images=0, buyers=10, orders=30, carts=5,
+                    end_date='2026-01-31', batch_size=16)
+        Generator(spec).run()
+
+    def test_products_are_in_the_change_feed(self):
+        self.generate()
+        self.assertFalse(Product.objects.filter(change_seq=0).exists())
+        self.assertEqual(Product.objects.values('change_seq').distinct().count(), 3)
+
+    def test_sales_counters_match_order_items(self):
+        self.generate()
+        sold = dict(OrderItem.objects.values_list('product_id').annotate(units=Sum('quantity')).order_by())
+        for product_id, units_sold in Product.objects.values_list('id', 'units_sold'):
+            self.assertEqual(units_sold, sold.get(product_id, 0))
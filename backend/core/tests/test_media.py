@@ -0,0 +1,61 @@
+import io
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import media
+from core.models import MediaBlob
+from core.storage import ContentAddressedStorage
+
+
+class MediaGcTests(TestCase):
+    def setUp(self):
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=location.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def store_unreferenced(self, data):
+        name = default_storage.save('photo.png', ContentFile(data))
+        media.retain(name)
+        media.release(name)
+        MediaBlob.objects.filter(name=name).update(updated_at=timezone.now() - timedelta(days=2))
+        return name
+
+    def gc(self, grace_hours=24):
+        call_command('gc_media', grace_hours=grace_hours, stdout=io.StringIO())
+
+    def test_collects_unreferenced_files(self):
+        name = self.store_unreferenced(b'old bytes')
+        self.gc()
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    def test_reupload_restarts_the_grace_period(self):
+        name = self.store_unreferenced(b'same bytes')
+        self.assertEqual(default_storage.save('again.png', ContentFile(b'same bytes')), name)
+        self.gc()
+        self.assertTrue(default_storage.exists(name))
+
+    def test_reupload_racing_a_collection_rewrites_the_file(self):
+        name = self.store_unreferenced(b'raced bytes')
+        touch = ContentAddressedStorage._touch
+
+        def collect_then_touch(storage, touched):
+            # The collection claimed the blob first; the upload's touch waits for it
+            self.gc()
+            touch(storage, touched)
+
+        with mock.patch.object(ContentAddressedStorage, '_touch', collect_then_touch):
+            saved = default_storage.save('again.png', ContentFile(b'raced bytes'))
+        media.retain(saved)
+        self.assertEqual(saved, name)
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).refcount, 1)
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core import outbox
+from core.models import OutboxEvent
+
+handled = []
+
+
+@outbox.register('test.ok')
+def ok_handler(payload):
+    handled.append(payload)
+    outbox.publish('test.follow_up', {'from': payload['n']})
+
+
+@outbox.register('test.fail')
+def failing_handler(payload):
+    outbox.publish('test.follow_up', {'from': payload['n']})
+    raise RuntimeError('downstream is down')
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=3, OUTBOX_LEASE_SECONDS=300, OUTBOX_BATCH_SIZE=10)
+class OutboxTests(TransactionTestCase):
+    def setUp(self):
+        handled.clear()
+
+    def test_handled_events_are_done_and_their_events_committed(self):
+        event = outbox.publish('test.ok', {'n': 1})
+        self.assertEqual(outbox.drain(), 2)  # the event and the follow-up it published
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts, event.last_error), ('done', 1, ''))
+        self.assertIsNotNone(event.processed_at)
+        self.assertEqual(handled, [{'n': 1}])
+        follow_up = OutboxEvent.objects.get(event_type='test.follow_up')
+        self.assertEqual((follow_up.payload, follow_up.status), ({'from': 1}, 'done'))
+
+    def test_failures_back_off_then_dead_letter(self):
+        event = outbox.publish('test.fail', {'n': 2})
+        with self.assertLogs('core.outbox', 'WARNING') as logs:
+            for attempt in (1, 2):
+                self.assertEqual(outbox.drain(), 1)
+                event.refresh_from_db()
+                self.assertEqual((event.status, event.attempts), ('pending', attempt))
+                self.assertIn('downstream is down', event.last_error)
+                self.assertGreater(event.available_at, timezone.now())
+                # Not due yet, so a second drain finds nothing
+                self.assertEqual(outbox.drain(), 0)
+                OutboxEvent.objects.filter(pk=event.pk).update(available_at=timezone.now())
+            outbox.drain()
+            event.refresh_from_db()
+            self.assertEqual((event.status, event.attempts), ('dead', 3))
+            # Events published by a failed handler roll back with it
+            self.assertFalse(OutboxEvent.objects.filter(event_type='test.follow_up').exists())
+        self.assertIn('dead-lettered after 3 attempts', logs.output[-1])
+
+    def test_claimed_events_are_leased(self):
+        event = outbox.publish('test.ok', {'n': 3})
+        self.assertEqual([claimed.id for claimed in outbox.claim_batch()], [event.id])
+        self.assertEqual(outbox.claim_batch(), [])
+        # A worker that died mid-batch leaves an expired lease behind
+        OutboxEvent.objects.filter(pk=event.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        reclaimed = outbox.claim_batch()
+        self.assertEqual([(claimed.id, claimed.attempts) for claimed in reclaimed], [(event.id, 2)])
+
+    def test_events_without_a_handler_are_acknowledged(self):
+        event = outbox.publish('test.unhandled')
+        outbox.drain()
+        event.refresh_from_db()
+        self.assertEqual(event.status, 'done')
+
+    def test_retry_delay_is_capped(self):
+        with self.settings(OUTBOX_MAX_BACKOFF_SECONDS=60):
+            self.assertEqual(outbox.retry_delay(3), timedelta(seconds=8))
+            self.assertEqual(outbox.retry_delay(10), timedelta(seconds=60))
@@ -0,0 +1,53 @@
+import tempfile
+import threading
+from collections import defaultdict
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from core import throttling
+from core.caches import shared_cache
+
+
+def in_worker(function):
+    """Run ``function`` on its own thread, which gets its own cache clients"""
+    results = []
+    thread = threading.Thread(target=lambda: results.append(function()))
+    thread.start()
+    thread.join(5)
+    return results[0]
+
+
+class SharedSyncTests(SimpleTestCase):
+    def setUp(self):
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        # A default cache that keeps nothing, so only the shared alias can carry counts between workers
+        settings_override = override_settings(
+            CACHES={
+                'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+                'shared': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location.name},
+            },
+            THROTTLE_SHARED_SYNC=True,
+            THROTTLE_SYNC_INTERVAL=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_workers_share_one_total(self):
+        now = 1000.0
+        first = throttling.BucketStore('test', rate=10, period=60, burst=10)
+        second = throttling.BucketStore('test', rate=10, period=60, burst=10)
+
+        allowed = in_worker(lambda: [first.consume('client', now)[0] for _ in range(6)])
+        self.assertEqual(allowed, [True] * 6)
+        # The second worker's own bucket still has tokens, but the fleet has used the rate
+        allowed = in_worker(lambda: [second.consume('client', now)[0] for _ in range(5)])
+        self.assertEqual(allowed, [True] * 4 + [False])
+        self.assertEqual(shared_cache().get(f'throttle:test:client:{int(now // 60)}'), 10)
+
+    def test_rejections_are_counted_across_workers(self):
+        with mock.patch.object(throttling, '_rejections', defaultdict(int)), self.assertLogs('cart_builder.throttling'):
+            in_worker(lambda: throttling.record_rejection('test'))
+            in_worker(lambda: throttling.record_rejection('test'))
+        self.assertEqual(shared_cache().get('throttle_rejected:test'), 2)
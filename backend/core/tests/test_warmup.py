@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase
+
+from core import warmup
+
+
+class WarmupTests(SimpleTestCase):
+    def setUp(self):
+        self.step = mock.Mock()
+        patches = [
+            mock.patch.object(warmup, 'PROCESS_STEPS', [('step', self.step)]),
+            mock.patch.object(warmup, '_warmed_pid', None),
+            mock.patch.object(warmup, '_started', False),
+            mock.patch('core.warmup.os.register_at_fork'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_run_leaves_no_connection_or_thread_to_fork(self):
+        with mock.patch('products.autocomplete.start') as start, \
+                mock.patch('django.db.connections.close_all') as close_all:
+            warmup.run()
+        start.assert_not_called()
+        self.step.assert_not_called()
+        close_all.assert_called_once()
+
+    def test_process_steps_run_once_per_process(self):
+        warmup.run_in_process()
+        warmup.run_in_process()
+        self.step.assert_called_once()
+        # A forked child has a new pid
+        with mock.patch('core.warmup.os.getpid', return_value=-1):
+            warmup.run_in_process()
+        self.assertEqual(self.step.call_count, 2)
+
+    def test_middleware_warms_on_first_request(self):
+        warmup.run()
+        middleware = warmup.WarmupMiddleware(lambda request: 'response')
+        request = RequestFactory().get('/')
+        self.assertEqual(middleware(request), 'response')
+        self.assertEqual(middleware(request), 'response')
+        self.step.assert_called_once()
+
+    def test_middleware_does_nothing_without_run(self):
+        middleware = warmup.WarmupMiddleware(lambda request: 'response')
+        self.assertEqual(middleware(RequestFactory().get('/')), 'response')
+        self.step.assert_not_called()
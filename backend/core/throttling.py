@@ -0,0 +1,172 @@
+"""
+In-process token bucket throttles.
+
+Each worker keeps one bucket per (scope, client) in memory, so the common
+case costs no cache round trip. With THROTTLE_SHARED_SYNC enabled a bucket
+pushes its consumption to the shared cache (``core.caches``) at most every
+THROTTLE_SYNC_INTERVAL seconds and is blocked for the rest of the window once
+the fleet-wide count reaches the rate. Rates come from DRF's
+DEFAULT_THROTTLE_RATES (``'<count>/<period>'``); bursts default to the count
+and can be overridden per scope in THROTTLE_BURSTS.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .caches import shared_cache
+
+logger = logging.getLogger('cart_builder.throttling')
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_rejections = defaultdict(int)
+_rejections_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+def record_rejection(scope):
+    with _rejections_lock:
+        _rejections[scope] += 1
+        count = _rejections[scope]
+    # Log the first rejection and then every hundredth to keep log volume bounded
+    if count == 1 or count % 100 == 0:
+        logger.warning('Throttled %s requests in scope %s', count, scope)
+    if settings.THROTTLE_SHARED_SYNC:
+        cache = shared_cache()
+        try:
+            cache.incr(f'throttle_rejected:{scope}')
+        except ValueError:
+            cache.add(f'throttle_rejected:{scope}', 1, None)
+
+
+def rejection_counts():
+    """Rejected requests per scope in this process"""
+    with _rejections_lock:
+        return dict(_rejections)
+
+
+class BucketStore:
+    """Token buckets for one scope, bounded to THROTTLE_MAX_KEYS entries (LRU)"""
+
+    # Entry layout: [tokens, last_refill, unsynced, last_sync, blocked_until]
+    def __init__(self, scope, rate, period, burst):
+        self.scope = scope
+        self.rate = rate
+        self.period = period
+        self.capacity = burst
+        self.refill = rate / period
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key, now):
+        """Take one token; returns (allowed, seconds until the next token)"""
+        with self.lock:
+            entry = self.buckets.get(key)
+            if entry is None:
+                entry = [float(self.capacity), now, 0, now, 0.0]
+                self.buckets[key] = entry
+                if len(self.buckets) > settings.THROTTLE_MAX_KEYS:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(key)
+
+            if entry[4] > now:
+                return False, entry[4] - now
+            entry[0] = min(self.capacity, entry[0] + (now - entry[1]) * self.refill)
+            entry[1] = now
+            if entry[0] < 1:
+                return False, (1 - entry[0]) / self.refill
+            entry[0] -= 1
+            entry[2] += 1
+            needs_sync = settings.THROTTLE_SHARED_SYNC and now - entry[3] >= settings.THROTTLE_SYNC_INTERVAL
+            if needs_sync:
+                unsynced, entry[2], entry[3] = entry[2], 0, now
+
+        if needs_sync:
+            self._sync(key, entry, unsynced, now)
+        return True, 0
+
+    def _sync(self, key, entry, unsynced, now):
+        window = int(now // self.period)
+        shared_key = f'throttle:{self.scope}:{key}:{window}'
+        cache = shared_cache()
+        try:
+            cache.add(shared_key, 0, self.period)
+            total = cache.incr(shared_key, unsynced)
+        except Exception:
+            logger.exception('Throttle sync failed for scope %s', self.scope)
+            return
+        if total >= self.rate:
+            with self.lock:
+                entry[4] = (window + 1) * self.period
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(scope):
+    store = _stores.get(scope)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(scope)
+            if store is None:
+                rate, period = parse_rate(api_settings.DEFAULT_THROTTLE_RATES[scope])
+                burst = settings.THROTTLE_BURSTS.get(scope, rate)
+                store = _stores[scope] = BucketStore(scope, rate, period, burst)
+    return store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def get_key(self, request, view):
+        """Bucket key for this request, or None to skip throttling"""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        allowed, self._wait = get_store(self.scope).consume(key, time.time())
+        if not allowed:
+            record_rejection(self.scope)
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class AnonCatalogThrottle(TokenBucketThrottle):
+    """Anonymous catalog reads, per client IP"""
+    scope = 'catalog_anon'
+
+    def get_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.get_ident(request)
+
+
+class CartWriteThrottle(TokenBucketThrottle):
+    """Cart mutations, per user"""
+    scope = 'cart_write'
+
+    def get_key(self, request, view):
+        return request.user.pk if request.user and request.user.is_authenticated else self.get_ident(request)
+
+
+class CheckoutThrottle(TokenBucketThrottle):
+    """Checkout, per user"""
+    scope = 'checkout'
+
+    def get_key(self, request, view):
+        return request.user.pk if request.user and request.user.is_authenticated else self.get_ident(request)
@@ -0,0 +1,161 @@
+import copy
+import mimetypes
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import close_old_connections
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.urls import reverse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.decorators.http import require_http_methods
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from accounts.serializers import UserProfileSerializer
+from orders import cart_summary
+from products.views import catalog_page
+from .storage import content_digest, is_content_addressed
+from .throttling import AnonCatalogThrottle, rejection_counts
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_http_methods(['GET', 'HEAD'])
+def serve_media(request, path):
+    """Serve uploaded media with validators, long-lived caching and byte ranges"""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Invalid path')
+    try:
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404('File not found')
+    if not os.path.isfile(full_path):
+        raise Http404('File not found')
+
+    if is_content_addressed(path):
+        # The name is the content hash, so the bytes behind this URL never change
+        etag = f'"{content_digest(path)}"'
+        cache_control = f'public, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        cache_control = f'public, max-age={settings.MEDIA_LEGACY_MAX_AGE}'
+
+    headers = {
+        'ETag': etag,
+        'Cache-Control': cache_control,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Accept-Ranges': 'bytes',
+    }
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+        response = HttpResponseNotModified()
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    size = stat.st_size
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    match = RANGE_RE.match(range_header.strip()) if range_header else None
+    if match and (not if_range or if_range == etag):
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        elif last:
+            start = max(size - int(last), 0)
+            end = size - 1
+        else:
+            start, end = size, -1
+        if start > end or start >= size:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        length = end - start + 1
+        body = [] if request.method == 'HEAD' else _read_range(full_path, start, length)
+        response = StreamingHttpResponse(body, status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(length)
+    elif request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = str(size)
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def throttle_metrics(request):
+    """Requests rejected by each throttle scope in this worker"""
+    return Response({'pid': os.getpid(), 'rejected': rejection_counts()})
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _submit(function, *args):
+    """Run ``function`` on the bootstrap pool with its own database connection"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(settings.BOOTSTRAP_WORKERS, thread_name_prefix='bootstrap')
+
+    def run():
+        # Pool threads outlive requests, so apply the request cycle's connection handling here
+        close_old_connections()
+        try:
+            return function(*args)
+        finally:
+            close_old_connections()
+
+    return _executor.submit(run)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+@throttle_classes([AnonCatalogThrottle])
+def bootstrap(request):
+    """Profile, cart summary and first catalog page for the initial page load"""
+    # The catalog page takes this request's query parameters, rendered as if sent to product_list
+    catalog_request = copy.copy(request._request)
+    catalog_request.path = catalog_request.path_info = reverse('product_list')
+    products = _submit(catalog_page, Request(catalog_request))
+
+    user = request.user
+    cart = None
+    if user.is_authenticated and not user.is_seller:
+        cart = _submit(cart_summary.summary_data, user.id)
+    profile = UserProfileSerializer(user).data if user.is_authenticated else None
+
+    return Response({
+        'user': profile,
+        'cart': cart.result() if cart else None,
+        'products': products.result(),
+    })
@@ -0,0 +1,169 @@
+"""
+Warm-up hooks run by wsgi.py/asgi.py before a worker takes traffic.
+
+Without them the first requests a fresh worker serves pay for importing every
+view module, compiling URL patterns, filling model ``_meta`` caches while
+serializer fields are built, loading the JWT backend and opening the database
+connection. Both hooks return how long each step took, which
+``bench_startup`` reports next to import time and time-to-first-response.
+
+``run()`` only fills module-level state, so it is safe in a server master
+that imports the application and then forks its workers (gunicorn
+``--preload``). Steps that open connections, load per-process state or start
+threads are left to ``run_in_process()``: a worker forked from a master that
+had run them would share its database socket and could inherit the
+autocomplete build lock held by a thread that no longer exists. It runs in
+each forked child right after the fork and, for servers that import the
+application in the worker itself, on the worker's first request
+(``WarmupMiddleware``).
+"""
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _walk_patterns(patterns):
+    for pattern in patterns:
+        pattern.pattern.regex
+        if hasattr(pattern, 'url_patterns'):
+            yield from _walk_patterns(pattern.url_patterns)
+        else:
+            yield pattern
+
+
+def url_resolvers():
+    """Import every view module and compile all URL patterns"""
+    from django.urls import get_resolver
+    resolver = get_resolver()
+    resolver.reverse_dict
+    for _ in _walk_patterns(resolver.url_patterns):
+        pass
+
+
+def _local_modules():
+    base = Path(settings.BASE_DIR)
+    return tuple(f'{config.name}.' for config in apps.get_app_configs()
+                 if Path(config.path).is_relative_to(base))
+
+
+def _subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def serializer_fields():
+    """Build the fields of every project serializer once"""
+    from rest_framework import serializers
+    modules = _local_modules()
+    for serializer_class in set(_subclasses(serializers.Serializer)):
+        if not serializer_class.__module__.startswith(modules):
+            continue
+        try:
+            serializer_class().fields
+        except Exception:
+            logger.debug('Could not pre-build %s', serializer_class.__name__, exc_info=True)
+
+
+def authentication():
+    """Load the token backend and revocation list and run one sign/verify round trip"""
+    from accounts.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+    JWTAuthentication().get_validated_token(str(AccessToken()))
+
+
+def database():
+    from django.db import connection
+    connection.ensure_connection()
+
+
+def indexes():
+    from products import autocomplete
+    autocomplete.start()
+
+
+STEPS = [
+    ('url_resolvers', url_resolvers),
+    ('serializer_fields', serializer_fields),
+]
+
+PROCESS_STEPS = [
+    ('authentication', authentication),
+    ('database', database),
+    ('indexes', indexes),
+]
+
+_warmed_pid = None
+_process_lock = threading.Lock()
+# Set once run() has been called, i.e. this interpreter serves the WSGI/ASGI application
+_started = False
+
+
+def _run_steps(steps):
+    timings = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            # A failed warm-up only costs the first request some latency
+            logger.exception('Warm-up step %s failed', name)
+        timings[name] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def run():
+    """Run the fork-safe warm-up steps; returns milliseconds spent per step"""
+    global _started
+    if not _started:
+        os.register_at_fork(after_in_child=_after_fork)
+        _started = True
+    if not settings.WARMUP_ENABLED:
+        return {}
+    timings = _run_steps(STEPS)
+    # Nothing above should have connected, but a forking master must not hand its connection to workers
+    from django.db import connections
+    connections.close_all()
+    return timings
+
+
+def _after_fork():
+    global _process_lock
+    # Another thread of the parent may have held the lock when it forked
+    _process_lock = threading.Lock()
+    run_in_process()
+
+
+def run_in_process():
+    """Run the per-process warm-up steps once in this process; returns milliseconds spent per step"""
+    global _warmed_pid
+    if _warmed_pid == os.getpid():
+        return {}
+    with _process_lock:
+        if _warmed_pid == os.getpid():
+            return {}
+        if settings.WARMUP_ENABLED:
+            timings = _run_steps(PROCESS_STEPS)
+        else:
+            timings = _run_steps([('indexes', indexes)])
+        _warmed_pid = os.getpid()
+    return timings
+
+
+class WarmupMiddleware:
+    """Runs ``run_in_process`` on a worker's first request if no fork did (never under the test client)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if _started and _warmed_pid != os.getpid():
+            run_in_process()
+        return self.get_response(request)
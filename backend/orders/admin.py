@@ -1,27 +1,100 @@
 from django.contrib import admin
-from .models import Order, OrderItem, Cart, CartItem
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from core.paginators import EstimatedCountPaginator
+from .models import Order, OrderItem, Fulfilment, Cart, CartItem
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     readonly_fields = ['total_price']
+    autocomplete_fields = ['product']
     extra = 0
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
+    @admin.display(description='Total price')
+    def total_price(self, obj):
+        # The blank inline form has no price or quantity yet
+        if obj.price_at_time is None or obj.quantity is None:
+            return None
+        return obj.total_price
+
+class FulfilmentInline(admin.TabularInline):
+    model = Fulfilment
+    readonly_fields = ['created_at', 'updated_at']
+    autocomplete_fields = ['seller']
+    extra = 0
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('seller')
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ['id', 'buyer', 'total_amount', 'status', 'created_at']
-    list_filter = ['status', 'created_at']
+    list_filter = ['fulfilments__status', 'created_at']
+    list_select_related = ['buyer']
     search_fields = ['buyer__email', 'buyer__first_name', 'buyer__last_name']
     readonly_fields = ['total_amount', 'created_at', 'updated_at']
-    inlines = [OrderItemInline]
+    autocomplete_fields = ['buyer']
+    inlines = [FulfilmentInline, OrderItemInline]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('fulfilments')
+
+    @admin.display(description='Status')
+    def status(self, obj):
+        return obj.status
 
 class CartItemInline(admin.TabularInline):
     model = CartItem
     readonly_fields = ['total_price']
+    autocomplete_fields = ['product']
     extra = 0
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
-    list_display = ['user', 'item_count', 'total_amount', 'created_at']
+    list_display = ['user', 'line_count', 'item_count', 'total_amount', 'created_at']
+    list_select_related = ['user']
     search_fields = ['user__email']
     readonly_fields = ['total_amount', 'item_count', 'created_at', 'updated_at']
-    inlines = [CartItemInline]
\ No newline at end of file
+    autocomplete_fields = ['user']
+    inlines = [CartItemInline]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            # Totals for the whole page come from one grouped query instead of per-row properties
+            queryset = queryset.annotate(
+                _line_count=Count('items'),
+                _item_count=Sum('items__quantity'),
+                _total_amount=Sum(ExpressionWrapper(
+                    F('items__quantity') * F('items__product__price'),
+                    output_field=DecimalField(max_digits=12, decimal_places=2),
+                )),
+            )
+        return queryset
+
+    @admin.display(description='Lines', ordering='_line_count')
+    def line_count(self, obj):
+        if hasattr(obj, '_line_count'):
+            return obj._line_count
+        return obj.items.count()
+
+    @admin.display(description='Item count', ordering='_item_count')
+    def item_count(self, obj):
+        if hasattr(obj, '_item_count'):
+            return obj._item_count or 0
+        return obj.item_count
+
+    @admin.display(description='Total amount', ordering='_total_amount')
+    def total_amount(self, obj):
+        if hasattr(obj, '_total_amount'):
+            return obj._total_amount or 0
+        return obj.total_amount
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'orders'
\ No newline at end of file
+    name = 'orders'
+
+    def ready(self):
+        from . import handlers  # noqa: F401 - registers outbox handlers
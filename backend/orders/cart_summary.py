@@ -0,0 +1,142 @@
+"""
+Per-user cart summary (item count, line count, total) kept in the cache.
+
+The header badge is normally served from the cached entry without touching
+the database; a missing or outdated entry is rebuilt with a single aggregate
+query.
+
+Each entry is tagged with the user's summary version. Cart mutations replace
+the version after commit rather than editing the entry: the shared cache has
+no atomic read-modify-write, so two concurrent deltas could lose one. A
+reader only accepts an entry tagged with the current version, and tags what
+it computes with the version it saw before querying, so a write that lands
+mid-computation only costs the next read a recompute.
+
+Entries live in the shared cache because the outbox worker and
+``purge_carts`` invalidate them from other processes. If that cache is
+process-local (see ``core.caches``) summaries are not cached at all.
+"""
+import uuid
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+
+from core import caches
+from .models import CartItem
+
+
+def _cache():
+    """The shared cache, or None when other processes couldn't see its entries"""
+    return caches.shared_cache() if caches.is_shared() else None
+
+
+def cache_key(user_id):
+    return f'cart_summary:{user_id}'
+
+
+def version_key(user_id):
+    return f'cart_summary_version:{user_id}'
+
+
+def _start_version(cache, user_id):
+    version = uuid.uuid4().hex
+    if not cache.add(version_key(user_id), version, settings.CART_SUMMARY_TTL):
+        version = cache.get(version_key(user_id))
+    return version
+
+
+def version(user_id):
+    """The user's summary version; take it before reading the cart whose totals are passed to ``store``"""
+    cache = _cache()
+    if cache is None:
+        return None
+    return cache.get(version_key(user_id)) or _start_version(cache, user_id)
+
+
+def compute_summary(user_id):
+    """Aggregate the summary straight from the database"""
+    totals = CartItem.objects.filter(cart__user_id=user_id).aggregate(
+        item_count=Sum('quantity'),
+        line_count=Count('id'),
+        total_amount=Sum(ExpressionWrapper(
+            F('quantity') * F('product__price'),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )),
+    )
+    return {
+        'item_count': totals['item_count'] or 0,
+        'line_count': totals['line_count'] or 0,
+        'total_amount': totals['total_amount'] or Decimal('0.00'),
+    }
+
+
+def get_summary(user_id):
+    cache = _cache()
+    if cache is None:
+        return compute_summary(user_id)
+    key = cache_key(user_id)
+    values = cache.get_many([key, version_key(user_id)])
+    current = values.get(version_key(user_id))
+    entry = values.get(key)
+    if current is not None and entry is not None and entry[0] == current:
+        return entry[1]
+    if current is None:
+        current = _start_version(cache, user_id)
+    summary = compute_summary(user_id)
+    cache.set(key, (current, summary), settings.CART_SUMMARY_TTL)
+    return summary
+
+
+def summary_data(user_id):
+    """The summary as the API returns it"""
+    summary = get_summary(user_id)
+    return {
+        'item_count': summary['item_count'],
+        'line_count': summary['line_count'],
+        'total_amount': f"{summary['total_amount']:.2f}",
+    }
+
+
+def store(user_id, version, item_count, line_count, total_amount):
+    """Cache totals read from the cart after ``version(user_id)`` returned ``version``"""
+    cache = _cache()
+    if cache is None or version is None:
+        return
+    summary = {
+        'item_count': item_count,
+        'line_count': line_count,
+        'total_amount': Decimal(total_amount),
+    }
+    transaction.on_commit(
+        lambda: cache.set(cache_key(user_id), (version, summary), settings.CART_SUMMARY_TTL)
+    )
+
+
+def changed(user_id):
+    """Retire the cached summary once the surrounding transaction commits"""
+    transaction.on_commit(lambda: invalidate([user_id]))
+
+
+def invalidate(user_ids):
+    # Without a version no entry matches, and the next read starts a new one
+    cache = _cache()
+    if cache is not None:
+        cache.delete_many([version_key(user_id) for user_id in user_ids])
+
+
+def invalidate_for_product(product_id, chunk_size=1000):
+    """Drop cached summaries of every cart holding a product whose price changed"""
+    if _cache() is None:
+        return
+    user_ids = (CartItem.objects.filter(product_id=product_id)
+                .values_list('cart__user_id', flat=True).iterator(chunk_size=chunk_size))
+    chunk = []
+    for user_id in user_ids:
+        chunk.append(user_id)
+        if len(chunk) >= chunk_size:
+            invalidate(chunk)
+            chunk = []
+    if chunk:
+        invalidate(chunk)
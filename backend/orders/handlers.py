@@ -0,0 +1,82 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+
+from core.outbox import publish_many, register
+from .models import Order
+
+logger = logging.getLogger(__name__)
+analytics_logger = logging.getLogger('cart_builder.analytics')
+
+
+@register('order.created')
+def fan_out_order_created(payload):
+    """Split checkout side effects into independently retried events"""
+    order = Order.objects.prefetch_related('items__product').get(pk=payload['order_id'])
+    seller_ids = sorted({item.product.seller_id for item in order.items.all()})
+
+    events = [('order.notify_seller', {'order_id': order.id, 'seller_id': seller_id})
+              for seller_id in seller_ids]
+    events.append(('order.email_buyer', {'order_id': order.id}))
+    if len(order.items.all()) > 1:
+        events.append(('recommendations.order_created', {'order_id': order.id}))
+    events.append(('analytics.order_created', {
+        'order_id': order.id,
+        'buyer_id': order.buyer_id,
+        'total_amount': str(order.total_amount),
+        'item_count': sum(item.quantity for item in order.items.all()),
+        'seller_count': len(seller_ids),
+    }))
+    publish_many(events)
+
+
+@register('order.notify_seller')
+def notify_seller(payload):
+    order = Order.objects.select_related('buyer').get(pk=payload['order_id'])
+    items = list(order.items.filter(product__seller_id=payload['seller_id'])
+                 .select_related('product', 'product__seller'))
+    if not items:
+        return
+
+    seller = items[0].product.seller
+    lines = [f"{item.quantity}x {item.product.name} @ {item.price_at_time}" for item in items]
+    send_mail(
+        subject=f"New order #{order.id}",
+        message="You have a new order:\n\n" + "\n".join(lines) +
+                f"\n\nShip to:\n{order.shipping_address}",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[seller.email],
+    )
+
+
+@register('order.email_buyer')
+def email_buyer(payload):
+    order = Order.objects.select_related('buyer').prefetch_related('items__product').get(pk=payload['order_id'])
+    lines = [f"{item.quantity}x {item.product.name} @ {item.price_at_time}" for item in order.items.all()]
+    send_mail(
+        subject=f"Order #{order.id} confirmation",
+        message="Thank you for your order!\n\n" + "\n".join(lines) +
+                f"\n\nTotal: {order.total_amount}",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[order.buyer.email],
+    )
+
+
+@register('order.status_changed')
+def email_status_change(payload):
+    order = Order.objects.select_related('buyer').get(pk=payload['order_id'])
+    seller = get_user_model().objects.get(pk=payload['seller_id'])
+    send_mail(
+        subject=f"Order #{order.id}: items from {seller.full_name} are now {payload['status']}",
+        message=f"The status of the items from {seller.full_name} in your order #{order.id} "
+                f"changed from {payload['previous_status']} to {payload['status']}.",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[order.buyer.email],
+    )
+
+
+@register('analytics.order_created')
+def record_order_analytics(payload):
+    analytics_logger.info('order_created', extra={'event': payload})
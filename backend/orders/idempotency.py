@@ -0,0 +1,136 @@
+"""
+Idempotency-Key support for checkout and cart mutations.
+
+The first request with a given key claims an ``IdempotencyRecord`` before
+the view runs and stores the response once it finishes. Retries with the same
+key and body are answered from the stored response without running the view
+again; a duplicate that arrives while the original is still running waits
+for its result. Records expire after IDEMPOTENCY_TTL_HOURS and are removed by
+the ``purge_idempotency_keys`` command.
+"""
+import hashlib
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .models import IdempotencyRecord
+
+HEADER = 'Idempotency-Key'
+
+
+def request_fingerprint(request):
+    body = JSONRenderer().render(request.data)
+    payload = b'\n'.join([request.method.encode(), request.path.encode(), body])
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _claim(user_id, key, fingerprint):
+    """Create the in-progress record, or return the existing one"""
+    now = timezone.now()
+    expires_at = now + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+    try:
+        with transaction.atomic():
+            return IdempotencyRecord.objects.create(
+                user_id=user_id, key=key, fingerprint=fingerprint, expires_at=expires_at,
+            ), True
+    except IntegrityError:
+        pass
+
+    record = IdempotencyRecord.objects.get(user_id=user_id, key=key)
+    stale_before = now - timedelta(seconds=settings.IDEMPOTENCY_IN_PROGRESS_TIMEOUT)
+    abandoned = record.status == 'in_progress' and record.created_at < stale_before
+    if record.expires_at <= now or abandoned:
+        # Take over an expired record, or one whose original request died mid-flight
+        taken = IdempotencyRecord.objects.filter(pk=record.pk, created_at=record.created_at).update(
+            fingerprint=fingerprint, status='in_progress', response_status=None,
+            response_body=None, created_at=now, expires_at=expires_at,
+        )
+        if taken:
+            record.refresh_from_db()
+            return record, True
+        record.refresh_from_db()
+    return record, False
+
+
+def _wait_for_completion(record):
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.05
+    while record.status == 'in_progress' and time.monotonic() < deadline:
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+        try:
+            record.refresh_from_db()
+        except IdempotencyRecord.DoesNotExist:
+            return None
+    return record
+
+
+def _replay(record):
+    response = Response(record.response_body, status=record.response_status)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view):
+    """Make a DRF function view safe to retry with an Idempotency-Key header"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({'error': f'{HEADER} is too long'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        fingerprint = request_fingerprint(request)
+        record, owner = _claim(request.user.id, key, fingerprint)
+        if not owner:
+            if record.fingerprint != fingerprint:
+                return Response({'error': f'{HEADER} was already used for a different request'},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            record = _wait_for_completion(record)
+            if record is None:
+                return Response({'error': 'The original request failed, please retry'},
+                                status=status.HTTP_409_CONFLICT)
+            if record.status != 'completed':
+                return Response({'error': 'The original request is still in progress'},
+                                status=status.HTTP_409_CONFLICT)
+            return _replay(record)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            IdempotencyRecord.objects.filter(pk=record.pk).delete()
+            raise
+
+        if response.status_code >= 500:
+            # Server errors are not final; let the client retry for real
+            IdempotencyRecord.objects.filter(pk=record.pk).delete()
+            return response
+
+        body = json.loads(JSONRenderer().render(response.data)) if response.data is not None else None
+        IdempotencyRecord.objects.filter(pk=record.pk).update(
+            status='completed', response_status=response.status_code, response_body=body,
+        )
+        return response
+
+    return wrapper
+
+
+def purge_expired(batch_size=1000):
+    """Delete expired records in small batches; returns the number removed"""
+    removed = 0
+    while True:
+        ids = list(IdempotencyRecord.objects.filter(expires_at__lte=timezone.now())
+                   .values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return removed
+        removed += IdempotencyRecord.objects.filter(id__in=ids).delete()[0]
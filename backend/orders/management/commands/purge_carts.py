@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders import retention
+
+
+class Command(BaseCommand):
+    help = 'Delete abandoned carts and cart lines for inactive products'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=settings.CART_RETENTION_DAYS,
+                            help='Purge carts with items untouched for this many days')
+        parser.add_argument('--empty-retention-days', type=int, default=settings.CART_EMPTY_RETENTION_DAYS,
+                            help='Purge empty carts untouched for this many days')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        policy = {
+            'retention_days': options['retention_days'],
+            'empty_retention_days': options['empty_retention_days'],
+        }
+        if options['dry_run']:
+            report = retention.preview(**policy)
+            verb = 'Would remove'
+        else:
+            report = retention.purge(options['batch_size'], options['pause'], **policy)
+            verb = 'Removed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {report.carts} abandoned carts ({report.cart_lines} lines), '
+            f'{report.empty_carts} empty carts and {report.inactive_lines} lines for inactive products'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from orders.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete expired Idempotency-Key records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        removed = purge_expired(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} expired idempotency records'))
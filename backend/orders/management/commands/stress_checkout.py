@@ -0,0 +1,91 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from orders import stress
+
+
+class Command(BaseCommand):
+    help = ('Race many buyers through add_to_cart and create_order for a few low-stock products, '
+            'report latency and errors, and check that no stock was oversold or lost')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=200)
+        parser.add_argument('--products', type=int, default=5,
+                            help='Hot products the buyers compete for')
+        parser.add_argument('--stock', type=int, default=20,
+                            help='Initial stock of each product')
+        parser.add_argument('--lines-per-cart', type=int, default=2)
+        parser.add_argument('--max-quantity', type=int, default=2,
+                            help='Largest quantity added per cart line')
+        parser.add_argument('--workers', type=int, default=32,
+                            help='Concurrent requests in flight')
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--url',
+                            help='Base URL of a running server using this database; default is in-process WSGI')
+        parser.add_argument('--timeout', type=float, default=30,
+                            help='Per-request timeout with --url, in seconds')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--label', help='Name for this run in --output and --compare')
+        parser.add_argument('--output', help='Write the report as JSON to this file')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the seeded users, products and orders')
+        parser.add_argument('--force', action='store_true',
+                            help='Allow running with DEBUG off')
+        parser.add_argument('--compare', nargs='+', metavar='REPORT',
+                            help='Print reports written by --output side by side instead of running')
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            self.compare(options['compare'])
+            return
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('This creates and deletes users and orders; use --force to run with DEBUG off')
+
+        report = stress.run(
+            buyers=options['buyers'], products=options['products'], stock=options['stock'],
+            lines_per_cart=options['lines_per_cart'], max_quantity=options['max_quantity'],
+            workers=options['workers'], pool=options['pool'], url=options['url'],
+            timeout=options['timeout'], seed_value=options['seed'], keep=options['keep'],
+        )
+        report['label'] = options['label'] or f"{report['database']['vendor']}-{report['pool']}"
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+
+        database = report['database']
+        self.stdout.write(f"{report['label']}: {database['vendor']} {database['name']}, "
+                          f"{report['workers']} {report['pool']} workers against {report['target']}")
+        for phase, summary in report['phases'].items():
+            self.stdout.write(
+                f"{phase:<13} {summary['requests']:>6} requests  {summary['throughput']:>8.1f}/s  "
+                f"p50 {summary['p50_ms']:.1f}ms  p95 {summary['p95_ms']:.1f}ms  p99 {summary['p99_ms']:.1f}ms  "
+                f"max {summary['max_ms']:.1f}ms  lock errors {summary['lock_errors']}  failed {summary['failed']}"
+            )
+            self.stdout.write(f"{'':<13} outcomes {summary['outcomes']}")
+
+        invariants = report['invariants']
+        self.stdout.write(f"Sold {invariants['units_sold']} of {invariants['units_seeded']} seeded units")
+        if invariants['violations']:
+            for violation in invariants['violations']:
+                self.stdout.write(self.style.ERROR(json.dumps(violation)))
+            raise CommandError(f"{len(invariants['violations'])} stock invariant violations")
+        self.stdout.write(self.style.SUCCESS('Stock invariants hold'))
+
+    def compare(self, paths):
+        reports = []
+        for path in paths:
+            with open(path) as report_file:
+                reports.append(json.load(report_file))
+        width = max(12, *(len(report['label']) for report in reports))
+        self.stdout.write(f"{'run':<{width}}  {'database':<10} {'phase':<13} {'req/s':>8} {'p50':>8} "
+                          f"{'p95':>8} {'p99':>8} {'locks':>6} {'failed':>6} {'violations':>10}")
+        for report in reports:
+            for phase, summary in report['phases'].items():
+                self.stdout.write(
+                    f"{report['label']:<{width}}  {report['database']['vendor']:<10} {phase:<13} "
+                    f"{summary['throughput']:>8.1f} {summary['p50_ms']:>8.1f} {summary['p95_ms']:>8.1f} "
+                    f"{summary['p99_ms']:>8.1f} {summary['lock_errors']:>6} {summary['failed']:>6} "
+                    f"{len(report['invariants']['violations']):>10}"
+                )
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_fulfilments(apps, schema_editor):
+    """One fulfilment per seller in each existing order, carrying the order's status"""
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    Fulfilment = apps.get_model('orders', 'Fulfilment')
+    rows = (OrderItem.objects.values_list('order_id', 'product__seller_id', 'order__status')
+            .distinct().order_by('order_id', 'product__seller_id'))
+    batch = []
+    for order_id, seller_id, status in rows.iterator(chunk_size=2000):
+        batch.append(Fulfilment(order_id=order_id, seller_id=seller_id, status=status))
+        if len(batch) >= 1000:
+            Fulfilment.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Fulfilment.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_cart_updated_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Fulfilment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('processing', 'Processing'), ('shipped', 'Shipped'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('shipped_at', models.DateTimeField(blank=True, null=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'order_fulfilments',
+            },
+        ),
+        migrations.AddField(
+            model_name='fulfilment',
+            name='order',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fulfilments', to='orders.order'),
+        ),
+        migrations.AddField(
+            model_name='fulfilment',
+            name='seller',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fulfilments', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='fulfilment',
+            index=models.Index(fields=['seller', 'status'], name='order_fulfi_seller__c71150_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='fulfilment',
+            unique_together={('order', 'seller')},
+        ),
+        migrations.RunPython(create_fulfilments, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='order',
+            name='orders_status_762191_idx',
+        ),
+        migrations.RemoveField(
+            model_name='order',
+            name='status',
+        ),
+    ]
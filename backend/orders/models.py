@@ -13,9 +13,11 @@ class Order(models.Model):
         ('cancelled', 'Cancelled'),
     ]
     
+    # Progress order used to derive the buyer-facing status from fulfilments
+    STATUS_RANK = {'pending': 0, 'confirmed': 1, 'processing': 2, 'shipped': 3, 'delivered': 4}
+    
     buyer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='orders')
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     shipping_address = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -25,12 +27,24 @@ class Order(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['buyer', '-created_at']),
-            models.Index(fields=['status']),
         ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.buyer.email}"
 
+    @classmethod
+    def derive_status(cls, statuses):
+        """Least advanced status among the live fulfilments; cancelled only if all are"""
+        statuses = list(statuses)
+        live = [value for value in statuses if value != 'cancelled']
+        if live:
+            return min(live, key=cls.STATUS_RANK.__getitem__)
+        return 'cancelled' if statuses else 'pending'
+
+    @property
+    def status(self):
+        return self.derive_status(fulfilment.status for fulfilment in self.fulfilments.all())
+
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey('products.Product', on_delete=models.CASCADE)
@@ -56,6 +70,26 @@ class OrderItem(models.Model):
     def seller(self):
         return self.product.seller
 
+class Fulfilment(models.Model):
+    """One seller's share of an order, with its own status"""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='fulfilments')
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='fulfilments')
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    shipped_at = models.DateTimeField(blank=True, null=True)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'order_fulfilments'
+        unique_together = ['order', 'seller']
+        indexes = [
+            models.Index(fields=['seller', 'status']),
+        ]
+
+    def __str__(self):
+        return f"Order #{self.order_id} / seller {self.seller_id}: {self.status}"
+
 class Cart(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='cart')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -63,6 +97,9 @@ class Cart(models.Model):
 
     class Meta:
         db_table = 'carts'
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         return f"Cart for {self.user.email}"
@@ -90,4 +127,31 @@ class CartItem(models.Model):
 
     @property
     def total_price(self):
-        return self.product.price * self.quantity
\ No newline at end of file
+        return self.product.price * self.quantity
+
+
+class IdempotencyRecord(models.Model):
+    """Stored outcome of a mutating request sent with an Idempotency-Key header"""
+    STATUS_CHOICES = [
+        ('in_progress', 'In progress'),
+        ('completed', 'Completed'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)  # SHA-256 of method, path and body
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='in_progress')
+    response_status = models.PositiveSmallIntegerField(blank=True, null=True)
+    response_body = models.JSONField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'idempotency_records'
+        unique_together = ['user', 'key']
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.status})"
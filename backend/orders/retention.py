@@ -0,0 +1,137 @@
+"""
+Retention policy for carts.
+
+Cart mutations bump ``Cart.updated_at`` through ``touch()``. A cart with items
+expires after CART_RETENTION_DAYS without changes; an empty cart, which
+``get_cart`` creates for every visitor, expires after
+CART_EMPTY_RETENTION_DAYS. Lines for inactive products are pruned as well.
+Everything is deleted in chunks, each in its own short transaction, so no
+purge holds row locks for long. Run it with the ``purge_carts`` command.
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from . import cart_summary
+from .models import Cart, CartItem
+
+# Skip the write when the cart was touched this recently
+TOUCH_GRANULARITY = timedelta(minutes=1)
+
+
+def touch(cart_id):
+    """Mark a cart as active; at most one write per TOUCH_GRANULARITY"""
+    now = timezone.now()
+    Cart.objects.filter(pk=cart_id, updated_at__lt=now - TOUCH_GRANULARITY).update(updated_at=now)
+
+
+@dataclass
+class PurgeReport:
+    carts: int = 0
+    empty_carts: int = 0
+    cart_lines: int = 0
+    inactive_lines: int = 0
+
+
+def expired_carts(now=None, retention_days=None, empty_retention_days=None):
+    """Carts past their retention window, empty ones on the shorter window"""
+    now = now or timezone.now()
+    retention_days = retention_days or settings.CART_RETENTION_DAYS
+    empty_retention_days = empty_retention_days or settings.CART_EMPTY_RETENTION_DAYS
+    return Cart.objects.annotate(
+        has_items=Exists(CartItem.objects.filter(cart_id=OuterRef('pk'))),
+    ).filter(
+        Q(has_items=True, updated_at__lt=now - timedelta(days=retention_days))
+        | Q(has_items=False, updated_at__lt=now - timedelta(days=empty_retention_days))
+    )
+
+
+def inactive_lines():
+    return CartItem.objects.filter(product__is_active=False)
+
+
+def _pause(seconds):
+    if seconds:
+        time.sleep(seconds)
+
+
+def purge_expired_carts(report, batch_size=500, pause=0, **policy):
+    now = timezone.now()
+    while True:
+        with transaction.atomic():
+            carts = list(
+                expired_carts(now, **policy).select_for_update(skip_locked=True, of=('self',))
+                .order_by('id').values_list('id', 'user_id', 'has_items')[:batch_size]
+            )
+            if not carts:
+                return
+            ids = [cart_id for cart_id, _, _ in carts]
+            report.cart_lines += CartItem.objects.filter(cart_id__in=ids).delete()[0]
+            Cart.objects.filter(id__in=ids).delete()
+            report.carts += sum(1 for _, _, has_items in carts if has_items)
+            report.empty_carts += sum(1 for _, _, has_items in carts if not has_items)
+            user_ids = [user_id for _, user_id, _ in carts]
+            transaction.on_commit(lambda user_ids=user_ids: cart_summary.invalidate(user_ids))
+        _pause(pause)
+
+
+def purge_inactive_lines(report, batch_size=500, pause=0):
+    while True:
+        with transaction.atomic():
+            lines = list(
+                inactive_lines().select_for_update(skip_locked=True, of=('self',))
+                .order_by('id').values_list('id', 'cart__user_id')[:batch_size]
+            )
+            if not lines:
+                return
+            report.inactive_lines += CartItem.objects.filter(id__in=[line_id for line_id, _ in lines]).delete()[0]
+            user_ids = {user_id for _, user_id in lines}
+            transaction.on_commit(lambda user_ids=user_ids: cart_summary.invalidate(user_ids))
+        _pause(pause)
+
+
+def purge_product_lines(product_id, batch_size=500):
+    """
+    Delete up to ``batch_size`` cart lines for one product; returns lines removed.
+
+    One chunk per call: the caller commits it, so callers that are already
+    inside a transaction (outbox handlers) don't hold every chunk's locks
+    until the end.
+    """
+    with transaction.atomic():
+        lines = list(
+            CartItem.objects.filter(product_id=product_id)
+            .select_for_update(skip_locked=True, of=('self',))
+            .order_by('id').values_list('id', 'cart__user_id')[:batch_size]
+        )
+        if not lines:
+            return 0
+        removed = CartItem.objects.filter(id__in=[line_id for line_id, _ in lines]).delete()[0]
+        user_ids = [user_id for _, user_id in lines]
+        transaction.on_commit(lambda user_ids=user_ids: cart_summary.invalidate(user_ids))
+    return removed
+
+
+def purge(batch_size=500, pause=0, retention_days=None, empty_retention_days=None):
+    """Apply the retention policy; returns a PurgeReport of what was removed"""
+    report = PurgeReport()
+    purge_inactive_lines(report, batch_size, pause)
+    purge_expired_carts(report, batch_size, pause, retention_days=retention_days,
+                        empty_retention_days=empty_retention_days)
+    return report
+
+
+def preview(retention_days=None, empty_retention_days=None):
+    """What ``purge()`` would remove right now, without deleting anything"""
+    expired = expired_carts(retention_days=retention_days, empty_retention_days=empty_retention_days)
+    return PurgeReport(
+        carts=expired.filter(has_items=True).count(),
+        empty_carts=expired.filter(has_items=False).count(),
+        cart_lines=CartItem.objects.filter(cart__in=expired.values('pk'), product__is_active=True).count(),
+        inactive_lines=inactive_lines().count(),
+    )
@@ -1,8 +1,10 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Order, OrderItem, Cart, CartItem
-from products.serializers import ProductListSerializer
+from core.serializers import SparseFieldsetMixin
+from .models import Order, OrderItem, Fulfilment, Cart, CartItem
+from products.serializers import ProductListSerializer, optimize_product_queryset
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     product_image = serializers.ImageField(source='product.image', read_only=True)
     seller_name = serializers.CharField(source='product.seller.full_name', read_only=True)
@@ -12,13 +14,23 @@ class OrderItemSerializer(serializers.ModelSerializer):
         model = OrderItem
         fields = ['id', 'product', 'product_name', 'product_image', 'quantity', 'price_at_time', 'total_price', 'seller_name']
 
-class OrderSerializer(serializers.ModelSerializer):
+class FulfilmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    seller_name = serializers.CharField(source='seller.full_name', read_only=True)
+    
+    class Meta:
+        model = Fulfilment
+        fields = ['id', 'seller', 'seller_name', 'status', 'created_at', 'updated_at', 'shipped_at', 'delivered_at']
+
+class OrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
+    fulfilments = FulfilmentSerializer(many=True, read_only=True)
     buyer_name = serializers.CharField(source='buyer.full_name', read_only=True)
+    # Derived from the prefetched fulfilments; a seller only gets their own
+    status = serializers.CharField(read_only=True)
     
     class Meta:
         model = Order
-        fields = ['id', 'buyer', 'buyer_name', 'total_amount', 'status', 'shipping_address', 'items', 'created_at', 'updated_at']
+        fields = ['id', 'buyer', 'buyer_name', 'total_amount', 'status', 'shipping_address', 'items', 'fulfilments', 'created_at', 'updated_at']
         read_only_fields = ['id', 'buyer', 'total_amount', 'created_at', 'updated_at']
 
 class OrderCreateSerializer(serializers.ModelSerializer):
@@ -26,7 +38,7 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         model = Order
         fields = ['shipping_address']
 
-class CartItemSerializer(serializers.ModelSerializer):
+class CartItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     product = ProductListSerializer(read_only=True)
     total_price = serializers.ReadOnlyField()
     
@@ -34,7 +46,7 @@ class CartItemSerializer(serializers.ModelSerializer):
         model = CartItem
         fields = ['id', 'product', 'quantity', 'total_price', 'added_at']
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
     total_amount = serializers.ReadOnlyField()
     item_count = serializers.ReadOnlyField()
@@ -43,6 +55,55 @@ class CartSerializer(serializers.ModelSerializer):
         model = Cart
         fields = ['id', 'items', 'total_amount', 'item_count', 'created_at', 'updated_at']
 
+def order_items_prefetch(fieldset, items_queryset=None):
+    """Prefetch for an order's items, or None when they are not rendered"""
+    if not fieldset.includes('items'):
+        return None
+    items = items_queryset if items_queryset is not None else OrderItem.objects.all()
+    if fieldset.includes('items.seller_name'):
+        items = items.select_related('product__seller')
+    elif fieldset.includes('items.product_name') or fieldset.includes('items.product_image'):
+        items = items.select_related('product')
+    return Prefetch('items', queryset=items)
+
+def fulfilments_prefetch(fieldset, fulfilments_queryset=None):
+    """Prefetch for an order's fulfilments, which also back the derived status"""
+    if not (fieldset.includes('fulfilments') or fieldset.includes('status')):
+        return None
+    fulfilments = fulfilments_queryset if fulfilments_queryset is not None else Fulfilment.objects.all()
+    if fieldset.includes('fulfilments.seller_name'):
+        fulfilments = fulfilments.select_related('seller')
+    return Prefetch('fulfilments', queryset=fulfilments.order_by('id'))
+
+def order_prefetches(fieldset, items_queryset=None, fulfilments_queryset=None):
+    """All prefetches an order needs for the fields being rendered"""
+    prefetches = [
+        order_items_prefetch(fieldset, items_queryset),
+        fulfilments_prefetch(fieldset, fulfilments_queryset),
+    ]
+    return [prefetch for prefetch in prefetches if prefetch is not None]
+
+def optimize_order_queryset(queryset, fieldset, items_queryset=None, fulfilments_queryset=None):
+    """Join the buyer and prefetch items and fulfilments only for the fields being rendered"""
+    if fieldset.includes('buyer_name'):
+        queryset = queryset.select_related('buyer')
+    return queryset.prefetch_related(*order_prefetches(fieldset, items_queryset, fulfilments_queryset))
+
+def cart_prefetch(fieldset):
+    """
+    Prefetch for a cart's items, or None when nothing rendered reads them.
+
+    The totals are computed from the items, so they need the product price
+    even when the items themselves are not rendered.
+    """
+    needs_items = any(fieldset.includes(name) for name in ('items', 'total_amount', 'item_count'))
+    if not needs_items:
+        return None
+    items = optimize_product_queryset(
+        CartItem.objects.all(), fieldset, ProductListSerializer, path='items.product', lookup='product__'
+    )
+    return Prefetch('items', queryset=items)
+
 class AddToCartSerializer(serializers.Serializer):
     product_id = serializers.IntegerField()
     quantity = serializers.IntegerField(min_value=1)
@@ -0,0 +1,277 @@
+"""
+Concurrent checkout stress harness, driven by the ``stress_checkout`` command.
+
+A run seeds one seller with a few low-stock products and many buyers, then
+goes through two phases with a thread or process pool: every buyer adds hot
+products to their cart (``add_to_cart``), then every buyer checks out at once
+(``create_order``). Requests go either through Django's WSGI handler in this
+process or over HTTP to a running server that uses the same database.
+
+Each phase reports throughput, latency percentiles and outcomes. Afterwards
+the products are checked against the invariants checkout must keep: stock
+never goes negative, nothing is sold beyond the seeded stock, and the units
+in order items equal the drop in stock for every product.
+"""
+import json
+import logging
+import multiprocessing
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.signals import got_request_exception
+from django.db import connection, connections
+from django.db.models import Sum
+from rest_framework_simplejwt.tokens import AccessToken
+
+from products.models import Product
+from .models import OrderItem
+
+User = get_user_model()
+
+# Substrings of database errors caused by lock contention rather than bad data
+LOCK_ERRORS = (
+    'database is locked', 'database table is locked', 'deadlock', 'lock wait timeout',
+    'could not obtain lock', 'lock timeout', 'could not serialize access',
+)
+
+
+def email_prefix(run_id):
+    return f'stress-{run_id}-'
+
+
+def seed(run_id, buyers, products, stock, rng):
+    """Create the seller, products and buyers of a run; returns the run's state"""
+    prefix = email_prefix(run_id)
+    # Nobody logs in with these accounts, so one hash is shared instead of paying for one per buyer
+    password = make_password(None)
+    seller = User.objects.create(
+        email=f'{prefix}seller@example.com', username=f'{prefix}seller',
+        password=password, is_seller=True, first_name='Stress', last_name='Seller',
+    )
+    product_rows = Product.objects.bulk_create([
+        Product(seller=seller, name=f'Stress product {index}', price=rng.choice(['9.99', '19.99', '4.50']),
+                stock=stock, store_display_name='Stress Seller', seller_display_name=seller.full_name)
+        for index in range(products)
+    ])
+    User.objects.bulk_create([
+        User(email=f'{prefix}{index}@example.com', username=f'{prefix}{index}', password=password)
+        for index in range(buyers)
+    ], batch_size=1000)
+    buyer_ids = list(User.objects.filter(email__startswith=prefix, is_seller=False)
+                     .order_by('id').values_list('id', flat=True))
+    return {
+        'seller_id': seller.id,
+        'stock': {product.id: stock for product in product_rows},
+        'buyer_ids': buyer_ids,
+    }
+
+
+def cart_jobs(state, lines_per_cart, max_quantity, rng):
+    """One add_to_cart request per job, shuffled so buyers interleave"""
+    product_ids = sorted(state['stock'])
+    # Skew demand towards the first products so they sell out first
+    weights = [1 / (rank + 1) for rank in range(len(product_ids))]
+    jobs = []
+    for buyer_id in state['buyer_ids']:
+        token = str(AccessToken.for_user(User(id=buyer_id)))
+        picked = set()
+        while len(picked) < min(lines_per_cart, len(product_ids)):
+            picked.add(rng.choices(product_ids, weights)[0])
+        for product_id in sorted(picked):
+            jobs.append(('POST', '/api/orders/cart/add/', token,
+                         {'product_id': product_id, 'quantity': rng.randint(1, max_quantity)}))
+    rng.shuffle(jobs)
+    return jobs
+
+
+def checkout_jobs(state):
+    jobs = []
+    for buyer_id in state['buyer_ids']:
+        token = str(AccessToken.for_user(User(id=buyer_id)))
+        jobs.append(('POST', '/api/orders/create/', token, {'shipping_address': '1 Stress Street'}))
+    return jobs
+
+
+def classify(error):
+    message = str(error).lower()
+    return 'lock_error' if any(marker in message for marker in LOCK_ERRORS) else 'exception'
+
+
+_local = threading.local()
+
+
+def _record_exception(sender, request=None, **kwargs):
+    # The signal is sent from the thread that handled the request
+    _local.error = sys.exc_info()[1]
+
+
+class InProcessTarget:
+    """Calls the WSGI handler directly; each thread gets its own test client"""
+
+    def __call__(self, method, path, token, body):
+        from django.test import Client
+        client = getattr(_local, 'client', None)
+        if client is None:
+            # The client's own exception capture is shared by every thread, so errors are recorded per thread instead
+            client = _local.client = Client(raise_request_exception=False)
+            got_request_exception.connect(_record_exception, dispatch_uid='stress-checkout')
+        _local.error = None
+        response = client.generic(method, path, json.dumps(body), content_type='application/json',
+                                  HTTP_AUTHORIZATION=f'Bearer {token}')
+        if _local.error is not None:
+            return classify(_local.error)
+        return response.status_code
+
+
+class HttpTarget:
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def __call__(self, method, path, token, body):
+        request = urllib.request.Request(
+            self.base_url + path, data=json.dumps(body).encode(), method=method,
+            headers={'Content-Type': 'application/json', 'Authorization': f'Bearer {token}'},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+        except OSError as error:
+            return 'timeout' if 'timed out' in str(error) else 'connection_error'
+
+
+_target = None
+
+
+def _init_worker(target):
+    global _target
+    _target = target
+
+
+def _run_job(job):
+    started = time.perf_counter()
+    outcome = _target(*job)
+    return outcome, time.perf_counter() - started
+
+
+def drive(target, jobs, workers, pool):
+    """Run jobs concurrently; returns (outcome, seconds) per job and the wall time"""
+    started = time.perf_counter()
+    if pool == 'process':
+        # Forked workers must not share this process's database connections
+        connections.close_all()
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'),
+                                       initializer=_init_worker, initargs=(target,))
+    else:
+        _init_worker(target)
+        executor = ThreadPoolExecutor(workers)
+    with executor:
+        results = list(executor.map(_run_job, jobs, chunksize=1 if pool == 'thread' else 16))
+    return results, time.perf_counter() - started
+
+
+def summarize(results, wall):
+    latencies = sorted(seconds * 1000 for _, seconds in results) or [0.0]
+    outcomes = Counter(str(outcome) for outcome, _ in results)
+    quantiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    server_errors = sum(count for outcome, count in outcomes.items() if outcome.isdigit() and int(outcome) >= 500)
+    return {
+        'requests': len(results),
+        'seconds': round(wall, 3),
+        'throughput': round(len(results) / wall, 1) if wall else 0.0,
+        'p50_ms': round(quantiles[49], 1),
+        'p95_ms': round(quantiles[94], 1),
+        'p99_ms': round(quantiles[98], 1),
+        'max_ms': round(latencies[-1], 1),
+        'outcomes': dict(sorted(outcomes.items())),
+        'lock_errors': outcomes.get('lock_error', 0),
+        'failed': server_errors + outcomes.get('exception', 0)
+                  + outcomes.get('timeout', 0) + outcomes.get('connection_error', 0),
+    }
+
+
+def check_invariants(state):
+    """Compare every product's stock with what its order items say was sold"""
+    sold = dict(OrderItem.objects.filter(product_id__in=state['stock']).values_list('product_id')
+                .annotate(units=Sum('quantity')).order_by())
+    violations = []
+    for product_id, stock in Product.objects.filter(id__in=state['stock']).values_list('id', 'stock'):
+        initial = state['stock'][product_id]
+        units = sold.get(product_id, 0)
+        if stock < 0:
+            violations.append({'product_id': product_id, 'error': 'negative stock', 'stock': stock})
+        if units > initial:
+            violations.append({'product_id': product_id, 'error': 'oversold', 'sold': units, 'initial': initial})
+        if initial - stock != units:
+            violations.append({'product_id': product_id, 'error': 'stock decrease does not match units sold',
+                               'decrease': initial - stock, 'sold': units})
+    return {
+        'units_sold': sum(sold.values()),
+        'units_seeded': sum(state['stock'].values()),
+        'violations': violations,
+    }
+
+
+def cleanup(run_id):
+    """Delete the run's users; their products, carts and orders cascade"""
+    User.objects.filter(email__startswith=email_prefix(run_id)).delete()
+
+
+def database_info():
+    db = settings.DATABASES['default']
+    return {
+        'vendor': connection.vendor,
+        'engine': db['ENGINE'],
+        'name': str(db.get('NAME', '')),
+        'atomic_requests': db.get('ATOMIC_REQUESTS', False),
+        'conn_max_age': db.get('CONN_MAX_AGE', 0),
+        'options': {key: str(value) for key, value in db.get('OPTIONS', {}).items()},
+    }
+
+
+def run(*, buyers, products, stock, lines_per_cart, max_quantity, workers, pool, url=None, timeout=30,
+        seed_value=0, keep=False):
+    rng = random.Random(seed_value)
+    run_id = f'{int(time.time())}{rng.randrange(1000):03d}'
+    target = HttpTarget(url, timeout) if url else InProcessTarget()
+    state = seed(run_id, buyers, products, stock, rng)
+    try:
+        phases = {}
+        # Failed requests are counted in the report instead of each logging a traceback
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            for phase, jobs in (('add_to_cart', cart_jobs(state, lines_per_cart, max_quantity, rng)),
+                                ('create_order', checkout_jobs(state))):
+                results, wall = drive(target, jobs, workers, pool)
+                phases[phase] = summarize(results, wall)
+        finally:
+            request_logger.setLevel(level)
+        connections.close_all()
+        return {
+            'run_id': run_id,
+            'target': url or 'in-process',
+            'pool': pool,
+            'workers': workers,
+            'scenario': {'buyers': buyers, 'products': products, 'stock': stock,
+                         'lines_per_cart': lines_per_cart, 'max_quantity': max_quantity, 'seed': seed_value},
+            'database': database_info(),
+            'phases': phases,
+            'invariants': check_invariants(state),
+        }
+    finally:
+        if not keep:
+            cleanup(run_id)
@@ -0,0 +1,81 @@
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from core import caches
+from orders import cart_summary
+from orders.models import Cart, CartItem
+from products.models import Product
+
+User = get_user_model()
+
+LOCMEM = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+
+
+def file_caches(location):
+    return {'default': LOCMEM, 'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+    }}
+
+
+class CartSummaryTests(TestCase):
+    def setUp(self):
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        settings_override = override_settings(CACHES=file_caches(location.name))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.buyer = User.objects.create_user(email='buyer@example.com', username='buyer', password='x' * 12,
+                                              first_name='B', last_name='Test')
+        seller = User.objects.create_user(email='seller@example.com', username='seller', password='x' * 12,
+                                          first_name='S', last_name='Test', is_seller=True)
+        product = Product.objects.create(seller=seller, name='Lamp', price='2.50', stock=10)
+        CartItem.objects.create(cart=Cart.objects.create(user=self.buyer), product=product, quantity=2)
+
+    def test_summary_is_cached_in_the_shared_cache(self):
+        summary = cart_summary.get_summary(self.buyer.id)
+        self.assertEqual(summary['total_amount'], Decimal('5.00'))
+        self.assertEqual(caches.shared_cache().get(cart_summary.cache_key(self.buyer.id))[1], summary)
+        with self.assertNumQueries(0):
+            cart_summary.get_summary(self.buyer.id)
+
+    def test_writes_retire_the_summary(self):
+        cart_summary.get_summary(self.buyer.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            CartItem.objects.update(quantity=3)
+            cart_summary.changed(self.buyer.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(cart_summary.get_summary(self.buyer.id)['item_count'], 3)
+
+    def test_summary_computed_during_a_write_is_not_served(self):
+        compute = cart_summary.compute_summary
+
+        def compute_then_write(user_id):
+            summary = compute(user_id)
+            # A cart write commits after this read's query but before its result is cached
+            CartItem.objects.update(quantity=5)
+            cart_summary.invalidate([user_id])
+            return summary
+
+        with mock.patch('orders.cart_summary.compute_summary', compute_then_write):
+            self.assertEqual(cart_summary.get_summary(self.buyer.id)['item_count'], 2)
+        self.assertEqual(cart_summary.get_summary(self.buyer.id)['item_count'], 5)
+
+    def test_store_with_an_outdated_version_is_ignored(self):
+        version = cart_summary.version(self.buyer.id)
+        cart_summary.invalidate([self.buyer.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            cart_summary.store(self.buyer.id, version, 9, 1, Decimal('22.50'))
+        self.assertEqual(cart_summary.get_summary(self.buyer.id)['item_count'], 2)
+
+    def test_process_local_cache_is_not_used(self):
+        with override_settings(CACHES={'default': LOCMEM, 'shared': LOCMEM}):
+            cart_summary.get_summary(self.buyer.id)
+            self.assertIsNone(caches.shared_cache().get(cart_summary.cache_key(self.buyer.id)))
+            with self.assertNumQueries(1):
+                cart_summary.get_summary(self.buyer.id)
+
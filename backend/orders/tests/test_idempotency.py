@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from orders.idempotency import idempotent
+from orders.models import CartItem, IdempotencyRecord
+from products.models import Product
+
+User = get_user_model()
+
+
+def make_user(name, **fields):
+    return User.objects.create_user(email=f'{name}@example.com', username=name, password='x' * 12,
+                                    first_name=name, last_name='Test', **fields)
+
+
+class AddToCartIdempotencyTests(TestCase):
+    def setUp(self):
+        seller = make_user('seller', is_seller=True)
+        self.product = Product.objects.create(seller=seller, name='Lamp', price='5.00', stock=10)
+        self.buyer = make_user('buyer')
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def add(self, key, quantity=2):
+        return self.client.post('/api/orders/cart/add/', {'product_id': self.product.id, 'quantity': quantity},
+                                format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_stored_response(self):
+        first = self.add('key-1')
+        retry = self.add('key-1')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.json()), (first.status_code, first.json()))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(CartItem.objects.get(cart__user=self.buyer).quantity, 2)
+
+    def test_new_key_runs_the_view_again(self):
+        self.add('key-1')
+        self.add('key-2')
+        self.assertEqual(CartItem.objects.get(cart__user=self.buyer).quantity, 4)
+
+    def test_key_reused_for_a_different_body(self):
+        self.add('key-1')
+        self.assertEqual(self.add('key-1', quantity=3).status_code, 422)
+
+    def test_keys_are_scoped_per_user(self):
+        self.add('shared-key')
+        other = APIClient()
+        other.force_authenticate(make_user('other'))
+        response = other.post('/api/orders/cart/add/', {'product_id': self.product.id, 'quantity': 2},
+                              format='json', HTTP_IDEMPOTENCY_KEY='shared-key')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+    def test_overlong_key(self):
+        self.assertEqual(self.add('k' * 256).status_code, 400)
+
+    @override_settings(IDEMPOTENCY_WAIT_SECONDS=0)
+    def test_duplicate_of_a_request_in_flight(self):
+        self.add('key-1')
+        IdempotencyRecord.objects.filter(key='key-1').update(status='in_progress', response_body=None)
+        self.assertEqual(self.add('key-1').status_code, 409)
+
+    def test_abandoned_and_expired_records_are_taken_over(self):
+        self.add('key-1')
+        IdempotencyRecord.objects.filter(key='key-1').update(
+            status='in_progress', created_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertNotIn('Idempotent-Replayed', self.add('key-1'))
+        IdempotencyRecord.objects.filter(key='key-1').update(expires_at=timezone.now())
+        self.assertNotIn('Idempotent-Replayed', self.add('key-1'))
+        self.assertEqual(CartItem.objects.get(cart__user=self.buyer).quantity, 6)
+
+
+class ServerErrorTests(TestCase):
+    def test_server_errors_are_not_stored(self):
+        calls = []
+
+        @api_view(['POST'])
+        @idempotent
+        def flaky(request):
+            calls.append(1)
+            return Response({'error': 'boom'}, status=503 if len(calls) == 1 else 200)
+
+        user = make_user('buyer')
+        factory = APIRequestFactory()
+        for expected in (503, 200, 200):
+            request = factory.post('/flaky/', {'a': 1}, format='json', HTTP_IDEMPOTENCY_KEY='key')
+            force_authenticate(request, user)
+            self.assertEqual(flaky(request).status_code, expected)
+        self.assertEqual(len(calls), 2)
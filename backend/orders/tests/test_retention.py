@@ -0,0 +1,30 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from orders import retention
+from orders.models import Cart, CartItem
+from products.models import Product
+
+User = get_user_model()
+
+
+def make_user(name, **fields):
+    return User.objects.create_user(email=f'{name}@example.com', username=name, password='x' * 12,
+                                    first_name=name, last_name='Test', **fields)
+
+
+class RetentionInvalidationTests(TestCase):
+    def test_each_chunk_invalidates_its_own_users(self):
+        seller = make_user('seller', is_seller=True)
+        product = Product.objects.create(seller=seller, name='Lamp', price='10.00', stock=5, is_active=False)
+        buyers = [make_user(f'buyer{i}') for i in range(3)]
+        for buyer in buyers:
+            CartItem.objects.create(cart=Cart.objects.create(user=buyer), product=product, quantity=1)
+        # Inside the test transaction the callbacks only run at the end, after every chunk
+        with mock.patch('orders.cart_summary.invalidate') as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            retention.purge_inactive_lines(retention.PurgeReport(), batch_size=1)
+        invalidated = [user_id for call in invalidate.call_args_list for user_id in call.args[0]]
+        self.assertEqual(sorted(invalidated), sorted(buyer.id for buyer in buyers))
@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     # Cart URLs
     path('cart/', views.get_cart, name='get_cart'),
+    path('cart/summary/', views.get_cart_summary, name='cart_summary'),
     path('cart/add/', views.add_to_cart, name='add_to_cart'),
     path('cart/item/<int:item_id>/update/', views.update_cart_item, name='update_cart_item'),
     path('cart/item/<int:item_id>/remove/', views.remove_from_cart, name='remove_from_cart'),
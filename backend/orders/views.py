@@ -1,25 +1,52 @@
 from rest_framework import status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, throttle_classes
 from rest_framework.response import Response
+from accounts.authentication import JWTStatelessUserAuthentication
 from django.shortcuts import get_object_or_404
 from django.db import transaction
-from django.db.models import Q
-from .models import Order, OrderItem, Cart, CartItem
+from django.db.models import Q, prefetch_related_objects
+from django.utils import timezone
+from .models import Order, OrderItem, Fulfilment, Cart, CartItem
+from products import changes, popularity
 from products.models import Product
+from core.outbox import publish
+from core.serializers import Fieldset
+from core.throttling import CartWriteThrottle, CheckoutThrottle
+from . import cart_summary, retention
+from .idempotency import idempotent
 from .serializers import (
     OrderSerializer, OrderCreateSerializer, CartSerializer, 
-    AddToCartSerializer, UpdateCartItemSerializer
+    AddToCartSerializer, UpdateCartItemSerializer,
+    cart_prefetch, order_prefetches, optimize_order_queryset
 )
 
 # Cart Views
 @api_view(['GET'])
 def get_cart(request):
     """Get user's cart"""
+    fieldset = Fieldset.from_request(request)
+    # Taken before the items are read, so a concurrent write makes the stored summary outdated
+    summary_version = cart_summary.version(request.user.id)
     cart, created = Cart.objects.get_or_create(user=request.user)
-    serializer = CartSerializer(cart)
+    prefetch = cart_prefetch(fieldset)
+    if prefetch is not None:
+        prefetch_related_objects([cart], prefetch)
+        # The items were just loaded, so refresh the cached summary for free
+        cart_summary.store(request.user.id, summary_version, cart.item_count, len(cart.items.all()),
+                           cart.total_amount)
+    serializer = CartSerializer(cart, context={'fieldset': fieldset})
     return Response(serializer.data)
 
+@api_view(['GET'])
+@authentication_classes([JWTStatelessUserAuthentication])
+def get_cart_summary(request):
+    """Get item count, line count and total of the user's cart"""
+    # Stateless auth trusts the token's user id, so a cache hit runs no queries
+    return Response(cart_summary.summary_data(request.user.id))
+
 @api_view(['POST'])
+@throttle_classes([CartWriteThrottle])
+@idempotent
 def add_to_cart(request):
     """Add item to cart"""
     serializer = AddToCartSerializer(data=request.data)
@@ -52,12 +79,16 @@ def add_to_cart(request):
             cart_item.quantity = new_quantity
             cart_item.save()
         
+        retention.touch(cart.pk)
+        cart_summary.changed(request.user.id)
         return Response({'message': 'Item added to cart successfully'}, 
                        status=status.HTTP_201_CREATED)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['PUT'])
+@throttle_classes([CartWriteThrottle])
+@idempotent
 def update_cart_item(request, item_id):
     """Update cart item quantity"""
     serializer = UpdateCartItemSerializer(data=request.data)
@@ -65,7 +96,7 @@ def update_cart_item(request, item_id):
         quantity = serializer.validated_data['quantity']
         
         try:
-            cart_item = CartItem.objects.get(
+            cart_item = CartItem.objects.select_related('product').get(
                 id=item_id, 
                 cart__user=request.user
             )
@@ -79,12 +110,16 @@ def update_cart_item(request, item_id):
         
         cart_item.quantity = quantity
         cart_item.save()
+        retention.touch(cart_item.cart_id)
+        cart_summary.changed(request.user.id)
         
         return Response({'message': 'Cart item updated successfully'})
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['DELETE'])
+@throttle_classes([CartWriteThrottle])
+@idempotent
 def remove_from_cart(request, item_id):
     """Remove item from cart"""
     try:
@@ -93,6 +128,8 @@ def remove_from_cart(request, item_id):
             cart__user=request.user
         )
         cart_item.delete()
+        retention.touch(cart_item.cart_id)
+        cart_summary.changed(request.user.id)
         return Response({'message': 'Item removed from cart'}, 
                        status=status.HTTP_204_NO_CONTENT)
     except CartItem.DoesNotExist:
@@ -100,11 +137,15 @@ def remove_from_cart(request, item_id):
                        status=status.HTTP_404_NOT_FOUND)
 
 @api_view(['DELETE'])
+@throttle_classes([CartWriteThrottle])
+@idempotent
 def clear_cart(request):
     """Clear all items from cart"""
     try:
         cart = Cart.objects.get(user=request.user)
         cart.items.all().delete()
+        retention.touch(cart.pk)
+        cart_summary.changed(request.user.id)
         return Response({'message': 'Cart cleared successfully'}, 
                        status=status.HTTP_204_NO_CONTENT)
     except Cart.DoesNotExist:
@@ -112,6 +153,8 @@ def clear_cart(request):
 
 # Order Views
 @api_view(['POST'])
+@throttle_classes([CheckoutThrottle])
+@idempotent
 def create_order(request):
     """Create order from cart"""
     serializer = OrderCreateSerializer(data=request.data)
@@ -122,9 +165,14 @@ def create_order(request):
                 return Response({'error': 'Cart is empty'}, 
                               status=status.HTTP_400_BAD_REQUEST)
             
-            with transaction.atomic():
-                # Check stock availability
+            # Products are stamped for the change feed at the end, holding its lock only until commit
+            with transaction.atomic(), changes.deferred_stamps():
+                # Check availability; lines for deleted products may not be purged yet
                 for cart_item in cart.items.all():
+                    if not cart_item.product.is_active:
+                        return Response({
+                            'error': f'{cart_item.product.name} is no longer available'
+                        }, status=status.HTTP_400_BAD_REQUEST)
                     if cart_item.product.stock < cart_item.quantity:
                         return Response({
                             'error': f'Insufficient stock for {cart_item.product.name}'
@@ -138,7 +186,11 @@ def create_order(request):
                 )
                 
                 # Create order items and update stock
+                seller_ids = set()
+                quantities = {}
                 for cart_item in cart.items.all():
+                    seller_ids.add(cart_item.product.seller_id)
+                    quantities[cart_item.product_id] = quantities.get(cart_item.product_id, 0) + cart_item.quantity
                     OrderItem.objects.create(
                         order=order,
                         product=cart_item.product,
@@ -148,15 +200,29 @@ def create_order(request):
                     
                     # Update product stock
                     cart_item.product.stock -= cart_item.quantity
-                    cart_item.product.save()
+                    cart_item.product.save(update_fields=['stock', 'updated_at'])
+                
+                # Sales counters are bumped in SQL so concurrent checkouts don't lose updates
+                popularity.record_sales(quantities)
+                
+                # Each seller tracks their part of the order on their own row
+                Fulfilment.objects.bulk_create([
+                    Fulfilment(order=order, seller_id=seller_id) for seller_id in sorted(seller_ids)
+                ])
                 
                 # Clear cart
                 cart.items.all().delete()
+                cart_summary.changed(request.user.id)
                 
-                response_serializer = OrderSerializer(order)
-                return Response(response_serializer.data, 
-                              status=status.HTTP_201_CREATED)
-                
+                # Side effects run in the outbox worker, not in this transaction
+                publish('order.created', {'order_id': order.id})
+            
+            fieldset = Fieldset.from_request(request)
+            prefetch_related_objects([order], *order_prefetches(fieldset))
+            response_serializer = OrderSerializer(order, context={'fieldset': fieldset})
+            return Response(response_serializer.data, 
+                          status=status.HTTP_201_CREATED)
+            
         except Cart.DoesNotExist:
             return Response({'error': 'Cart not found'}, 
                           status=status.HTTP_404_NOT_FOUND)
@@ -166,8 +232,11 @@ def create_order(request):
 @api_view(['GET'])
 def buyer_orders(request):
     """Get buyer's orders"""
-    orders = Order.objects.filter(buyer=request.user).order_by('-created_at')
-    serializer = OrderSerializer(orders, many=True)
+    fieldset = Fieldset.from_request(request)
+    orders = optimize_order_queryset(
+        Order.objects.filter(buyer=request.user), fieldset
+    ).order_by('-created_at')
+    serializer = OrderSerializer(orders, many=True, context={'fieldset': fieldset})
     return Response(serializer.data)
 
 @api_view(['GET'])
@@ -177,47 +246,40 @@ def seller_orders(request):
         return Response({'error': 'Only sellers can access this endpoint'}, 
                        status=status.HTTP_403_FORBIDDEN)
     
-    # Get orders that contain the seller's products
-    orders = Order.objects.filter(
-        items__product__seller=request.user
-    ).distinct().order_by('-created_at')
-    
-    # Filter order items to show only seller's products
-    serialized_orders = []
-    for order in orders:
-        order_data = OrderSerializer(order).data
-        # Filter items to show only this seller's products
-        order_data['items'] = [
-            item for item in order_data['items'] 
-            if item['seller_name'] == request.user.full_name
-        ]
-        serialized_orders.append(order_data)
-    
-    return Response(serialized_orders)
+    # Get orders the seller fulfils, prefetching only their lines and fulfilment
+    fieldset = Fieldset.from_request(request)
+    orders = optimize_order_queryset(
+        Order.objects.filter(fulfilments__seller=request.user),
+        fieldset,
+        items_queryset=OrderItem.objects.filter(product__seller=request.user),
+        fulfilments_queryset=Fulfilment.objects.filter(seller=request.user),
+    ).order_by('-created_at')
+    serializer = OrderSerializer(orders, many=True, context={'fieldset': fieldset})
+    return Response(serializer.data)
 
 @api_view(['GET'])
 def order_detail(request, pk):
     """Get order details"""
+    fieldset = Fieldset.from_request(request)
     try:
-        order = Order.objects.get(pk=pk)
+        orders = Order.objects.select_related('buyer') if fieldset.includes('buyer_name') else Order.objects
+        order = orders.get(pk=pk)
         
         # Check permissions
-        if request.user == order.buyer:
+        if request.user.id == order.buyer_id:
             # Buyer can see their own order
-            serializer = OrderSerializer(order)
-            return Response(serializer.data)
-        elif request.user.is_seller and order.items.filter(product__seller=request.user).exists():
-            # Seller can see orders containing their products
-            order_data = OrderSerializer(order).data
-            # Filter items to show only this seller's products
-            order_data['items'] = [
-                item for item in order_data['items'] 
-                if item['seller_name'] == request.user.full_name
-            ]
-            return Response(order_data)
+            items = fulfilments = None
+        elif request.user.is_seller and order.fulfilments.filter(seller=request.user).exists():
+            # Seller can see orders containing their products, but only their own lines
+            items = OrderItem.objects.filter(product__seller=request.user)
+            fulfilments = Fulfilment.objects.filter(seller=request.user)
         else:
             return Response({'error': 'Permission denied'}, 
                           status=status.HTTP_403_FORBIDDEN)
+        
+        prefetch_related_objects([order], *order_prefetches(fieldset, items, fulfilments))
+        serializer = OrderSerializer(order, context={'fieldset': fieldset})
+        return Response(serializer.data)
             
     except Order.DoesNotExist:
         return Response({'error': 'Order not found'}, 
@@ -225,30 +287,50 @@ def order_detail(request, pk):
 
 @api_view(['PUT'])
 def update_order_status(request, pk):
-    """Update order status (sellers only for their products)"""
+    """Update the status of the seller's own part of an order"""
     if not request.user.is_seller:
         return Response({'error': 'Only sellers can update order status'}, 
                        status=status.HTTP_403_FORBIDDEN)
     
-    try:
-        order = Order.objects.get(pk=pk)
-        
-        # Check if seller has products in this order
-        if not order.items.filter(product__seller=request.user).exists():
-            return Response({'error': 'Permission denied'}, 
-                          status=status.HTTP_403_FORBIDDEN)
-        
-        new_status = request.data.get('status')
-        if new_status not in dict(Order.STATUS_CHOICES):
-            return Response({'error': 'Invalid status'}, 
-                          status=status.HTTP_400_BAD_REQUEST)
-        
-        order.status = new_status
-        order.save()
-        
-        serializer = OrderSerializer(order)
-        return Response(serializer.data)
+    new_status = request.data.get('status')
+    if new_status not in dict(Order.STATUS_CHOICES):
+        return Response({'error': 'Invalid status'}, 
+                      status=status.HTTP_400_BAD_REQUEST)
+    
+    with transaction.atomic():
+        # Locks only this seller's fulfilment, never the shared order row
+        try:
+            fulfilment = Fulfilment.objects.select_for_update().get(order_id=pk, seller=request.user)
+        except Fulfilment.DoesNotExist:
+            if Order.objects.filter(pk=pk).exists():
+                return Response({'error': 'Permission denied'}, 
+                              status=status.HTTP_403_FORBIDDEN)
+            return Response({'error': 'Order not found'}, 
+                           status=status.HTTP_404_NOT_FOUND)
         
-    except Order.DoesNotExist:
-        return Response({'error': 'Order not found'}, 
-                       status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        previous_status = fulfilment.status
+        fulfilment.status = new_status
+        now = timezone.now()
+        if new_status == 'shipped' and fulfilment.shipped_at is None:
+            fulfilment.shipped_at = now
+        if new_status == 'delivered' and fulfilment.delivered_at is None:
+            fulfilment.delivered_at = now
+        fulfilment.save(update_fields=['status', 'shipped_at', 'delivered_at', 'updated_at'])
+        if new_status != previous_status:
+            publish('order.status_changed', {
+                'order_id': pk,
+                'seller_id': request.user.id,
+                'previous_status': previous_status,
+                'status': new_status,
+            })
+    
+    fieldset = Fieldset.from_request(request)
+    orders = Order.objects.select_related('buyer') if fieldset.includes('buyer_name') else Order.objects
+    order = orders.get(pk=pk)
+    prefetch_related_objects([order], *order_prefetches(
+        fieldset,
+        OrderItem.objects.filter(product__seller=request.user),
+        Fulfilment.objects.filter(seller=request.user),
+    ))
+    serializer = OrderSerializer(order, context={'fieldset': fieldset})
+    return Response(serializer.data)
@@ -1,25 +1,53 @@
 from django.contrib import admin
-from .models import Product
+from core.paginators import EstimatedCountPaginator
+from . import stores
+from .models import Product, Store
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     list_display = ('name', 'seller', 'price', 'stock', 'is_active', 'created_at')
-    list_filter = ('is_active', 'created_at', 'seller')
+    list_filter = ('is_active', ('deleted_at', admin.EmptyFieldListFilter), 'created_at')
+    list_select_related = ('seller',)
     search_fields = ('name', 'description', 'seller__email', 'seller__first_name', 'seller__last_name')
     list_editable = ('is_active', 'stock')
     ordering = ('-created_at',)
+    autocomplete_fields = ('seller',)
+    readonly_fields = ('deleted_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         (None, {
             'fields': ('name', 'description', 'seller')
         }),
         ('Pricing & Stock', {
-            'fields': ('price', 'stock')
+            'fields': ('price', 'stock', 'sku')
         }),
         ('Media', {
             'fields': ('image',)
         }),
         ('Status', {
-            'fields': ('is_active',)
+            'fields': ('is_active', 'deleted_at')
         }),
-    )
\ No newline at end of file
+    )
+
+@admin.register(Store)
+class StoreAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'seller', 'created_at')
+    list_select_related = ('seller',)
+    search_fields = ('name', 'slug', 'seller__email')
+    readonly_fields = ('slug', 'created_at', 'updated_at')
+    autocomplete_fields = ('seller',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.slug = stores.unique_slug(obj.name)
+            super().save_model(request, obj, form, change)
+            stores.copy_name(obj.seller_id, obj.name)
+        elif 'name' in form.changed_data:
+            # Re-slugs the store and updates the name copied onto its products
+            stores.rename(obj, obj.name)
+        else:
+            super().save_model(request, obj, form, change)
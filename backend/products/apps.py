@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'products'
\ No newline at end of file
+    name = 'products'
+
+    def ready(self):
+        from . import handlers  # noqa: F401 - registers outbox handlers
+        from . import signals  # noqa: F401 - autocomplete index and media refcounts
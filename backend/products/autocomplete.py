@@ -0,0 +1,323 @@
+"""
+In-memory prefix index for product and store name autocomplete.
+
+Names are normalised and every word start is stored as a key in one sorted
+list, so a prefix maps to a contiguous ``bisect`` range. Record data lives in
+flat ``array`` columns rather than per-entry objects. Prefixes whose range is
+too large to scan within the latency budget get their top results
+precomputed at build time.
+
+Each worker process holds its own copy. It is built when the worker starts
+(see ``core/warmup.py``), kept current by product save/delete signals in the
+owning process and rebuilt every AUTOCOMPLETE_REFRESH_SECONDS to pick up
+changes made by other workers. Saves that change neither the name nor the
+active flag (e.g. checkout's stock updates) leave the index alone. Writes
+never shift the bulk-loaded key list: new keys go to a small sorted overlay
+and renamed records are filtered out of their old keys until the next
+rebuild folds both in. A hot prefix that removals leave short is recomputed
+after the write releases the lock, so searches never wait on a full scan.
+"""
+import heapq
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+KIND_PRODUCT = 0
+KIND_STORE = 1
+KIND_DELETED = 255
+KIND_NAMES = {KIND_PRODUCT: 'product', KIND_STORE: 'store'}
+
+_HIGHEST = '\U0010ffff'
+
+
+def normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+def word_starts(name):
+    """All suffixes of the normalised name that begin at a word boundary"""
+    words = normalize(name).split(' ')
+    return [' '.join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+class PrefixIndex:
+    def __init__(self, scan_limit=None, top_k=None):
+        self.scan_limit = scan_limit or settings.AUTOCOMPLETE_SCAN_LIMIT
+        self.top_k = top_k or settings.AUTOCOMPLETE_TOP_K
+        # Sorted keys and, in parallel, the record each key points to. Filled by
+        # load() and never modified afterwards, so they can be scanned without the lock
+        self.keys = []
+        self.key_records = array('l')
+        # Keys added since the load, kept sorted; small until the next rebuild,
+        # so inserting into them stays cheap
+        self.new_keys = []
+        self.new_key_records = array('l')
+        # Records relabelled since the load, whose keys in self.keys may be out of date
+        self.relabelled = set()
+        # Record columns
+        self.ids = array('q')
+        self.kinds = bytearray()
+        self.scores = array('d')
+        self.labels = []
+        self.product_records = {}
+        self.store_records = {}
+        # Precomputed top records for prefixes with more than scan_limit keys
+        self.hot_prefixes = {}
+        # Hot prefixes left with fewer than top_k records, refilled outside the lock
+        self._short = set()
+        self.lock = threading.RLock()
+        self.built_at = time.monotonic()
+
+    def _add_record(self, kind, object_id, label, score):
+        record = len(self.ids)
+        self.ids.append(object_id)
+        self.kinds.append(kind)
+        self.scores.append(score)
+        self.labels.append(label)
+        return record
+
+    def load(self, entries):
+        """Bulk load ``(kind, id, label, score)`` tuples and build the hot prefix table"""
+        pairs = []
+        for kind, object_id, label, score in entries:
+            record = self._add_record(kind, object_id, label, score)
+            if kind == KIND_PRODUCT:
+                self.product_records[object_id] = record
+            elif kind == KIND_STORE:
+                self.store_records[object_id] = record
+            pairs.extend((key, record) for key in word_starts(label))
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.key_records = array('l', (record for _, record in pairs))
+        self._build_hot_prefixes(0, len(self.keys), 1)
+
+    def _best(self, records, k):
+        live = (record for record in records if self.kinds[record] != KIND_DELETED)
+        return heapq.nlargest(k, sorted(live), key=lambda record: self.scores[record])
+
+    def _top_records(self, lo, hi, k):
+        # A record can own several keys in the range; rank each live record once
+        return self._best({self.key_records[i] for i in range(lo, hi)}, k)
+
+    def _base_records(self, prefix):
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + _HIGHEST, lo)
+        return {self.key_records[i] for i in range(lo, hi)}
+
+    def _current(self, records, prefix):
+        """``records`` found under ``prefix`` in self.keys, less those relabelled away from it, plus newer keys"""
+        if self.relabelled:
+            records = {
+                record for record in records
+                if record not in self.relabelled
+                or any(key.startswith(prefix) for key in word_starts(self.labels[record]))
+            }
+        lo = bisect_left(self.new_keys, prefix)
+        hi = bisect_left(self.new_keys, prefix + _HIGHEST, lo)
+        records.update(self.new_key_records[i] for i in range(lo, hi))
+        return records
+
+    def _build_hot_prefixes(self, lo, hi, depth):
+        """Precompute results for every prefix whose range exceeds scan_limit"""
+        stack = [(lo, hi, depth)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            while lo < hi:
+                if len(self.keys[lo]) < depth:
+                    lo += 1
+                    continue
+                prefix = self.keys[lo][:depth]
+                end = bisect_left(self.keys, prefix + _HIGHEST, lo, hi)
+                if end - lo > self.scan_limit:
+                    # Twice the results, so a few removals don't force a recompute
+                    self.hot_prefixes[prefix] = self._top_records(lo, end, self.top_k * 2)
+                    stack.append((lo, end, depth + 1))
+                lo = end
+
+    def search(self, query, limit):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        with self.lock:
+            records = self.hot_prefixes.get(prefix)
+            if records is None:
+                records = self._best(self._current(self._base_records(prefix), prefix), limit)
+            else:
+                records = [r for r in records if self.kinds[r] != KIND_DELETED][:limit]
+            return [
+                {'type': KIND_NAMES[self.kinds[r]], 'id': self.ids[r], 'label': self.labels[r]}
+                for r in records
+            ]
+
+    def _hot_prefixes_of(self, label):
+        for key in word_starts(label):
+            for depth in range(1, len(key) + 1):
+                prefix = key[:depth]
+                hot = self.hot_prefixes.get(prefix)
+                if hot is None:
+                    break
+                yield prefix, hot
+
+    def _add_keys(self, record):
+        for key in word_starts(self.labels[record]):
+            position = bisect_left(self.new_keys, key)
+            self.new_keys.insert(position, key)
+            self.new_key_records.insert(position, record)
+        for _, hot in self._hot_prefixes_of(self.labels[record]):
+            if record not in hot:
+                hot.append(record)
+            hot.sort(key=lambda r: -self.scores[r])
+            del hot[self.top_k * 2:]
+
+    def _drop_keys(self, record):
+        for key in word_starts(self.labels[record]):
+            position = bisect_left(self.new_keys, key)
+            while position < len(self.new_keys) and self.new_keys[position] == key:
+                if self.new_key_records[position] == record:
+                    del self.new_keys[position]
+                    del self.new_key_records[position]
+                    break
+                position += 1
+        for prefix, hot in self._hot_prefixes_of(self.labels[record]):
+            if record in hot:
+                hot.remove(record)
+                if len(hot) < self.top_k:
+                    self._short.add(prefix)
+
+    def _relabel(self, record, label, score):
+        if self.labels[record] == label and score is None:
+            return
+        self._drop_keys(record)
+        self.relabelled.add(record)
+        self.labels[record] = label
+        if score is not None:
+            self.scores[record] = score
+        self._add_keys(record)
+
+    def _refill_short(self):
+        """Recompute hot prefixes that removals left short, scanning self.keys outside the lock"""
+        with self.lock:
+            prefixes, self._short = self._short, set()
+        for prefix in prefixes:
+            candidates = self._best(self._base_records(prefix), self.top_k * 2)
+            with self.lock:
+                if prefix in self.hot_prefixes:
+                    # Re-checked under the lock: writes may have landed since the scan
+                    records = self._current(set(candidates) | set(self.hot_prefixes[prefix]), prefix)
+                    self.hot_prefixes[prefix] = self._best(records, self.top_k * 2)
+
+    def upsert_product(self, product_id, name, score=None):
+        with self.lock:
+            record = self.product_records.get(product_id)
+            if record is None:
+                record = self._add_record(KIND_PRODUCT, product_id, name, score or 0.0)
+                self.product_records[product_id] = record
+                self._add_keys(record)
+            else:
+                # Updated in place, so repeated saves never grow the index
+                self._relabel(record, name, score)
+        self._refill_short()
+
+    def rename_store(self, seller_id, name):
+        with self.lock:
+            record = self.store_records.get(seller_id)
+            if record is not None:
+                self._relabel(record, name, None)
+        self._refill_short()
+
+    def remove_product(self, product_id):
+        with self.lock:
+            record = self.product_records.pop(product_id, None)
+            if record is not None:
+                # The record slot stays, unreferenced, until the next rebuild
+                self._drop_keys(record)
+                self.kinds[record] = KIND_DELETED
+        self._refill_short()
+
+    def __len__(self):
+        return len(self.product_records)
+
+
+def collect_entries():
+    """Active products and their stores, scored by units sold"""
+    from .models import Product
+
+    store_scores = {}
+    store_names = {}
+    rows = (Product.objects.filter(is_active=True)
+            .values_list('id', 'name', 'seller_id', 'store_display_name', 'units_sold')
+            .order_by().iterator(chunk_size=10000))
+    for product_id, name, seller_id, store_name, units_sold in rows:
+        score = float(units_sold)
+        yield KIND_PRODUCT, product_id, name, score
+        store_scores[seller_id] = store_scores.get(seller_id, 0.0) + score
+        store_names[seller_id] = store_name
+    for seller_id, name in store_names.items():
+        yield KIND_STORE, seller_id, name, store_scores[seller_id]
+
+
+_index = None
+_build_lock = threading.Lock()
+
+
+def build():
+    global _index
+    started = time.monotonic()
+    index = PrefixIndex()
+    index.load(collect_entries())
+    _index = index
+    logger.info('Autocomplete index built with %s products in %.2fs', len(index), time.monotonic() - started)
+    return index
+
+
+def _refresh_in_background():
+    if _build_lock.acquire(blocking=False):
+        def run():
+            try:
+                build()
+            finally:
+                _build_lock.release()
+        threading.Thread(target=run, daemon=True).start()
+
+
+def get_index():
+    if _index is None:
+        with _build_lock:
+            if _index is None:
+                build()
+    elif time.monotonic() - _index.built_at > settings.AUTOCOMPLETE_REFRESH_SECONDS:
+        _refresh_in_background()
+    return _index
+
+
+def start():
+    """Build the index off the request path when the worker boots"""
+    if settings.AUTOCOMPLETE_PRELOAD:
+        _refresh_in_background()
+
+
+def product_saved(product, update_fields=None):
+    if _index is None:
+        return
+    if update_fields is not None and not {'name', 'is_active'} & set(update_fields):
+        return
+    if product.is_active:
+        _index.upsert_product(product.id, product.name)
+    else:
+        _index.remove_product(product.id)
+
+
+def store_renamed(seller_id, name):
+    if _index is not None:
+        _index.rename_store(seller_id, name)
+
+
+def product_deleted(product):
+    if _index is not None:
+        _index.remove_product(product.id)
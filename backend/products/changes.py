@@ -0,0 +1,118 @@
+"""
+Incremental "changed since" feed of the product catalog.
+
+Every product write takes the next value of the ``product_changes`` sequence
+into ``Product.change_seq``: ``Product.save`` does it for single rows, and
+bulk ``UPDATE`` paths call ``stamp()`` once and give every row they touch the
+same value. Rows deleted outright leave a ``ProductTombstone`` with their own
+value. Because the sequence is commit-ordered (see ``core.sequences``), a
+consumer that has read up to a position never misses a change committed
+later.
+
+Taking a value locks the sequence row until commit, so long transactions
+that save products early (checkout) wrap their body in ``deferred_stamps()``:
+the saves are collected and stamped with one UPDATE at the end of the block,
+just before the commit.
+
+The feed walks ``(change_seq, id)`` with a keyset cursor over the matching
+index, so an incremental sync reads only rows changed since its cursor.
+Active products carry their listing representation; products that were
+deactivated, soft-deleted or deleted are tombstones.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db.models import Q
+
+from core import sequences
+from .models import CHANGE_SEQUENCE, Product, ProductTombstone
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def stamp():
+    """Change sequence value for a bulk update; call inside its transaction"""
+    return sequences.next_value(CHANGE_SEQUENCE)
+
+
+_local = threading.local()
+
+
+@contextmanager
+def deferred_stamps():
+    """Stamp products saved inside the block with one value when it exits; use as the last block before commit"""
+    if getattr(_local, 'pending', None) is not None:
+        # Nested; the outermost block stamps everything
+        yield
+        return
+    _local.pending = pending = set()
+    try:
+        yield
+    finally:
+        _local.pending = None
+    if pending:
+        Product.objects.filter(id__in=pending).update(change_seq=stamp())
+
+
+def stamp_on_save(product):
+    """Value for ``Product.save`` to store, or None when an enclosing ``deferred_stamps()`` will stamp it"""
+    pending = getattr(_local, 'pending', None)
+    if pending is not None and product.pk is not None:
+        pending.add(product.pk)
+        return None
+    return stamp()
+
+
+def record_deletion(product_id):
+    ProductTombstone.objects.create(product_id=product_id, change_seq=stamp())
+
+
+def encode_cursor(change_seq, product_id):
+    return f'{change_seq}.{product_id}'
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return 0, 0
+    try:
+        change_seq, product_id = (int(part) for part in cursor.split('.'))
+    except ValueError:
+        raise InvalidCursor(f'Invalid cursor {cursor!r}')
+    return change_seq, product_id
+
+
+def changes_since(cursor, limit, products=None):
+    """
+    Up to ``limit`` changes after ``cursor`` in feed order.
+
+    Returns ``(entries, next_cursor, has_more)``; each entry is
+    ``(change_seq, product_id, product)`` where ``product`` is None for a
+    tombstone. ``products`` is the base queryset, so callers can add joins.
+    """
+    change_seq, product_id = decode_cursor(cursor)
+    products = products if products is not None else Product.objects.all()
+    rows = list(
+        products.filter(Q(change_seq__gt=change_seq) | Q(change_seq=change_seq, id__gt=product_id))
+        .order_by('change_seq', 'id')[:limit + 1]
+    )
+    tombstones = (ProductTombstone.objects
+                  .filter(Q(change_seq__gt=change_seq) | Q(change_seq=change_seq, product_id__gt=product_id))
+                  .order_by('change_seq', 'product_id')
+                  .values_list('change_seq', 'product_id')[:limit + 1])
+
+    entries = [
+        (product.change_seq, product.id,
+         product if product.is_active and product.deleted_at is None else None)
+        for product in rows
+    ]
+    entries.extend((seq, deleted_id, None) for seq, deleted_id in tombstones)
+    entries.sort(key=lambda entry: entry[:2])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if entries:
+        next_cursor = encode_cursor(*entries[-1][:2])
+    else:
+        next_cursor = encode_cursor(change_seq, product_id)
+    return entries, next_cursor, has_more
@@ -0,0 +1,65 @@
+import logging
+from datetime import timedelta
+
+from django.db.models import Q
+
+from core import coalesce
+from core.outbox import publish, register
+from orders import cart_summary, retention
+from orders.models import CartItem
+from . import recommendations
+from .models import RelatedProduct
+
+logger = logging.getLogger(__name__)
+analytics_logger = logging.getLogger('cart_builder.analytics')
+
+# Back-off before retrying a purge whose remaining cart lines were all locked
+LOCKED_RETRY_DELAY = timedelta(seconds=5)
+
+
+@register('product.created')
+def record_product_change(payload):
+    analytics_logger.info('product_changed', extra={'event': payload})
+
+
+@register('product.deleted')
+def purge_deleted_product(payload, batch_size=500):
+    """
+    Remove what still points at a soft-deleted product; order lines are kept.
+
+    Handlers run inside the event's transaction, so each event purges one
+    chunk and publishes a follow-up for the rest; every chunk commits (and
+    releases its locks) with its own event.
+    """
+    product_id = payload['product_id']
+    lines = retention.purge_product_lines(product_id, batch_size)
+    neighbours = RelatedProduct.objects.filter(Q(product_id=product_id) | Q(related_id=product_id))
+    ids = list(neighbours.values_list('id', flat=True)[:batch_size])
+    RelatedProduct.objects.filter(id__in=ids).delete()
+    purged = payload.get('purged_lines', 0) + lines
+    # Lines locked by a concurrent cart update were skipped; the follow-up retries them
+    if CartItem.objects.filter(product_id=product_id).exists() or neighbours.exists():
+        publish('product.deleted', dict(payload, purged_lines=purged),
+                delay=None if lines or ids else LOCKED_RETRY_DELAY)
+        return
+    logger.info('Purged %s cart lines for deleted product %s', purged, product_id)
+    record_product_change({key: value for key, value in payload.items() if key != 'purged_lines'})
+
+
+@register('product.updated')
+def product_updated(payload):
+    # Price or availability may have changed; cached cart totals are stale
+    cart_summary.invalidate_for_product(payload['product_id'])
+    record_product_change(payload)
+
+
+@register('products.details_changed')
+def retire_product_details(payload):
+    # Bulk updates skip the save signals that bump these; a repeat only costs another bump
+    for product_id in payload['product_ids']:
+        coalesce.bump(f'product:{product_id}')
+
+
+@register('recommendations.order_created')
+def update_recommendations(payload):
+    recommendations.apply_order(payload['order_id'])
@@ -0,0 +1,116 @@
+"""
+Bulk stock sync for sellers' warehouse integrations.
+
+Each row names a product by ``product_id`` or ``sku`` and sets either an
+absolute ``stock`` or a relative ``delta``. Rows are applied in batches of
+INVENTORY_SYNC_BATCH_SIZE. Each batch locks the seller's matching products
+with one SELECT, computes the new levels in Python (repeated rows for the
+same product apply in order), and writes them back with a single
+``UPDATE ... SET stock = CASE id WHEN ... END``. Only rows that could not be
+applied are reported back. Cached product details are retired by the outbox
+worker (``products.details_changed``), off the request path.
+"""
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from core.outbox import publish
+from . import changes
+from .models import Product
+
+
+def _parse(index, row):
+    """Validate one row; returns (row, None) or (None, failure)"""
+    if not isinstance(row, dict):
+        return None, {'index': index, 'error': 'Each item must be an object'}
+    failure = {'index': index}
+    for key in ('product_id', 'sku'):
+        if key in row:
+            failure[key] = row[key]
+
+    if ('product_id' in row) == ('sku' in row):
+        return None, dict(failure, error='Give exactly one of product_id or sku')
+    if ('stock' in row) == ('delta' in row):
+        return None, dict(failure, error='Give exactly one of stock or delta')
+
+    ref = row.get('product_id', row.get('sku'))
+    if 'product_id' in row and (not isinstance(ref, int) or isinstance(ref, bool)):
+        return None, dict(failure, error='product_id must be an integer')
+    if 'sku' in row and (not isinstance(ref, str) or not ref):
+        return None, dict(failure, error='sku must be a non-empty string')
+
+    value = row.get('stock', row.get('delta'))
+    if not isinstance(value, int) or isinstance(value, bool):
+        return None, dict(failure, error='stock and delta must be integers')
+    if 'stock' in row and value < 0:
+        return None, dict(failure, error='Stock cannot be negative')
+
+    return {
+        'index': index, 'failure': failure, 'by_sku': 'sku' in row, 'ref': ref,
+        'absolute': 'stock' in row, 'value': value,
+    }, None
+
+
+def _apply_batch(seller, rows):
+    ids = {row['ref'] for row in rows if not row['by_sku']}
+    skus = {row['ref'] for row in rows if row['by_sku']}
+    failed = []
+    with transaction.atomic():
+        products = (Product.objects.select_for_update()
+                    .filter(seller=seller, deleted_at__isnull=True).filter(Q(id__in=ids) | Q(sku__in=skus))
+                    .order_by('id')  # Consistent lock order between concurrent syncs
+                    .values_list('id', 'sku', 'stock'))
+        stock, by_sku = {}, {}
+        for product_id, sku, current in products:
+            stock[product_id] = current
+            if sku:
+                by_sku[sku] = product_id
+
+        changed, applied = set(), 0
+        for row in rows:
+            product_id = by_sku.get(row['ref']) if row['by_sku'] else row['ref']
+            if product_id not in stock:
+                failed.append(dict(row['failure'], error='Product not found'))
+                continue
+            new_stock = row['value'] if row['absolute'] else stock[product_id] + row['value']
+            if new_stock < 0:
+                failed.append(dict(row['failure'], error='Stock cannot go below zero', stock=stock[product_id]))
+                continue
+            stock[product_id] = new_stock
+            changed.add(product_id)
+            applied += 1
+
+        if changed:
+            Product.objects.filter(id__in=changed).update(
+                stock=Case(
+                    *[When(id=product_id, then=Value(stock[product_id])) for product_id in changed],
+                    default=F('stock'), output_field=IntegerField(),
+                ),
+                updated_at=timezone.now(),
+                change_seq=changes.stamp(),
+            )
+            # Bulk updates skip the save signals that retire cached detail responses
+            publish('products.details_changed', {'product_ids': sorted(changed)})
+    return applied, failed
+
+
+def sync_stock(seller, items, batch_size):
+    """Apply stock rows for ``seller``; returns (rows applied, failed rows)"""
+    updated, failed, batch = 0, [], []
+    for index, item in enumerate(items):
+        row, failure = _parse(index, item)
+        if failure:
+            failed.append(failure)
+            continue
+        batch.append(row)
+        if len(batch) >= batch_size:
+            count, batch_failed = _apply_batch(seller, batch)
+            updated += count
+            failed.extend(batch_failed)
+            batch = []
+    if batch:
+        count, batch_failed = _apply_batch(seller, batch)
+        updated += count
+        failed.extend(batch_failed)
+    failed.sort(key=lambda failure: failure['index'])
+    return updated, failed
@@ -0,0 +1,23 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from products.recommendations import build_cooccurrence
+
+
+class Command(BaseCommand):
+    help = 'Rebuild "frequently bought together" neighbours from order history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=settings.RECOMMENDATIONS_TOP_K,
+                            help='Neighbours kept per product')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows read and written per batch')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = build_cooccurrence(options['top_k'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {count} neighbour rows in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.popularity import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute units sold, order counts and trending scores from order history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Products recomputed per batch')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed sales counters for {count} products in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils.text import slugify
+
+
+def create_stores(apps, schema_editor):
+    """A store for every seller with products, named after the seller as before"""
+    User = apps.get_model('accounts', 'User')
+    Store = apps.get_model('products', 'Store')
+    Product = apps.get_model('products', 'Product')
+    taken = set()
+    sellers = User.objects.filter(Q(is_seller=True) | Q(products__isnull=False)).distinct().order_by('id')
+    for seller in sellers.iterator(chunk_size=1000):
+        name = f'{seller.first_name} {seller.last_name}'.strip() or seller.email
+        base = slugify(name)[:200] or 'store'
+        slug, suffix = base, 2
+        while slug in taken:
+            slug = f'{base}-{suffix}'
+            suffix += 1
+        taken.add(slug)
+        Store.objects.create(seller=seller, name=name, slug=slug)
+        Product.objects.filter(seller=seller).update(store_display_name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_deleted_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='store_display_name',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.CreateModel(
+            name='Store',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('slug', models.SlugField(max_length=220, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('seller', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='store', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'stores',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RunPython(create_stores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:25
+
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    # Same weighting as products.popularity at the time of writing
+    Product = apps.get_model('products', 'Product')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    epoch = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    counters = {}
+    rows = OrderItem.objects.values_list('product_id', 'quantity', 'order_id', 'order__created_at').iterator()
+    for product_id, quantity, order_id, created_at in rows:
+        counter = counters.setdefault(product_id, [0, set(), 0.0])
+        days = (created_at - epoch).total_seconds() / 86400
+        counter[0] += quantity
+        counter[1].add(order_id)
+        counter[2] += quantity * 2.0 ** (days / settings.TRENDING_HALF_LIFE_DAYS)
+    for product_id, (units, orders, score) in counters.items():
+        Product.objects.filter(id=product_id).update(
+            units_sold=units, order_count=len(orders), trending_score=score
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_fulfilment'),
+        ('products', '0006_store'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='order_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='units_sold',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-units_sold', '-created_at'], name='products_units_s_b781fa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-trending_score', '-created_at'], name='products_trendin_070695_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def number_existing_products(apps, schema_editor):
+    # Existing products enter the feed in the order they were last updated
+    Product = apps.get_model('products', 'Product')
+    Sequence = apps.get_model('core', 'Sequence')
+    batch = []
+    seq = 0
+    for product_id in Product.objects.order_by('updated_at', 'id').values_list('id', flat=True).iterator():
+        seq += 1
+        batch.append(Product(id=product_id, change_seq=seq))
+        if len(batch) >= 1000:
+            Product.objects.bulk_update(batch, ['change_seq'])
+            batch = []
+    Product.objects.bulk_update(batch, ['change_seq'])
+    Sequence.objects.update_or_create(name='product_changes', defaults={'value': seq})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_sequence'),
+        ('products', '0007_product_sales_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.IntegerField()),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'product_tombstones',
+            },
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='change_seq',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['change_seq', 'id'], name='products_change__eaaac8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producttombstone',
+            index=models.Index(fields=['change_seq', 'product_id'], name='product_tom_change__18d10e_idx'),
+        ),
+        migrations.RunPython(number_existing_products, migrations.RunPython.noop),
+    ]
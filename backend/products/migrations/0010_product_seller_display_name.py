@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_seller_names(apps, schema_editor):
+    """Fill the copy from each seller's name, as seller_name rendered it before"""
+    User = apps.get_model('accounts', 'User')
+    Product = apps.get_model('products', 'Product')
+    sellers = User.objects.filter(products__isnull=False).distinct().order_by('id')
+    for seller in sellers.iterator(chunk_size=1000):
+        Product.objects.filter(seller=seller).update(seller_display_name=f'{seller.first_name} {seller.last_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_product_seller_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='seller_display_name',
+            field=models.CharField(blank=True, default='', max_length=301),
+        ),
+        migrations.RunPython(copy_seller_names, migrations.RunPython.noop),
+    ]
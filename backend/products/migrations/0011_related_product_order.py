@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_product_seller_display_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProductOrder',
+            fields=[
+                ('order_id', models.BigIntegerField(primary_key=True, serialize=False)),
+            ],
+            options={
+                'db_table': 'related_product_orders',
+            },
+        ),
+    ]
@@ -1,39 +1,87 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
+# Sequence every product write draws its change_seq from, see products/changes.py
+CHANGE_SEQUENCE = 'product_changes'
+
+class Store(models.Model):
+    """A seller's storefront; its name is copied onto the seller's products"""
+    seller = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='store')
+    name = models.CharField(max_length=200)
+    slug = models.SlugField(max_length=220, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'stores'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
 class Product(models.Model):
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
     stock = models.PositiveIntegerField(default=0)
+    sku = models.CharField(max_length=64, blank=True, null=True)  # Seller's own stock keeping unit
     image = models.ImageField(upload_to='products/', blank=True, null=True)  # Keep for backward compatibility
     seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='products')
+    store_display_name = models.CharField(max_length=200, blank=True, default='')  # Copy of Store.name
+    seller_display_name = models.CharField(max_length=301, blank=True, default='')  # Copy of seller.full_name
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    deleted_at = models.DateTimeField(blank=True, null=True)  # Tombstone; dependents are purged in the background
+    # Sales counters maintained at checkout, see products/popularity.py
+    units_sold = models.PositiveIntegerField(default=0)
+    order_count = models.PositiveIntegerField(default=0)
+    trending_score = models.FloatField(default=0)
+    change_seq = models.BigIntegerField(default=0)  # Position in the change feed, set on every save
 
     class Meta:
         db_table = 'products'
         ordering = ['-created_at']
+        unique_together = ['seller', 'sku']
         indexes = [
             models.Index(fields=['seller', 'is_active']),
+            models.Index(fields=['seller', '-created_at']),
             models.Index(fields=['name']),
             models.Index(fields=['-created_at']),
+            models.Index(fields=['-units_sold', '-created_at']),
+            models.Index(fields=['-trending_score', '-created_at']),
+            models.Index(fields=['change_seq', 'id']),
         ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        from . import changes
+
+        # The sequence row stays locked until commit, so feed readers see changes in sequence order
+        with transaction.atomic():
+            change_seq = changes.stamp_on_save(self)
+            if change_seq is not None:
+                self.change_seq = change_seq
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], 'change_seq'}
+            super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'image' in instance.__dict__:
+            # Remember the stored file so a replaced image can release its reference
+            instance._loaded_image = instance.__dict__['image']
+        return instance
+
     @property
     def is_in_stock(self):
         return self.stock > 0
 
-    @property
-    def store_name(self):
-        return self.seller.full_name if self.seller else "Unknown Store"
-
     @property
     def primary_image(self):
         """Return the first image or the legacy image field"""
@@ -59,4 +107,45 @@ class ProductImage(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.product.name} - Image {self.order}"
\ No newline at end of file
+        return f"{self.product.name} - Image {self.order}"
+
+class ProductTombstone(models.Model):
+    """Change feed entry for a product whose row was deleted outright"""
+    product_id = models.IntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'product_tombstones'
+        indexes = [
+            models.Index(fields=['change_seq', 'product_id']),
+        ]
+
+    def __str__(self):
+        return f"Deleted product {self.product_id} (#{self.change_seq})"
+
+class RelatedProduct(models.Model):
+    """Precomputed "frequently bought together" neighbour of a product"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    score = models.PositiveIntegerField(default=0)  # Number of orders containing both products
+
+    class Meta:
+        db_table = 'related_products'
+        unique_together = ['product', 'related']
+        indexes = [
+            models.Index(fields=['product', '-score']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} ({self.score})"
+
+class RelatedProductOrder(models.Model):
+    """An order already counted in related_products, so a redelivered event is not counted twice"""
+    order_id = models.BigIntegerField(primary_key=True)
+
+    class Meta:
+        db_table = 'related_product_orders'
+
+    def __str__(self):
+        return f"Order {self.order_id}"
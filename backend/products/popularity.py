@@ -0,0 +1,81 @@
+"""
+Sales counters behind the ``popular`` and ``trending`` product sorts.
+
+Checkout bumps ``units_sold``, ``order_count`` and ``trending_score`` on each
+product with one ``F()`` UPDATE, so sorting by sales never aggregates
+``order_items``. ``trending_score`` is units sold with exponential decay:
+rather than decaying every row over time, each sale is weighted by
+``2 ** (days since EPOCH / half-life)``, so newer sales weigh more and the order of
+the stored scores matches the order of the decayed ones. The weights double
+once per TRENDING_HALF_LIFE_DAYS; at the default of a week a float holds them
+for well over a decade.
+
+``rebuild`` recomputes all three counters from order history, for backfills
+and after counters drift (e.g. an order edited by hand in the admin).
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import Product
+
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+# Both sorts break ties by recency, matching the default sort
+SORTS = {
+    'popular': ('-units_sold', '-created_at'),
+    'trending': ('-trending_score', '-created_at'),
+}
+
+
+def weight(when):
+    days = (when - EPOCH).total_seconds() / 86400
+    return 2.0 ** (days / settings.TRENDING_HALF_LIFE_DAYS)
+
+
+def record_sales(quantities, when=None):
+    """Add one order's ``{product_id: quantity}`` to the counters"""
+    sale_weight = weight(when or timezone.now())
+    # Consistent lock order between concurrent checkouts
+    for product_id in sorted(quantities):
+        quantity = quantities[product_id]
+        Product.objects.filter(id=product_id).update(
+            units_sold=F('units_sold') + quantity,
+            order_count=F('order_count') + 1,
+            trending_score=F('trending_score') + quantity * sale_weight,
+        )
+
+
+def rebuild(batch_size=1000):
+    """Recompute every product's counters from order items; returns products updated"""
+    from orders.models import OrderItem
+
+    updated = 0
+    last_id = 0
+    while True:
+        ids = list(Product.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return updated
+        last_id = ids[-1]
+
+        lines = OrderItem.objects.filter(product_id__in=ids)
+        totals = {
+            product_id: (units, orders) for product_id, units, orders in
+            lines.values('product_id').annotate(units=Sum('quantity'), orders=Count('order_id', distinct=True))
+            .order_by().values_list('product_id', 'units', 'orders')
+        }
+        scores = {}
+        for product_id, quantity, created_at in lines.values_list('product_id', 'quantity', 'order__created_at').iterator():
+            scores[product_id] = scores.get(product_id, 0.0) + quantity * weight(created_at)
+
+        products = []
+        for product_id in ids:
+            units, orders = totals.get(product_id, (0, 0))
+            products.append(Product(id=product_id, units_sold=units, order_count=orders,
+                                    trending_score=scores.get(product_id, 0.0)))
+        with transaction.atomic():
+            Product.objects.bulk_update(products, ['units_sold', 'order_count', 'trending_score'])
+        updated += len(products)
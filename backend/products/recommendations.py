@@ -0,0 +1,103 @@
+"""
+"Frequently bought together" recommendations.
+
+A full rebuild turns the order history into a sparse orders x products
+incidence matrix A and computes the co-occurrence matrix C = A.T @ A, keeping
+the top-K neighbours of every product in the ``related_products`` table. New
+orders are folded in incrementally by ``apply_order``; the periodic rebuild
+restores exact rankings for pairs that did not fit in a full neighbour list.
+Both record the orders they counted in ``related_product_orders``, so an
+``order.created`` event delivered twice, or one processed after the rebuild
+already saw its order, is not counted again.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+
+from orders.models import OrderItem
+from .models import RelatedProduct, RelatedProductOrder
+
+
+def build_cooccurrence(top_k=None, batch_size=5000):
+    """Recompute the neighbour table from all OrderItem rows; returns rows written"""
+    # Only the offline rebuild needs NumPy/SciPy, so web workers never import them
+    import numpy as np
+    from scipy import sparse
+
+    top_k = top_k or settings.RECOMMENDATIONS_TOP_K
+    pairs = np.fromiter(
+        (value for row in OrderItem.objects.values_list('order_id', 'product_id').iterator(chunk_size=batch_size)
+         for value in row),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    if not len(pairs):
+        with transaction.atomic():
+            RelatedProduct.objects.all().delete()
+            RelatedProductOrder.objects.all().delete()
+        return 0
+
+    order_ids, order_index = np.unique(pairs[:, 0], return_inverse=True)
+    product_ids, product_index = np.unique(pairs[:, 1], return_inverse=True)
+
+    # (order, product) is unique, so A is a 0/1 matrix and C counts shared orders
+    incidence = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.int32), (order_index, product_index)),
+        shape=(len(order_ids), len(product_ids)),
+    )
+    cooccurrence = (incidence.T @ incidence).tocoo()
+    mask = cooccurrence.row != cooccurrence.col
+    rows, cols, scores = cooccurrence.row[mask], cooccurrence.col[mask], cooccurrence.data[mask]
+
+    # Sort by (row, -score) and keep the first top_k entries of every row
+    order = np.lexsort((-scores, rows))
+    rows, cols, scores = rows[order], cols[order], scores[order]
+    row_starts = np.searchsorted(rows, rows, side='left')
+    keep = (np.arange(len(rows)) - row_starts) < top_k
+    rows, cols, scores = rows[keep], cols[keep], scores[keep]
+
+    with transaction.atomic():
+        RelatedProduct.objects.all().delete()
+        for start in range(0, len(rows), batch_size):
+            end = start + batch_size
+            RelatedProduct.objects.bulk_create([
+                RelatedProduct(product_id=int(product_ids[row]), related_id=int(product_ids[col]), score=int(score))
+                for row, col, score in zip(rows[start:end], cols[start:end], scores[start:end])
+            ])
+        RelatedProductOrder.objects.all().delete()
+        for start in range(0, len(order_ids), batch_size):
+            RelatedProductOrder.objects.bulk_create([
+                RelatedProductOrder(order_id=int(order_id)) for order_id in order_ids[start:start + batch_size]
+            ])
+    return len(rows)
+
+
+def apply_order(order_id, top_k=None):
+    """Fold one order's co-purchases into the precomputed neighbour lists"""
+    top_k = top_k or settings.RECOMMENDATIONS_TOP_K
+    product_ids = list(OrderItem.objects.filter(order_id=order_id).values_list('product_id', flat=True))
+    if len(product_ids) < 2:
+        return
+
+    with transaction.atomic():
+        # Committed with the scores, so a repeat of the same order finds it and stops
+        _, new = RelatedProductOrder.objects.get_or_create(order_id=order_id)
+        if not new:
+            return
+        existing = RelatedProduct.objects.filter(product_id__in=product_ids, related_id__in=product_ids)
+        known_pairs = set(existing.values_list('product_id', 'related_id'))
+        existing.update(score=F('score') + 1)
+
+        neighbour_counts = dict(
+            RelatedProduct.objects.filter(product_id__in=product_ids)
+            .values_list('product_id').annotate(count=Count('id'))
+        )
+        new_rows = []
+        for product_id in product_ids:
+            free_slots = top_k - neighbour_counts.get(product_id, 0)
+            for related_id in product_ids:
+                if free_slots <= 0:
+                    break
+                if related_id != product_id and (product_id, related_id) not in known_pairs:
+                    new_rows.append(RelatedProduct(product_id=product_id, related_id=related_id, score=1))
+                    free_slots -= 1
+        RelatedProduct.objects.bulk_create(new_rows, ignore_conflicts=True)
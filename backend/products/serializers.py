@@ -1,20 +1,22 @@
 from rest_framework import serializers
-from .models import Product, ProductImage
+from core.serializers import SparseFieldsetMixin
+from .models import Product, ProductImage, Store
 
-class ProductImageSerializer(serializers.ModelSerializer):
+class ProductImageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ProductImage
         fields = ['id', 'image', 'alt_text', 'order', 'created_at']
 
-class ProductSerializer(serializers.ModelSerializer):
-    store_name = serializers.ReadOnlyField()
-    seller_name = serializers.CharField(source='seller.full_name', read_only=True)
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # Both read denormalised copies, so rendering never joins the seller
+    store_name = serializers.CharField(source='store_display_name', read_only=True)
+    seller_name = serializers.CharField(source='seller_display_name', read_only=True)
     images = ProductImageSerializer(many=True, read_only=True)
     primary_image = serializers.ReadOnlyField()
     
     class Meta:
         model = Product
-        fields = ['id', 'name', 'description', 'price', 'stock', 'image', 'images', 'primary_image', 'store_name', 'seller_name', 'is_active', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'description', 'price', 'stock', 'sku', 'image', 'images', 'primary_image', 'store_name', 'seller_name', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at', 'store_name', 'seller_name']
 
 class ProductCreateUpdateSerializer(serializers.ModelSerializer):
@@ -26,7 +28,7 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Product
-        fields = ['name', 'description', 'price', 'stock', 'image', 'images', 'is_active']
+        fields = ['name', 'description', 'price', 'stock', 'sku', 'image', 'images', 'is_active']
         
     def validate_price(self, value):
         if value <= 0:
@@ -38,6 +40,17 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Stock cannot be negative")
         return value
 
+    def validate_sku(self, value):
+        if not value:
+            return None
+        seller = self.instance.seller if self.instance else self.context['request'].user
+        existing = Product.objects.filter(seller=seller, sku=value)
+        if self.instance:
+            existing = existing.exclude(pk=self.instance.pk)
+        if existing.exists():
+            raise serializers.ValidationError("You already have a product with this SKU")
+        return value
+
     def create(self, validated_data):
         images_data = validated_data.pop('images', [])
         product = Product.objects.create(**validated_data)
@@ -75,11 +88,40 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
         
         return instance
 
-class ProductListSerializer(serializers.ModelSerializer):
-    store_name = serializers.ReadOnlyField()
-    seller_name = serializers.CharField(source='seller.full_name', read_only=True)
+class ProductListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    store_name = serializers.CharField(source='store_display_name', read_only=True)
+    seller_name = serializers.CharField(source='seller_display_name', read_only=True)
     primary_image = serializers.ReadOnlyField()
     
     class Meta:
         model = Product
-        fields = ['id', 'name', 'price', 'stock', 'image', 'primary_image', 'store_name', 'seller_name', 'is_active']
\ No newline at end of file
+        fields = ['id', 'name', 'description', 'price', 'stock', 'image', 'primary_image', 'store_name', 'seller_name', 'is_active']
+        expandable_fields = ['description']
+
+def optimize_product_queryset(queryset, fieldset, serializer_class, path='', lookup=''):
+    """
+    Join and prefetch only what ``serializer_class`` will render at ``path``.
+
+    ``lookup`` is the ORM prefix when the products are reached through a
+    relation, e.g. ``'product__'`` for a CartItem queryset.
+    """
+    expandable = getattr(serializer_class.Meta, 'expandable_fields', ())
+
+    def wants(name):
+        if name not in serializer_class.Meta.fields:
+            return False
+        return fieldset.includes(f'{path}.{name}' if path else name, expandable=name in expandable)
+
+    if lookup:
+        queryset = queryset.select_related(lookup[:-2])
+    if wants('images') or wants('primary_image'):
+        queryset = queryset.prefetch_related(f'{lookup}images')
+    if not wants('description'):
+        queryset = queryset.defer(f'{lookup}description')
+    return queryset
+
+class StoreSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Store
+        fields = ['id', 'name', 'slug', 'seller', 'created_at']
+        read_only_fields = ['id', 'slug', 'seller', 'created_at']
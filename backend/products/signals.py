@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import coalesce, media
+from . import autocomplete, changes, stores
+from .models import Product, ProductImage
+
+
+@receiver(post_save, sender=Product)
+def update_autocomplete_on_save(sender, instance, update_fields=None, **kwargs):
+    transaction.on_commit(lambda: autocomplete.product_saved(instance, update_fields))
+
+
+@receiver(post_delete, sender=Product)
+def update_autocomplete_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(lambda: autocomplete.product_deleted(instance))
+
+
+@receiver(post_delete, sender=Product)
+def record_product_tombstone(sender, instance, **kwargs):
+    changes.record_deletion(instance.pk)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_detail(sender, instance, **kwargs):
+    transaction.on_commit(lambda: coalesce.bump(f'product:{instance.pk}'))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def copy_seller_name(sender, instance, update_fields=None, **kwargs):
+    if not instance.is_seller:
+        return
+    if update_fields is not None and not {'first_name', 'last_name'} & set(update_fields):
+        return
+    stores.copy_seller_name(instance)
+
+
+@receiver(post_save, sender=Product)
+def track_product_image(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    if not created and not hasattr(instance, '_loaded_image'):
+        # The image column was deferred, so there is nothing to compare against
+        return
+    previous = getattr(instance, '_loaded_image', None)
+    current = instance.image.name if instance.image else None
+    if current != previous:
+        media.retain(current)
+        media.release(previous)
+        instance._loaded_image = current
+
+
+@receiver(post_delete, sender=Product)
+def release_product_image(sender, instance, **kwargs):
+    media.release(getattr(instance, '_loaded_image', None))
+
+
+@receiver(post_save, sender=ProductImage)
+def track_gallery_image(sender, instance, created, **kwargs):
+    if created:
+        media.retain(instance.image.name)
+
+
+@receiver(post_delete, sender=ProductImage)
+def release_gallery_image(sender, instance, **kwargs):
+    media.release(instance.image.name)
@@ -0,0 +1,93 @@
+"""
+Seller storefronts.
+
+Every seller has one ``Store`` with a unique slug used by the ``store`` filter
+of the product list. The store name and the seller's own name are
+denormalised onto ``Product.store_display_name`` and
+``Product.seller_display_name`` so product serialization never joins the
+seller; ``copy_name`` and ``copy_seller_name`` keep the copies in step. They
+update in bulk, which skips the save signals, so they publish
+``products.details_changed`` for the outbox worker to retire the products'
+cached details, and ``copy_name`` relabels the store in the autocomplete index
+itself.
+"""
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+from core.outbox import publish_many
+from . import autocomplete, changes
+from .models import Product, Store
+
+
+def unique_slug(name, exclude_pk=None):
+    base = slugify(name)[:200] or 'store'
+    taken = Store.objects.filter(slug__startswith=base)
+    if exclude_pk:
+        taken = taken.exclude(pk=exclude_pk)
+    taken = set(taken.values_list('slug', flat=True))
+    slug, suffix = base, 2
+    while slug in taken:
+        slug = f'{base}-{suffix}'
+        suffix += 1
+    return slug
+
+
+def ensure_store(seller):
+    """The seller's store, created from their name on first use"""
+    store = Store.objects.filter(seller=seller).first()
+    if store:
+        return store
+    name = seller.full_name.strip() or seller.email
+    for attempt in range(3):
+        try:
+            with transaction.atomic():
+                return Store.objects.create(seller=seller, name=name, slug=unique_slug(name))
+        except IntegrityError:
+            # Either a concurrent request created the store or took the slug
+            store = Store.objects.filter(seller=seller).first()
+            if store:
+                return store
+            if attempt == 2:
+                raise
+
+
+def rename(store, name):
+    with transaction.atomic():
+        store.name = name
+        store.slug = unique_slug(name, exclude_pk=store.pk)
+        store.save(update_fields=['name', 'slug', 'updated_at'])
+        copy_name(store.seller_id, name)
+    return store
+
+
+# Product ids per products.details_changed event, to keep payloads small for large stores
+DETAILS_EVENT_SIZE = 1000
+
+
+def _copy_to_products(products, **values):
+    with transaction.atomic():
+        product_ids = list(products.values_list('id', flat=True))
+        if not product_ids:
+            return
+        products.update(**values, change_seq=changes.stamp())
+        publish_many([
+            ('products.details_changed', {'product_ids': product_ids[offset:offset + DETAILS_EVENT_SIZE]})
+            for offset in range(0, len(product_ids), DETAILS_EVENT_SIZE)
+        ])
+
+
+def copy_name(seller_id, name):
+    """Copy a store name onto the seller's products; call inside the transaction that renamed it"""
+    _copy_to_products(Product.objects.filter(seller_id=seller_id), store_display_name=name)
+    transaction.on_commit(lambda: autocomplete.store_renamed(seller_id, name))
+
+
+def copy_seller_name(seller):
+    """Copy the seller's name onto their products where it changed"""
+    name = seller.full_name
+    products = Product.objects.filter(seller=seller).exclude(seller_display_name=name)
+    _copy_to_products(products, seller_display_name=name)
+
+
+def seller_for_slug(slug):
+    return Store.objects.filter(slug=slug).values_list('seller_id', flat=True).first()
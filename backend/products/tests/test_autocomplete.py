@@ -0,0 +1,139 @@
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+
+from products import autocomplete
+from products.autocomplete import KIND_PRODUCT, KIND_STORE, PrefixIndex
+from products.models import Product
+
+
+class PrefixIndexTests(SimpleTestCase):
+    def build(self, entries, scan_limit=5, top_k=10):
+        index = PrefixIndex(scan_limit=scan_limit, top_k=top_k)
+        index.load(entries)
+        return index
+
+    def ids(self, index, query, limit=10):
+        return [result['id'] for result in index.search(query, limit)]
+
+    def test_ranks_matches_by_score(self):
+        index = self.build([
+            (KIND_PRODUCT, 1, 'Red Shoe', 1.0),
+            (KIND_PRODUCT, 2, 'Blue Shoe', 5.0),
+            (KIND_PRODUCT, 3, 'Red Hat', 3.0),
+            (KIND_STORE, 7, 'Shoe Palace', 2.0),
+        ])
+        self.assertEqual(self.ids(index, 'shoe'), [2, 7, 1])
+        self.assertEqual(self.ids(index, 'RED'), [3, 1])
+        self.assertEqual(index.search('pal', 5), [{'type': 'store', 'id': 7, 'label': 'Shoe Palace'}])
+
+    def test_repeated_upserts_do_not_grow_the_index(self):
+        entries = [(KIND_PRODUCT, i, f'Red Shoe {i}', float(i)) for i in range(1, 31)]
+        index = self.build(entries + [(KIND_PRODUCT, 999, 'Red Bestseller', 100.0)])
+        keys = len(index.keys)
+        for _ in range(25):
+            index.upsert_product(999, 'Red Bestseller')
+        self.assertEqual(len(index.keys), keys)
+        self.assertEqual(self.ids(index, 'red'), [999, 30, 29, 28, 27, 26, 25, 24, 23, 22])
+        self.assertEqual(self.ids(index, 'r', 3), [999, 30, 29])
+
+    def test_rename_moves_keys(self):
+        index = self.build([(KIND_PRODUCT, i, f'Lamp {i}', float(i)) for i in range(1, 21)])
+        index.upsert_product(20, 'Desk Light')
+        self.assertEqual(self.ids(index, 'lamp', 3), [19, 18, 17])
+        self.assertEqual(self.ids(index, 'light'), [20])
+        self.assertEqual(self.ids(index, 'desk'), [20])
+
+    def test_removed_products_are_replaced_in_hot_prefixes(self):
+        index = self.build([(KIND_PRODUCT, i, f'Cup {i}', float(i)) for i in range(1, 41)], top_k=3)
+        self.assertIn('c', index.hot_prefixes)
+        for product_id in range(40, 33, -1):
+            index.remove_product(product_id)
+        self.assertEqual(self.ids(index, 'c', 3), [33, 32, 31])
+        self.assertEqual(self.ids(index, 'cup', 3), [33, 32, 31])
+
+    def test_new_product_enters_hot_prefix(self):
+        index = self.build([(KIND_PRODUCT, i, f'Pen {i}', float(i)) for i in range(1, 21)], top_k=3)
+        index.upsert_product(50, 'Pencil', score=99.0)
+        self.assertEqual(self.ids(index, 'p', 3), [50, 20, 19])
+
+    def test_writes_leave_the_loaded_keys_alone(self):
+        index = self.build([(KIND_PRODUCT, i, f'Vase {i}', float(i)) for i in range(1, 21)], top_k=3)
+        keys = list(index.keys)
+        index.upsert_product(50, 'Vase Deluxe', score=50.0)
+        index.upsert_product(20, 'Bowl')
+        index.remove_product(19)
+        self.assertEqual(index.keys, keys)
+        self.assertEqual(self.ids(index, 'vase', 3), [50, 18, 17])
+        self.assertEqual(self.ids(index, 'deluxe'), [50])
+        self.assertEqual(self.ids(index, 'bowl'), [20])
+
+    def test_short_hot_prefix_is_refilled_outside_the_lock(self):
+        index = self.build([(KIND_PRODUCT, i, f'Cup {i}', float(i)) for i in range(1, 41)], top_k=3)
+        index.upsert_product(40, 'Zebra')
+        scan = index._base_records
+        lock_free = []
+
+        def try_lock():
+            acquired = index.lock.acquire(blocking=False)
+            if acquired:
+                index.lock.release()
+            lock_free.append(acquired)
+
+        def base_records(prefix):
+            other = threading.Thread(target=try_lock)
+            other.start()
+            other.join(5)
+            return scan(prefix)
+
+        with mock.patch.object(index, '_base_records', base_records):
+            for product_id in range(39, 34, -1):
+                index.remove_product(product_id)
+        self.assertTrue(lock_free)
+        self.assertTrue(all(lock_free))
+        self.assertEqual(self.ids(index, 'c', 3), [34, 33, 32])
+
+
+class ProductSavedTests(SimpleTestCase):
+    def setUp(self):
+        index = PrefixIndex(scan_limit=5, top_k=10)
+        index.load([(KIND_PRODUCT, 1, 'Old Name', 1.0)])
+        patcher = mock.patch.object(autocomplete, '_index', index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.index = index
+
+    def test_stock_only_save_is_ignored(self):
+        with mock.patch.object(self.index, 'upsert_product') as upsert:
+            autocomplete.product_saved(Product(id=1, name='Old Name', is_active=True),
+                                       update_fields=frozenset({'stock', 'updated_at'}))
+        upsert.assert_not_called()
+
+    def test_rename_and_deactivation_reach_the_index(self):
+        autocomplete.product_saved(Product(id=1, name='New Name', is_active=True))
+        self.assertEqual([r['id'] for r in self.index.search('new', 5)], [1])
+        self.assertEqual(self.index.search('old', 5), [])
+        autocomplete.product_saved(Product(id=1, name='New Name', is_active=False),
+                                   update_fields=frozenset({'is_active'}))
+        self.assertEqual(self.index.search('new', 5), [])
+
+
+class AutocompleteViewTests(TestCase):
+    def setUp(self):
+        index = PrefixIndex(scan_limit=5, top_k=10)
+        index.load([(KIND_PRODUCT, i, f'Chair {i}', float(i)) for i in range(1, 31)])
+        patcher = mock.patch.object(autocomplete, '_index', index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_limit_is_capped(self):
+        response = self.client.get('/api/products/autocomplete/', {'q': 'c', 'limit': 100})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), settings.AUTOCOMPLETE_TOP_K)
+
+    def test_rejects_limits_below_one(self):
+        for limit in ('-1', '0', 'ten'):
+            response = self.client.get('/api/products/autocomplete/', {'q': 'c', 'limit': limit})
+            self.assertEqual(response.status_code, 400, limit)
@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core import sequences
+from orders.models import Cart, CartItem
+from products import changes
+from products.models import CHANGE_SEQUENCE, Product
+
+User = get_user_model()
+
+
+def make_user(name, **fields):
+    return User.objects.create_user(email=f'{name}@example.com', username=name, password='x' * 12,
+                                    first_name=name, last_name='Test', **fields)
+
+
+class ChangesSinceTests(TestCase):
+    def setUp(self):
+        self.seller = make_user('seller', is_seller=True)
+        self.products = [
+            Product.objects.create(seller=self.seller, name=f'Product {i}', price='5.00', stock=3)
+            for i in range(5)
+        ]
+
+    def read_all(self, cursor='', limit=2):
+        seen = []
+        while True:
+            entries, cursor, has_more = changes.changes_since(cursor, limit)
+            seen += [(product_id, product is not None) for _, product_id, product in entries]
+            if not has_more:
+                return seen, cursor
+
+    def test_pages_through_every_product_once(self):
+        seen, _ = self.read_all()
+        self.assertEqual(seen, [(product.id, True) for product in self.products])
+
+    def test_cursor_only_returns_later_changes(self):
+        _, cursor = self.read_all()
+        updated, deactivated, deleted = self.products[1], self.products[3], self.products[0]
+        updated.price = '6.00'
+        updated.save()
+        deactivated.is_active = False
+        deactivated.save(update_fields=['is_active'])
+        deleted_id = deleted.id
+        deleted.delete()
+        seen, cursor = self.read_all(cursor)
+        self.assertEqual(seen, [(updated.id, True), (deactivated.id, False), (deleted_id, False)])
+        self.assertEqual(changes.changes_since(cursor, 10)[0], [])
+
+    def test_bulk_update_rows_share_a_value(self):
+        _, cursor = self.read_all()
+        with transaction.atomic():
+            Product.objects.filter(id__in=[p.id for p in self.products[:3]]).update(change_seq=changes.stamp())
+        seen, _ = self.read_all(cursor, limit=1)
+        self.assertEqual(seen, [(product.id, True) for product in self.products[:3]])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(changes.InvalidCursor):
+            changes.changes_since('nonsense', 10)
+
+
+class DeferredStampTests(TestCase):
+    def setUp(self):
+        seller = make_user('seller', is_seller=True)
+        self.products = [Product.objects.create(seller=seller, name=f'P{i}', price='5.00', stock=3) for i in range(2)]
+
+    def test_saves_are_stamped_once_at_block_exit(self):
+        before = sequences.current_value(CHANGE_SEQUENCE)
+        with transaction.atomic():
+            with changes.deferred_stamps():
+                for product in self.products:
+                    product.stock = 1
+                    product.save(update_fields=['stock'])
+                self.assertEqual(sequences.current_value(CHANGE_SEQUENCE), before)
+            self.assertEqual(sequences.current_value(CHANGE_SEQUENCE), before + 1)
+        stamps = set(Product.objects.values_list('change_seq', flat=True))
+        self.assertEqual(stamps, {before + 1})
+
+    def test_checkout_stamps_purchased_products(self):
+        buyer = make_user('buyer')
+        product = self.products[0]
+        CartItem.objects.create(cart=Cart.objects.create(user=buyer), product=product, quantity=2)
+        before = sequences.current_value(CHANGE_SEQUENCE)
+        client = APIClient()
+        client.force_authenticate(buyer)
+        response = client.post('/api/orders/create/', {'shipping_address': '1 Test Street'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 1)
+        self.assertEqual(product.change_seq, before + 1)
@@ -0,0 +1,32 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core.models import OutboxEvent
+from products import inventory
+from products.models import Product
+
+User = get_user_model()
+
+
+class SyncStockTests(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(email='seller@example.com', username='seller', password='x' * 12,
+                                               first_name='S', last_name='Test', is_seller=True)
+        self.products = [
+            Product.objects.create(seller=self.seller, name=f'Bolt {i}', price='1.00', stock=10, sku=f'B{i}')
+            for i in range(5)
+        ]
+
+    def test_batches_retire_details_through_the_outbox(self):
+        rows = [{'product_id': product.id, 'delta': -1} for product in self.products] + [{'sku': 'B0', 'stock': 3}]
+        with mock.patch('core.coalesce.bump') as bump, self.captureOnCommitCallbacks(execute=True):
+            updated, failed = inventory.sync_stock(self.seller, rows, batch_size=3)
+
+        self.assertEqual((updated, failed), (6, []))
+        self.assertEqual(Product.objects.get(sku='B0').stock, 3)
+        bump.assert_not_called()
+        events = OutboxEvent.objects.filter(event_type='products.details_changed').order_by('id')
+        self.assertEqual([event.payload['product_ids'] for event in events],
+                         [[p.id for p in self.products[:3]], [self.products[0].id, *[p.id for p in self.products[3:]]]])
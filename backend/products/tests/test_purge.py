@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core.models import OutboxEvent
+from orders.models import Cart, CartItem
+from products.handlers import purge_deleted_product
+from products.models import Product
+
+User = get_user_model()
+
+
+def make_user(name, **fields):
+    return User.objects.create_user(email=f'{name}@example.com', username=name, password='x' * 12,
+                                    first_name=name, last_name='Test', **fields)
+
+
+class PurgeDeletedProductTests(TestCase):
+    def setUp(self):
+        seller = make_user('seller', is_seller=True)
+        self.product = Product.objects.create(seller=seller, name='Lamp', price='10.00', stock=5)
+        self.buyers = [make_user(f'buyer{i}') for i in range(3)]
+        for buyer in self.buyers:
+            CartItem.objects.create(cart=Cart.objects.create(user=buyer), product=self.product, quantity=1)
+
+    def run_chunk(self, payload):
+        with mock.patch('orders.cart_summary.invalidate') as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            purge_deleted_product(payload, batch_size=1)
+        return [user_id for call in invalidate.call_args_list for user_id in call.args[0]]
+
+    def test_purges_one_chunk_per_event(self):
+        payload = {'product_id': self.product.id, 'seller_id': self.product.seller_id}
+        invalidated = []
+        for remaining in (2, 1, 0):
+            invalidated += self.run_chunk(payload)
+            self.assertEqual(CartItem.objects.filter(product=self.product).count(), remaining)
+            follow_up = OutboxEvent.objects.filter(event_type='product.deleted', status='pending').last()
+            if remaining:
+                self.assertEqual(follow_up.payload['purged_lines'], 3 - remaining)
+                payload = follow_up.payload
+                follow_up.delete()
+            else:
+                self.assertIsNone(follow_up)
+        self.assertEqual(sorted(invalidated), sorted(buyer.id for buyer in self.buyers))
+
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem
+from products import recommendations
+from products.models import Product, RelatedProduct
+
+User = get_user_model()
+
+
+class RelatedProductsTests(TestCase):
+    def setUp(self):
+        seller = User.objects.create_user(email='seller@example.com', username='seller', password='x' * 12,
+                                          first_name='S', last_name='Test', is_seller=True)
+        self.product, *others = [
+            Product.objects.create(seller=seller, name=f'Product {i}', price='5.00', stock=3) for i in range(4)
+        ]
+        RelatedProduct.objects.bulk_create([
+            RelatedProduct(product=self.product, related=other, score=score)
+            for other, score in zip(others, [1.0, 3.0, 2.0])
+        ])
+        self.url = f'/api/products/{self.product.id}/related/'
+
+    def test_neighbours_by_score(self):
+        response = APIClient().get(self.url, {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['name'] for item in response.data], ['Product 2', 'Product 3'])
+
+    def test_rejects_limits_below_one(self):
+        for limit in ('-1', '0', 'ten'):
+            self.assertEqual(APIClient().get(self.url, {'limit': limit}).status_code, 400, limit)
+
+
+class ApplyOrderTests(TestCase):
+    def setUp(self):
+        seller = User.objects.create_user(email='seller@example.com', username='seller', password='x' * 12,
+                                          first_name='S', last_name='Test', is_seller=True)
+        self.buyer = User.objects.create_user(email='buyer@example.com', username='buyer', password='x' * 12)
+        self.products = [
+            Product.objects.create(seller=seller, name=f'Product {i}', price='5.00', stock=3) for i in range(2)
+        ]
+
+    def order(self):
+        order = Order.objects.create(buyer=self.buyer, total_amount='10.00', shipping_address='Somewhere')
+        for product in self.products:
+            OrderItem.objects.create(order=order, product=product, quantity=1, price_at_time='5.00')
+        return order
+
+    def scores(self):
+        return set(RelatedProduct.objects.values_list('product_id', 'related_id', 'score'))
+
+    def test_redelivered_order_is_counted_once(self):
+        first, second = self.products
+        order = self.order()
+        recommendations.apply_order(order.id)
+        recommendations.apply_order(order.id)
+        self.assertEqual(self.scores(), {(first.id, second.id, 1), (second.id, first.id, 1)})
+        recommendations.apply_order(self.order().id)
+        self.assertEqual(self.scores(), {(first.id, second.id, 2), (second.id, first.id, 2)})
+
+    def test_order_counted_by_the_rebuild_is_not_applied_again(self):
+        first, second = self.products
+        order = self.order()
+        recommendations.build_cooccurrence()
+        recommendations.apply_order(order.id)
+        self.assertEqual(self.scores(), {(first.id, second.id, 1), (second.id, first.id, 1)})
@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from core import coalesce
+from core.models import OutboxEvent
+from core.outbox import get_handler
+from products import autocomplete, stores
+from products.autocomplete import KIND_PRODUCT, KIND_STORE, PrefixIndex
+from products.models import Product
+
+User = get_user_model()
+
+
+def run_outbox(event_type):
+    """Run the handler of every queued ``event_type`` event, as the outbox worker would"""
+    for event in OutboxEvent.objects.filter(event_type=event_type):
+        get_handler(event_type)(event.payload)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'stores-tests'},
+})
+class RenameTests(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(email='seller@example.com', username='seller', password='x' * 12,
+                                               first_name='Ada', last_name='Shop', is_seller=True)
+        self.store = stores.ensure_store(self.seller)
+        self.products = [
+            Product.objects.create(seller=self.seller, name=f'Lamp {i}', price='5.00', stock=3,
+                                   store_display_name=self.store.name, seller_display_name=self.seller.full_name)
+            for i in range(2)
+        ]
+
+    def test_rename_updates_copies_caches_and_index(self):
+        index = PrefixIndex(scan_limit=5, top_k=10)
+        index.load([(KIND_PRODUCT, product.id, product.name, 1.0) for product in self.products]
+                   + [(KIND_STORE, self.seller.id, self.store.name, 2.0)])
+        generations = [coalesce.generation(f'product:{product.id}') for product in self.products]
+        with mock.patch.object(autocomplete, '_index', index), self.captureOnCommitCallbacks(execute=True):
+            stores.rename(self.store, 'Lamp Emporium')
+        run_outbox('products.details_changed')
+
+        self.assertEqual(self.store.slug, 'lamp-emporium')
+        self.assertEqual(set(Product.objects.values_list('store_display_name', flat=True)), {'Lamp Emporium'})
+        for product, generation in zip(self.products, generations):
+            self.assertGreater(coalesce.generation(f'product:{product.id}'), generation)
+        self.assertEqual(index.search('emporium', 5), [{'type': 'store', 'id': self.seller.id, 'label': 'Lamp Emporium'}])
+        self.assertEqual(index.search('ada', 5), [])
+
+    def test_seller_name_follows_the_seller_not_the_store(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            stores.rename(self.store, 'Lamp Emporium')
+        url = f'/api/products/{self.products[0].id}/'
+        self.assertEqual(self.client.get(url).json()['seller_name'], 'Ada Shop')
+
+        self.seller.first_name = 'Grace'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.seller.save()
+        run_outbox('products.details_changed')
+        response = self.client.get(url).json()
+        self.assertEqual((response['seller_name'], response['store_name']), ('Grace Shop', 'Lamp Emporium'))
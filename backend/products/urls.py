@@ -3,9 +3,16 @@ from . import views
 
 urlpatterns = [
     path('', views.product_list, name='product_list'),
+    path('autocomplete/', views.autocomplete_products, name='autocomplete_products'),
+    path('batch/', views.product_batch, name='product_batch'),
+    path('changes/', views.product_changes, name='product_changes'),
     path('<int:pk>/', views.product_detail, name='product_detail'),
+    path('<int:pk>/related/', views.related_products, name='related_products'),
     path('seller/', views.seller_products, name='seller_products'),
+    path('stores/', views.store_list, name='store_list'),
+    path('stores/mine/', views.my_store, name='my_store'),
     path('create/', views.create_product, name='create_product'),
+    path('inventory/', views.sync_inventory, name='sync_inventory'),
     path('<int:pk>/update/', views.update_product, name='update_product'),
     path('<int:pk>/delete/', views.delete_product, name='delete_product'),
 ]
\ No newline at end of file
@@ -1,22 +1,41 @@
+import hashlib
 from rest_framework import status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
-from .models import Product
-from .serializers import ProductSerializer, ProductCreateUpdateSerializer, ProductListSerializer
+from django.utils import timezone
+from core import coalesce
+from core.outbox import publish
+from core.serializers import Fieldset
+from core.throttling import AnonCatalogThrottle
+from orders.idempotency import idempotent
+from . import autocomplete, changes, inventory, popularity, stores
+from .models import Product, RelatedProduct, Store
+from .serializers import (
+    ProductSerializer, ProductCreateUpdateSerializer, ProductListSerializer, StoreSerializer,
+    optimize_product_queryset
+)
 
 class ProductPagination(PageNumberPagination):
     page_size = 50
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-@api_view(['GET'])
-@permission_classes([permissions.AllowAny])
-def product_list(request):
-    """List all active products with search and filtering"""
-    products = Product.objects.filter(is_active=True).select_related('seller')
+def catalog_cache_key(prefix, *parts):
+    digest = hashlib.sha1(':'.join(map(str, parts)).encode()).hexdigest()
+    return f'{prefix}:{digest}'
+
+def catalog_page(request):
+    """One page of active products for the request's search, filter and sort parameters"""
+    fieldset = Fieldset.from_request(request)
+    products = optimize_product_queryset(
+        Product.objects.filter(is_active=True), fieldset, ProductListSerializer
+    )
     
     # Search functionality
     search = request.GET.get('search', '')
@@ -24,8 +43,7 @@ def product_list(request):
         products = products.filter(
             Q(name__icontains=search) | 
             Q(description__icontains=search) |
-            Q(seller__first_name__icontains=search) |
-            Q(seller__last_name__icontains=search)
+            Q(store_display_name__icontains=search)
         )
     
     # Price filtering
@@ -36,13 +54,10 @@ def product_list(request):
     if max_price:
         products = products.filter(price__lte=max_price)
     
-    # Store filtering
+    # Store filtering by slug, resolved to the seller through the unique index
     store = request.GET.get('store')
     if store:
-        products = products.filter(
-            Q(seller__first_name__icontains=store) |
-            Q(seller__last_name__icontains=store)
-        )
+        products = products.filter(seller_id=stores.seller_for_slug(store))
     
     # In stock filtering
     in_stock = request.GET.get('in_stock')
@@ -53,31 +68,221 @@ def product_list(request):
     sort_by = request.GET.get('sort', '-created_at')
     if sort_by in ['price', '-price', 'name', '-name', 'created_at', '-created_at']:
         products = products.order_by(sort_by)
+    elif sort_by in popularity.SORTS:
+        products = products.order_by(*popularity.SORTS[sort_by])
     
-    paginator = ProductPagination()
-    paginated_products = paginator.paginate_queryset(products, request)
-    serializer = ProductListSerializer(paginated_products, many=True)
+    def render():
+        paginator = ProductPagination()
+        paginated_products = paginator.paginate_queryset(products, request)
+        serializer = ProductListSerializer(paginated_products, many=True, context={'fieldset': fieldset})
+        return paginator.get_paginated_response(serializer.data).data
     
-    return paginator.get_paginated_response(serializer.data)
+    # Pages aren't invalidated on writes; CATALOG_CACHE_SECONDS bounds how stale they get
+    key = catalog_cache_key('product-list', request.build_absolute_uri())
+    return coalesce.cached(key, render, settings.CATALOG_CACHE_SECONDS, settings.CATALOG_CACHE_STALE_SECONDS)
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+@throttle_classes([AnonCatalogThrottle])
+def product_list(request):
+    """List all active products with search and filtering"""
+    return Response(catalog_page(request))
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+def autocomplete_products(request):
+    """Type-ahead suggestions for product and store names"""
+    query = request.GET.get('q', '')
+    try:
+        limit = min(int(request.GET.get('limit', 8)), settings.AUTOCOMPLETE_TOP_K)
+    except ValueError:
+        return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+    if limit < 1:
+        return Response({'error': 'limit must be positive'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(autocomplete.get_index().search(query, limit))
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([AnonCatalogThrottle])
 def product_detail(request, pk):
     """Get single product details"""
-    product = get_object_or_404(Product, pk=pk, is_active=True)
-    serializer = ProductSerializer(product)
+    fieldset = Fieldset.from_request(request)
+    
+    def render():
+        products = optimize_product_queryset(Product.objects.all(), fieldset, ProductSerializer)
+        product = get_object_or_404(products, pk=pk, is_active=True)
+        return ProductSerializer(product, context={'fieldset': fieldset}).data
+    
+    # Saving the product bumps its generation, which retires these entries
+    key = catalog_cache_key('product-detail', pk, coalesce.generation(f'product:{pk}'), request.GET.urlencode())
+    return Response(coalesce.cached(key, render, settings.CATALOG_CACHE_SECONDS,
+                                    settings.CATALOG_CACHE_STALE_SECONDS))
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+@throttle_classes([AnonCatalogThrottle])
+def product_changes(request):
+    """Products changed after ?since=<cursor>, in change order, with tombstones for removed ones"""
+    try:
+        limit = min(int(request.GET.get('limit', 500)), settings.CHANGE_FEED_MAX_LIMIT)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    if limit < 1:
+        return Response({'error': 'limit must be positive'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    fieldset = Fieldset.from_request(request)
+    products = optimize_product_queryset(Product.objects.all(), fieldset, ProductListSerializer)
+    try:
+        entries, next_cursor, has_more = changes.changes_since(request.GET.get('since'), limit, products)
+    except changes.InvalidCursor as error:
+        return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    live = [product for _, _, product in entries if product is not None]
+    serialized = dict(zip(
+        (product.id for product in live),
+        ProductListSerializer(live, many=True, context={'fieldset': fieldset}).data,
+    ))
+    results = [
+        {'id': product_id, 'change_seq': change_seq, 'deleted': product is None,
+         'product': serialized.get(product_id) if product is not None else None}
+        for change_seq, product_id, product in entries
+    ]
+    return Response({'results': results, 'next_cursor': next_cursor, 'has_more': has_more})
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.AllowAny])
+@throttle_classes([AnonCatalogThrottle])
+def product_batch(request):
+    """Get many products by id in request order (ids=1,2,3 or {"ids": [...]})"""
+    if request.method == 'POST':
+        raw_ids = request.data.get('ids', [])
+    else:
+        raw_ids = [value for value in request.GET.get('ids', '').split(',') if value.strip()]
+    if not isinstance(raw_ids, list):
+        return Response({'error': 'ids must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        ids = [int(value) for value in raw_ids]
+    except (TypeError, ValueError):
+        return Response({'error': 'ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > settings.PRODUCT_BATCH_MAX_IDS:
+        return Response({'error': f'At most {settings.PRODUCT_BATCH_MAX_IDS} ids per request'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    # At most two queries regardless of batch size: products with sellers, then images
+    fieldset = Fieldset.from_request(request)
+    products = optimize_product_queryset(Product.objects.filter(id__in=set(ids)), fieldset, ProductSerializer)
+    by_id = {product.id: product for product in products}
+    active = [product for product in by_id.values() if product.is_active]
+    serialized = dict(zip(
+        (product.id for product in active),
+        ProductSerializer(active, many=True, context={'fieldset': fieldset}).data,
+    ))
+
+    results = []
+    for product_id in ids:
+        if product_id in serialized:
+            results.append({'id': product_id, 'status': 'ok', 'product': serialized[product_id]})
+        elif product_id in by_id:
+            results.append({'id': product_id, 'status': 'inactive', 'product': None})
+        else:
+            results.append({'id': product_id, 'status': 'not_found', 'product': None})
+    return Response({'results': results})
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+@throttle_classes([AnonCatalogThrottle])
+def related_products(request, pk):
+    """Get products frequently bought together with this one"""
+    try:
+        limit = min(int(request.GET.get('limit', 10)), settings.RECOMMENDATIONS_TOP_K)
+    except ValueError:
+        return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+    if limit < 1:
+        return Response({'error': 'limit must be positive'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # One indexed range scan on (product, -score) joined to the neighbour rows
+    fieldset = Fieldset.from_request(request)
+    entries = optimize_product_queryset(
+        RelatedProduct.objects.filter(product_id=pk, related__is_active=True),
+        fieldset, ProductListSerializer, lookup='related__',
+    ).order_by('-score')[:limit]
+    serializer = ProductListSerializer([entry.related for entry in entries], many=True,
+                                       context={'fieldset': fieldset})
     return Response(serializer.data)
 
+class SellerProductPagination(ProductPagination):
+    page_size = 20
+
+SELLER_PRODUCT_SORTS = ['name', '-name', 'price', '-price', 'stock', '-stock', 'created_at', '-created_at']
+
+def stock_states():
+    """Filters for the mutually exclusive stock states shown on the seller dashboard"""
+    low = settings.LOW_STOCK_THRESHOLD
+    return {
+        'out': Q(stock=0),
+        'low': Q(stock__gt=0, stock__lte=low),
+        'in': Q(stock__gt=low),
+    }
+
+def seller_summary(products):
+    """Stock and active counts over a seller's whole catalog, in one query"""
+    states = stock_states()
+    return products.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        inactive=Count('id', filter=Q(is_active=False)),
+        in_stock=Count('id', filter=states['in']),
+        low_stock=Count('id', filter=states['low']),
+        out_of_stock=Count('id', filter=states['out']),
+        units_in_stock=Coalesce(Sum('stock'), 0),
+    )
+
 @api_view(['GET'])
 def seller_products(request):
-    """Get seller's own products"""
+    """Page through the seller's own products with search, stock and active filters"""
     if not request.user.is_seller:
         return Response({'error': 'Only sellers can access this endpoint'}, 
                        status=status.HTTP_403_FORBIDDEN)
     
-    products = Product.objects.filter(seller=request.user).order_by('-created_at')
-    serializer = ProductSerializer(products, many=True)
-    return Response(serializer.data)
+    # The listing shape by default; ?view=full renders the complete product with its gallery
+    serializer_class = ProductSerializer if request.GET.get('view') == 'full' else ProductListSerializer
+    fieldset = Fieldset.from_request(request)
+    catalog = Product.objects.filter(seller=request.user, deleted_at__isnull=True)
+    products = optimize_product_queryset(catalog, fieldset, serializer_class)
+    
+    search = request.GET.get('search', '')
+    if search:
+        products = products.filter(Q(name__icontains=search) | Q(sku__icontains=search))
+    
+    stock = request.GET.get('stock')
+    if stock:
+        states = stock_states()
+        if stock not in states:
+            return Response({'error': f"Invalid stock state, expected one of: {', '.join(states)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        products = products.filter(states[stock])
+    
+    active = request.GET.get('active')
+    if active:
+        if active.lower() not in ('true', 'false'):
+            return Response({'error': 'Invalid active flag, expected true or false'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        products = products.filter(is_active=active.lower() == 'true')
+    
+    sort_by = request.GET.get('sort', '-created_at')
+    if sort_by not in SELLER_PRODUCT_SORTS:
+        sort_by = '-created_at'
+    # id breaks ties so pages don't overlap
+    products = products.order_by(sort_by, '-id')
+    
+    paginator = SellerProductPagination()
+    page = paginator.paginate_queryset(products, request)
+    serializer = serializer_class(page, many=True, context={'fieldset': fieldset})
+    response = paginator.get_paginated_response(serializer.data)
+    # Unfiltered, so the dashboard's totals don't depend on the page being viewed
+    response.data['summary'] = seller_summary(catalog)
+    return response
 
 @api_view(['POST'])
 def create_product(request):
@@ -86,10 +291,14 @@ def create_product(request):
         return Response({'error': 'Only sellers can create products'}, 
                        status=status.HTTP_403_FORBIDDEN)
     
-    serializer = ProductCreateUpdateSerializer(data=request.data)
+    serializer = ProductCreateUpdateSerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
-        product = serializer.save(seller=request.user)
-        response_serializer = ProductSerializer(product)
+        with transaction.atomic():
+            store = stores.ensure_store(request.user)
+            product = serializer.save(seller=request.user, store_display_name=store.name,
+                                      seller_display_name=request.user.full_name)
+            publish('product.created', {'product_id': product.id, 'seller_id': request.user.id})
+        response_serializer = ProductSerializer(product, context={'fieldset': Fieldset.from_request(request)})
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -101,16 +310,38 @@ def update_product(request, pk):
         return Response({'error': 'Only sellers can update products'}, 
                        status=status.HTTP_403_FORBIDDEN)
     
-    product = get_object_or_404(Product, pk=pk, seller=request.user)
-    serializer = ProductCreateUpdateSerializer(product, data=request.data, partial=True)
+    product = get_object_or_404(Product, pk=pk, seller=request.user, deleted_at__isnull=True)
+    serializer = ProductCreateUpdateSerializer(product, data=request.data, partial=True,
+                                               context={'request': request})
     
     if serializer.is_valid():
-        product = serializer.save()
-        response_serializer = ProductSerializer(product)
+        with transaction.atomic():
+            product = serializer.save()
+            publish('product.updated', {'product_id': product.id, 'seller_id': request.user.id})
+        response_serializer = ProductSerializer(product, context={'fieldset': Fieldset.from_request(request)})
         return Response(response_serializer.data)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['POST'])
+@idempotent
+def sync_inventory(request):
+    """Set or adjust stock for many of the seller's products at once"""
+    if not request.user.is_seller:
+        return Response({'error': 'Only sellers can update inventory'}, 
+                       status=status.HTTP_403_FORBIDDEN)
+    
+    items = request.data.get('items') if isinstance(request.data, dict) else None
+    if not isinstance(items, list) or not items:
+        return Response({'error': 'items must be a non-empty list'}, 
+                       status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > settings.INVENTORY_SYNC_MAX_ITEMS:
+        return Response({'error': f'At most {settings.INVENTORY_SYNC_MAX_ITEMS} items per request'}, 
+                       status=status.HTTP_400_BAD_REQUEST)
+    
+    updated, failed = inventory.sync_stock(request.user, items, settings.INVENTORY_SYNC_BATCH_SIZE)
+    return Response({'updated': updated, 'failed': failed})
+
 @api_view(['DELETE'])
 def delete_product(request, pk):
     """Delete product (sellers only, own products)"""
@@ -118,7 +349,42 @@ def delete_product(request, pk):
         return Response({'error': 'Only sellers can delete products'}, 
                        status=status.HTTP_403_FORBIDDEN)
     
-    product = get_object_or_404(Product, pk=pk, seller=request.user)
-    product.delete()
+    product = get_object_or_404(Product, pk=pk, seller=request.user, deleted_at__isnull=True)
+    with transaction.atomic():
+        # Tombstone only; cart lines and recommendations are purged by the outbox worker
+        # and order lines keep pointing at the product with their price snapshot
+        product.is_active = False
+        product.deleted_at = timezone.now()
+        product.sku = None
+        product.save(update_fields=['is_active', 'deleted_at', 'sku', 'updated_at'])
+        publish('product.deleted', {'product_id': product.id, 'seller_id': request.user.id})
     return Response({'message': 'Product deleted successfully'}, 
-                   status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+                   status=status.HTTP_204_NO_CONTENT)
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+@throttle_classes([AnonCatalogThrottle])
+def store_list(request):
+    """List stores by name; the slug is what the product list's store filter takes"""
+    queryset = Store.objects.all()
+    search = request.GET.get('search', '')
+    if search:
+        queryset = queryset.filter(name__icontains=search)
+    paginator = ProductPagination()
+    page = paginator.paginate_queryset(queryset.order_by('name', 'id'), request)
+    return paginator.get_paginated_response(StoreSerializer(page, many=True).data)
+
+@api_view(['GET', 'PUT'])
+def my_store(request):
+    """Get or rename the seller's own store"""
+    if not request.user.is_seller:
+        return Response({'error': 'Only sellers have a store'}, 
+                       status=status.HTTP_403_FORBIDDEN)
+    
+    store = stores.ensure_store(request.user)
+    if request.method == 'PUT':
+        serializer = StoreSerializer(store, data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        store = stores.rename(store, serializer.validated_data['name'])
+    return Response(StoreSerializer(store).data)
@@ -1,10 +1,10 @@
 import React, { useState, useEffect } from 'react';
 import { Search, Filter, ChevronLeft, ChevronRight } from 'lucide-react';
-import { api } from '../../utils/api';
+import { api, takeBootstrap } from '../../utils/api';
 import { useAuth } from '../../context/AuthContext';
 import { useNotification } from '../../context/NotificationContext';
 import ProductCard from './ProductCard';
-import type { Product, PaginatedResponse } from '../../types';
+import type { Product, PaginatedResponse, Store } from '../../types';
 
 const ProductList: React.FC = () => {
   const [products, setProducts] = useState<Product[]>([]);
@@ -24,6 +24,7 @@ const ProductList: React.FC = () => {
     previous: null as string | null,
   });
   const [currentPage, setCurrentPage] = useState(1);
+  const [stores, setStores] = useState<Store[]>([]);
 
   const { user } = useAuth();
   const { showNotification } = useNotification();
@@ -41,12 +42,19 @@ const ProductList: React.FC = () => {
         ...(filters.in_stock && { in_stock: 'true' }),
       });
 
-      const response = await api.get<PaginatedResponse<Product>>(`/products/?${params}`);
-      setProducts(response.data.results);
+      // The bootstrap response already holds the default first page; only the first fetch may use it
+      const initial = takeBootstrap();
+      const isDefaultView = page === 1 && !searchTerm && !filters.min_price && !filters.max_price
+        && !filters.store && !filters.in_stock && filters.sort === '-created_at';
+      const bootstrapped = initial && isDefaultView
+        ? await initial.then((result) => result.products, () => null)
+        : null;
+      const data = bootstrapped ?? (await api.get<PaginatedResponse<Product>>(`/products/?${params}`)).data;
+      setProducts(data.results);
       setPagination({
-        count: response.data.count,
-        next: response.data.next,
-        previous: response.data.previous,
+        count: data.count,
+        next: data.next ?? null,
+        previous: data.previous ?? null,
       });
     } catch (error) {
       console.error('Failed to fetch products:', error);
@@ -56,6 +64,12 @@ const ProductList: React.FC = () => {
     }
   };
 
+  useEffect(() => {
+    api.get<PaginatedResponse<Store>>('/products/stores/?page_size=100')
+      .then((response) => setStores(response.data.results))
+      .catch((error) => console.error('Failed to fetch stores:', error));
+  }, []);
+
   useEffect(() => {
     fetchProducts(currentPage);
   }, [searchTerm, filters, currentPage]);
@@ -165,13 +179,16 @@ const ProductList: React.FC = () => {
             <label className="block text-sm font-medium text-gray-700 mb-1">
               Store
             </label>
-            <input
-              type="text"
-              placeholder="Store name"
+            <select
               value={filters.store}
               onChange={(e) => handleFilterChange('store', e.target.value)}
               className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors duration-200"
-            />
+            >
+              <option value="">All Stores</option>
+              {stores.map((store) => (
+                <option key={store.id} value={store.slug}>{store.name}</option>
+              ))}
+            </select>
           </div>
 
           <div>
@@ -184,6 +201,8 @@ const ProductList: React.FC = () => {
               className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors duration-200"
             >
               <option value="-created_at">Newest First</option>
+              <option value="popular">Best Sellers</option>
+              <option value="trending">Trending</option>
               <option value="created_at">Oldest First</option>
               <option value="price">Price: Low to High</option>
               <option value="-price">Price: High to Low</option>
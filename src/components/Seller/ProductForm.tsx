@@ -37,6 +37,9 @@ const ProductForm: React.FC<ProductFormProps> = ({ product, onSave, onCancel })
       const images = [];
       if (product.images && product.images.length > 0) {
         images.push(...product.images.map(img => img.image));
+      } else if (product.primary_image) {
+        // Products from the seller listing carry only their first image
+        images.push(product.primary_image);
       } else if (product.image) {
         images.push(product.image);
       }
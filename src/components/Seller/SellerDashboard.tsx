@@ -1,12 +1,18 @@
-import React, { useState, useEffect } from 'react';
-import { Plus, Package, DollarSign, ShoppingBag, TrendingUp, Edit, Trash2, Eye } from 'lucide-react';
+import React, { useState, useEffect, useRef } from 'react';
+import { Plus, Package, DollarSign, ShoppingBag, TrendingUp, Edit, Trash2, Eye, Search } from 'lucide-react';
 import { api } from '../../utils/api';
 import { useAuth } from '../../context/AuthContext';
 import ProductForm from './ProductForm';
-import type { Product, Order } from '../../types';
+import type { Product, Order, SellerProductPage } from '../../types';
 
 const SellerDashboard: React.FC = () => {
   const [products, setProducts] = useState<Product[]>([]);
+  const [productCount, setProductCount] = useState(0);
+  const [nextPage, setNextPage] = useState<number | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [search, setSearch] = useState('');
+  const [stockFilter, setStockFilter] = useState('');
+  const [activeFilter, setActiveFilter] = useState('');
   const [recentOrders, setRecentOrders] = useState<Order[]>([]);
   const [loading, setLoading] = useState(true);
   const [showProductForm, setShowProductForm] = useState(false);
@@ -20,31 +26,48 @@ const SellerDashboard: React.FC = () => {
 
   const { user } = useAuth();
 
+  // One page of the seller's products; the summary covers the whole catalog
+  const fetchProducts = (page = 1) => {
+    const params: Record<string, string | number> = { page, expand: 'description' };
+    if (search) params.search = search;
+    if (stockFilter) params.stock = stockFilter;
+    if (activeFilter) params.active = activeFilter;
+    return api.get<SellerProductPage>('/products/seller/', { params });
+  };
+
+  const applyProductPage = (data: SellerProductPage, page: number) => {
+    setProducts(prev => (page === 1 ? data.results : [...prev, ...data.results]));
+    setProductCount(data.count);
+    setNextPage(data.next ? page + 1 : null);
+    setStats(prev => ({
+      ...prev,
+      totalProducts: data.summary.total,
+      lowStockProducts: data.summary.low_stock + data.summary.out_of_stock,
+    }));
+  };
+
   const fetchData = async () => {
     try {
       setLoading(true);
       const [productsRes, ordersRes] = await Promise.all([
-        api.get<Product[]>('/products/seller/'),
+        fetchProducts(),
         api.get<Order[]>('/orders/seller/'),
       ]);
 
-      setProducts(productsRes.data);
+      applyProductPage(productsRes.data, 1);
       setRecentOrders(ordersRes.data.slice(0, 5)); // Show only recent 5 orders
 
       // Calculate stats
-      const totalProducts = productsRes.data.length;
-      const lowStockProducts = productsRes.data.filter(p => p.stock <= 5).length;
       const totalOrders = ordersRes.data.length;
       const totalRevenue = ordersRes.data.reduce((sum, order) => {
         return sum + parseFloat(order.total_amount);
       }, 0);
 
-      setStats({
-        totalProducts,
+      setStats(prev => ({
+        ...prev,
         totalRevenue,
         totalOrders,
-        lowStockProducts,
-      });
+      }));
     } catch (error) {
       console.error('Failed to fetch dashboard data:', error);
     } finally {
@@ -52,10 +75,33 @@ const SellerDashboard: React.FC = () => {
     }
   };
 
+  const loadProducts = async (page = 1) => {
+    try {
+      setLoadingMore(true);
+      const response = await fetchProducts(page);
+      applyProductPage(response.data, page);
+    } catch (error) {
+      console.error('Failed to fetch products:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchData();
   }, []);
 
+  // Refetch the first page when a filter changes, debouncing the search box
+  const filtersMounted = useRef(false);
+  useEffect(() => {
+    if (!filtersMounted.current) {
+      filtersMounted.current = true; // fetchData already loaded the first page
+      return;
+    }
+    const timer = setTimeout(() => loadProducts(1), 300);
+    return () => clearTimeout(timer);
+  }, [search, stockFilter, activeFilter]);
+
   const handleProductSaved = () => {
     setShowProductForm(false);
     setEditingProduct(null);
@@ -177,14 +223,48 @@ const SellerDashboard: React.FC = () => {
         <div className="bg-white rounded-xl shadow-md border border-gray-200 p-6">
           <div className="flex items-center justify-between mb-6">
             <h2 className="text-xl font-bold text-gray-900">Your Products</h2>
-            <span className="text-sm text-gray-600">{products.length} products</span>
+            <span className="text-sm text-gray-600">{productCount} products</span>
+          </div>
+
+          <div className="flex flex-wrap gap-2 mb-4">
+            <div className="relative flex-1 min-w-[10rem]">
+              <Search className="absolute left-3 top-1/2 -translate-y-1/2 h-4 w-4 text-gray-400" />
+              <input
+                type="text"
+                value={search}
+                onChange={(e) => setSearch(e.target.value)}
+                placeholder="Search name or SKU"
+                className="w-full pl-9 pr-3 py-2 border border-gray-300 rounded-lg text-sm focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+              />
+            </div>
+            <select
+              value={stockFilter}
+              onChange={(e) => setStockFilter(e.target.value)}
+              className="px-3 py-2 border border-gray-300 rounded-lg text-sm focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+            >
+              <option value="">All stock</option>
+              <option value="in">In stock</option>
+              <option value="low">Low stock</option>
+              <option value="out">Out of stock</option>
+            </select>
+            <select
+              value={activeFilter}
+              onChange={(e) => setActiveFilter(e.target.value)}
+              className="px-3 py-2 border border-gray-300 rounded-lg text-sm focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+            >
+              <option value="">Active and inactive</option>
+              <option value="true">Active</option>
+              <option value="false">Inactive</option>
+            </select>
           </div>
 
           <div className="space-y-4 max-h-96 overflow-y-auto">
             {products.length === 0 ? (
               <div className="text-center py-8">
                 <Package className="h-12 w-12 text-gray-300 mx-auto mb-4" />
-                <p className="text-gray-600">No products yet. Add your first product!</p>
+                <p className="text-gray-600">
+                  {stats.totalProducts === 0 ? 'No products yet. Add your first product!' : 'No products match these filters.'}
+                </p>
               </div>
             ) : (
               products.map((product) => {
@@ -192,9 +272,9 @@ const SellerDashboard: React.FC = () => {
                 return (
                   <div key={product.id} className="flex items-center space-x-4 p-4 border border-gray-200 rounded-lg hover:bg-gray-50 transition-colors duration-200">
                     <div className="w-16 h-16 bg-gray-200 rounded-lg overflow-hidden flex-shrink-0">
-                      {product.image ? (
+                      {product.primary_image ? (
                         <img
-                          src={product.image}
+                          src={product.primary_image}
                           alt={product.name}
                           className="w-full h-full object-cover"
                         />
@@ -231,6 +311,15 @@ const SellerDashboard: React.FC = () => {
                 );
               })
             )}
+            {nextPage && (
+              <button
+                onClick={() => loadProducts(nextPage)}
+                disabled={loadingMore}
+                className="w-full py-2 text-sm font-medium text-blue-600 hover:bg-blue-50 rounded-lg transition-colors duration-200 disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            )}
           </div>
         </div>
 
@@ -1,5 +1,5 @@
 import React, { createContext, useContext, useState, useEffect, ReactNode } from 'react';
-import { api, storeTokens, storeUser, getStoredTokens, getStoredUser, clearTokens, clearUser } from '../utils/api';
+import { api, storeTokens, storeUser, getStoredTokens, getStoredUser, clearTokens, clearUser, startBootstrap } from '../utils/api';
 import type { User, AuthTokens, AuthResponse } from '../types';
 
 interface AuthContextType {
@@ -53,6 +53,16 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
     }
 
     setLoading(false);
+
+    // Refresh the stored profile from the same request that loads the first catalog page
+    startBootstrap()
+      .then((data) => {
+        if (data.user) {
+          setUser(data.user);
+          storeUser(data.user);
+        }
+      })
+      .catch((error) => console.error('Failed to load initial data:', error));
   }, []);
 
   const login = async (email: string, password: string) => {
@@ -104,6 +114,11 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   };
 
   const logout = () => {
+    const stored = getStoredTokens();
+    if (stored?.refresh) {
+      // Best effort: revoke server-side so the tokens stop working everywhere
+      api.post('/auth/logout/', { refresh: stored.refresh }).catch(() => {});
+    }
     setUser(null);
     setTokens(null);
     clearUser();
@@ -1,8 +1,12 @@
 import { StrictMode } from 'react';
 import { createRoot } from 'react-dom/client';
 import App from './App.tsx';
+import { startBootstrap } from './utils/api';
 import './index.css';
 
+// Start the initial data request before the first render; the product list's effect runs before AuthProvider's
+startBootstrap();
+
 createRoot(document.getElementById('root')!).render(
   <StrictMode>
     <App />
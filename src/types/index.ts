@@ -45,6 +45,14 @@ export interface Product {
   primary_image?: string;
 }
 
+export interface Store {
+  id: number;
+  name: string;
+  slug: string;
+  seller: number;
+  created_at: string;
+}
+
 export interface CartItem {
   id: number;
   product: Product;
@@ -73,6 +81,17 @@ export interface OrderItem {
   seller_name: string;
 }
 
+export interface Fulfilment {
+  id: number;
+  seller: number;
+  seller_name: string;
+  status: string;
+  created_at: string;
+  updated_at: string;
+  shipped_at?: string | null;
+  delivered_at?: string | null;
+}
+
 export interface Order {
   id: number;
   buyer: number;
@@ -81,6 +100,7 @@ export interface Order {
   status: string;
   shipping_address: string;
   items: OrderItem[];
+  fulfilments: Fulfilment[];
   created_at: string;
   updated_at: string;
 }
@@ -92,6 +112,32 @@ export interface PaginatedResponse<T> {
   results: T[];
 }
 
+export interface SellerProductSummary {
+  total: number;
+  active: number;
+  inactive: number;
+  in_stock: number;
+  low_stock: number;
+  out_of_stock: number;
+  units_in_stock: number;
+}
+
+export interface SellerProductPage extends PaginatedResponse<Product> {
+  summary: SellerProductSummary;
+}
+
 export interface NotificationContextType {
   showNotification: (message: string, type?: 'success' | 'error' | 'info') => void;
-}
\ No newline at end of file
+}
+
+export interface CartSummary {
+  item_count: number;
+  line_count: number;
+  total_amount: string;
+}
+
+export interface Bootstrap {
+  user: User | null;
+  cart: CartSummary | null;
+  products: PaginatedResponse<Product>;
+}
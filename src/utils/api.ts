@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { AuthTokens } from '../types';
+import type { AuthTokens, Bootstrap } from '../types';
 
 const API_BASE_URL = 'http://localhost:8000/api';
 
@@ -24,6 +24,28 @@ api.interceptors.request.use(
   }
 );
 
+// Refresh tokens are single-use, so concurrent 401s must share one refresh call
+let refreshInFlight: Promise<AuthTokens> | null = null;
+
+const refreshTokens = (refresh: string): Promise<AuthTokens> => {
+  if (!refreshInFlight) {
+    refreshInFlight = axios
+      .post(`${API_BASE_URL}/auth/token/refresh/`, { refresh })
+      .then((response) => {
+        const newTokens = {
+          access: response.data.access,
+          refresh: response.data.refresh ?? refresh,
+        };
+        storeTokens(newTokens);
+        return newTokens;
+      })
+      .finally(() => {
+        refreshInFlight = null;
+      });
+  }
+  return refreshInFlight;
+};
+
 // Response interceptor to handle token refresh
 api.interceptors.response.use(
   (response) => response,
@@ -36,16 +58,7 @@ api.interceptors.response.use(
       try {
         const tokens = getStoredTokens();
         if (tokens?.refresh) {
-          const response = await axios.post(`${API_BASE_URL}/auth/token/refresh/`, {
-            refresh: tokens.refresh,
-          });
-
-          const newTokens = {
-            access: response.data.access,
-            refresh: tokens.refresh,
-          };
-
-          storeTokens(newTokens);
+          const newTokens = await refreshTokens(tokens.refresh);
           originalRequest.headers.Authorization = `Bearer ${newTokens.access}`;
 
           return api(originalRequest);
@@ -60,6 +73,29 @@ api.interceptors.response.use(
   }
 );
 
+// Profile, cart summary and first catalog page in one round trip for the initial load.
+// Started from main.tsx before the first render, so it is in flight before any effect runs.
+// Only the first product list fetch may use its catalog page, and only while it is fresh.
+let bootstrapRequest: Promise<Bootstrap> | null = null;
+let bootstrapStartedAt = 0;
+let bootstrapProductsTaken = false;
+
+const BOOTSTRAP_MAX_AGE_MS = 10_000;
+
+export const startBootstrap = (): Promise<Bootstrap> => {
+  if (!bootstrapRequest) {
+    bootstrapStartedAt = Date.now();
+    bootstrapRequest = api.get<Bootstrap>('/bootstrap/').then((response) => response.data);
+  }
+  return bootstrapRequest;
+};
+
+export const takeBootstrap = (): Promise<Bootstrap> | null => {
+  if (!bootstrapRequest || bootstrapProductsTaken) return null;
+  bootstrapProductsTaken = true;
+  return Date.now() - bootstrapStartedAt <= BOOTSTRAP_MAX_AGE_MS ? bootstrapRequest : null;
+};
+
 export const storeTokens = (tokens: AuthTokens) => {
   localStorage.setItem('cart_builder_tokens', JSON.stringify(tokens));
 };